@@ -0,0 +1,88 @@
+"""
+Login throughput vs bcrypt cost factor.
+
+Simulates a login burst: `--concurrency` request threads each verify a
+password through a PasswordHasher sized like production, for every cost in
+`--rounds`. Reports verified logins per second, latency percentiles and how
+many attempts were turned away with 429.
+
+    cd backend
+    DODO_PAYMENTS_WEBHOOK_SECRET=x python -m benchmarks.password_hashing --rounds 10 11 12 13
+
+Pick the highest cost whose throughput still covers the expected peak login
+rate, then set PASSWORD_HASH_ROUNDS; existing hashes are upgraded on login.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from src.infrastructure.passwords import PasswordHasher
+from src.shared.config.cfg import settings
+from src.shared.exceptions import PasswordHasherBusyError
+from src.shared.models.user import get_password_hash, verify_password
+
+
+def run(rounds: int, workers: int, max_queue: int, concurrency: int, seconds: float) -> dict:
+    hasher = PasswordHasher(workers=workers, max_queue=max_queue)
+    hashed = get_password_hash("correct horse battery staple", rounds=rounds)
+    latencies, rejected = [], 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        nonlocal rejected
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                hasher.run(verify_password, "correct horse battery staple", hashed)
+            except PasswordHasherBusyError:
+                with lock:
+                    rejected += 1
+                # A client backing off after 429
+                time.sleep(0.01)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    latencies.sort()
+    return {
+        "rounds": rounds,
+        "logins_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "rejected": rejected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS)
+    parser.add_argument("--max-queue", type=int, default=settings.PASSWORD_HASH_MAX_QUEUE)
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous login attempts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration per cost factor")
+    args = parser.parse_args()
+
+    print(f"workers={args.workers} max_queue={args.max_queue} concurrency={args.concurrency}")
+    print(f"{'rounds':>6} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'429s':>7}")
+    for rounds in args.rounds:
+        result = run(rounds, args.workers, args.max_queue, args.concurrency, args.seconds)
+        print(
+            f"{result['rounds']:>6} {result['logins_per_second']:>10.1f} {result['p50_ms']:>9.1f} "
+            f"{result['p95_ms']:>9.1f} {result['rejected']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
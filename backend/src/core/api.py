@@ -11,6 +11,7 @@ from src.domains.suppliers.router import router as suppliers_router
 from src.domains.webhooks.router import router as webhooks_router
 from src.domains.uploads.router import router as uploads_router
 from src.infrastructure.database.connection import init_database
+from src.infrastructure.images import shutdown_image_processor
 
 def _setup_router(app: FastAPI):
     # Public routes
@@ -53,5 +54,6 @@ def get_app() -> FastAPI:
         raise
     
     _setup_router(app)
+    app.add_event_handler("shutdown", shutdown_image_processor)
     logger.info("Application initialized")
     return app
@@ -1,16 +1,22 @@
 from typing import Annotated, Dict, Any
 
-from fastapi import APIRouter, Header, status, Depends
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status, Depends
 
-from src.shared.schemas.user import AuthResponse, UserCreate, UserLogin, UserResponse
+from src.shared.schemas.user import AuthContext, AuthResponse, UserCreate, UserLogin, UserResponse
 from src.domains.auth.service import AuthService
-from src.shared.dependencies.auth import get_auth_service
+from src.shared.dependencies.auth import get_auth_service, get_current_user
+from src.shared.dependencies.rate_limit import enforce_login_rate_limit, enforce_register_rate_limit
 
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(enforce_register_rate_limit)]
+)
 def register(user_data: UserCreate, service: Annotated[AuthService, Depends(get_auth_service)]) -> UserResponse:
     """
     Register a new user with email, username, and password.
@@ -18,10 +24,16 @@ def register(user_data: UserCreate, service: Annotated[AuthService, Depends(get_
     return service.register_user(user_data)
 
 @router.post("/login", response_model=AuthResponse)
-def login(login_data: UserLogin, service: Annotated[AuthService, Depends(get_auth_service)]) -> Dict[str, Any]:
+def login(
+        request: Request,
+        login_data: UserLogin,
+        service: Annotated[AuthService, Depends(get_auth_service)]
+    ) -> Dict[str, Any]:
     """
     Login with username and password to get access token.
     """
+    # Throttled before the password is verified, so rejected attempts cost no hashing
+    enforce_login_rate_limit(request, login_data.username)
     return service.login_user(login_data)
 
 @router.get("/me", response_model=UserResponse)
@@ -32,4 +44,23 @@ def get_me(
     """
     Get current user information from JWT token.
     """
-    return service.get_current_user(access_token)
+    context = service.get_auth_context(access_token)
+    if not context:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return service.get_user(context.id)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+        current_user: Annotated[AuthContext, Depends(get_current_user)],
+        service: Annotated[AuthService, Depends(get_auth_service)]
+    ) -> Response:
+    """
+    Revoke the access token used for this request.
+    """
+    service.revoke_token(current_user)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
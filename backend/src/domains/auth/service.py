@@ -1,15 +1,62 @@
-from datetime import datetime, timedelta
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import jwt
 from fastapi import HTTPException, status
+from sqlalchemy import delete, event, inspect
 from sqlalchemy.orm import Session
 
-from src.shared.models.user import User, get_password_hash, verify_password
-from src.shared.schemas.user import AuthResponse, UserCreate, UserLogin, UserResponse
+from src.infrastructure.cache import get_cache
+from src.infrastructure.database.routing import on_primary, read_only
+from src.infrastructure.passwords import get_password_hasher
+from src.shared.exceptions import PasswordHasherBusyError
+from src.shared.models.auth import RevokedToken
+from src.shared.models.user import User, get_password_hash, password_needs_rehash, verify_password
+from src.shared.schemas.user import AuthContext, AuthResponse, UserCreate, UserLogin, UserResponse
 from src.shared.config import settings
 
 
+def principal_cache_key(user_id: int) -> str:
+    return f"auth:principal:{user_id}"
+
+
+def revoked_token_key(jti: str) -> str:
+    return f"auth:revoked:{jti}"
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Make the next request re-read a user's role and active flag; called once a change to either commits"""
+    get_cache().delete(principal_cache_key(user_id))
+
+
+# Users whose role or active flag a session changed, invalidated once it commits
+_CHANGED_PRINCIPALS = "auth_changed_principals"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session: Session, flush_context) -> None:
+    for user in list(session.dirty) + list(session.deleted):
+        if not isinstance(user, User):
+            continue
+        state = inspect(user)
+        if user in session.deleted or any(state.attrs[name].history.has_changes() for name in ("role", "is_active")):
+            session.info.setdefault(_CHANGED_PRINCIPALS, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_PRINCIPALS, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_principal_changes(session: Session) -> None:
+    session.info.pop(_CHANGED_PRINCIPALS, None)
+
+
 class AuthService:
     def __init__(self, session: Session) -> None:
         self.session = session
@@ -20,7 +67,7 @@ class AuthService:
             expire = datetime.now() + expires_delta
         else:
             expire = datetime.now() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
 
@@ -37,6 +84,115 @@ class AuthService:
     def _get_user_by_email(self, email: str) -> Optional[User]:
         return self.session.query(User).filter(User.email == email).first()
 
+    def _get_principal(self, user_id: int) -> Optional[dict]:
+        """
+        Current role and active flag of a user, cached for AUTH_PRINCIPAL_CACHE_TTL_SECONDS.
+
+        Committing a change to either through the ORM drops the entry; changes
+        made outside it (raw SQL, another service) apply once it expires.
+        """
+        cache = get_cache()
+        key = principal_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        user = self.session.get(User, user_id)
+        if not user:
+            return None
+        principal = {"username": user.username, "role": user.role, "is_active": user.is_active}
+        cache.set(key, json.dumps(principal), settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
+        return principal
+
+    @read_only
+    def get_auth_context(self, token: str) -> Optional[AuthContext]:
+        """
+        Build the principal for a token, normally without touching the database.
+
+        The user id and role come from the signed claims; the principal cache only
+        confirms the user still exists with that role and is active. Revoked tokens
+        are rejected. Tokens issued before these claims existed fall back to a
+        lookup by username.
+        """
+        payload = self._verify_token(token)
+        if not payload:
+            return None
+
+        jti = payload.get("jti")
+        if jti and self._is_revoked(jti):
+            return None
+
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc) if "exp" in payload else None
+        user_id = payload.get("uid")
+        if user_id is None:
+            user = self._get_user_by_username(payload.get("sub") or "")
+            if not user:
+                return None
+            return AuthContext(
+                id=user.id, username=user.username, role=user.role,
+                is_active=user.is_active, jti=jti, expires_at=expires_at
+            )
+
+        principal = self._get_principal(user_id)
+        if principal is None:
+            return None
+        return AuthContext(
+            id=user_id,
+            username=principal["username"],
+            role=principal["role"],
+            is_active=principal["is_active"],
+            jti=jti,
+            expires_at=expires_at
+        )
+
+    def _is_revoked(self, jti: str) -> bool:
+        """
+        Whether a token was logged out, from the revoked_tokens table.
+
+        The verdict is cached: "revoked" for good, "not revoked" only for
+        AUTH_REVOCATION_CHECK_SECONDS, which bounds how long other workers keep
+        accepting a token after it is logged out.
+        """
+        cache = get_cache()
+        key = revoked_token_key(jti)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached == "1"
+
+        # A replica may not have the revocation yet
+        with on_primary(self.session):
+            revoked = self.session.get(RevokedToken, jti) is not None
+        if revoked:
+            cache.set(key, "1", settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        else:
+            cache.set(key, "0", settings.AUTH_REVOCATION_CHECK_SECONDS)
+        return revoked
+
+    def revoke_token(self, context: AuthContext) -> None:
+        """Reject the context's token from now until it would have expired anyway"""
+        if not context.jti:
+            return
+        ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        if context.expires_at is not None:
+            ttl = max(1, context.expires_at.timestamp() - time.time())
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        # Expired tokens are rejected anyway, so their rows can go
+        self.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        if self.session.get(RevokedToken, context.jti) is None:
+            self.session.add(RevokedToken(jti=context.jti, expires_at=now + timedelta(seconds=ttl)))
+        self.session.commit()
+        get_cache().set(revoked_token_key(context.jti), "1", ttl)
+
+    def get_user(self, user_id: int) -> UserResponse:
+        user = self.session.get(User, user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return UserResponse.model_validate(user)
+
     def get_user_by_access_token(self, token: str) -> Optional[User]:
         payload = self._verify_token(token)
         if not payload:
@@ -46,12 +202,27 @@ class AuthService:
             return None
         return self._get_user_by_username(username)
 
+    def _run_password_op(self, fn, *args):
+        """Run a bcrypt operation on the bounded hashing pool, answering 429 when it is full"""
+        try:
+            return get_password_hasher().run(fn, *args)
+        except PasswordHasherBusyError:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many sign-ins in progress, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         user = self._get_user_by_username(username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not self._run_password_op(verify_password, password, user.hashed_password):
             return None
+        if password_needs_rehash(user.hashed_password):
+            # PASSWORD_HASH_ROUNDS changed since this hash was made
+            user.hashed_password = self._run_password_op(get_password_hash, password)
+            self.session.commit()
         return user
 
     def register_user(self, user_data: UserCreate) -> UserResponse:
@@ -69,7 +240,7 @@ class AuthService:
             )
 
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = self._run_password_op(get_password_hash, user_data.password)
         
         db_user = User(
             email=user_data.email,
@@ -104,7 +275,8 @@ class AuthService:
         
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = self._create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
+            data={"sub": user.username, "uid": user.id, "role": user.role, "active": user.is_active},
+            expires_delta=access_token_expires
         )
 
         return AuthResponse(
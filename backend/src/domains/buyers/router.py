@@ -1,22 +1,30 @@
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.infrastructure.database import get_db
+from src.infrastructure.database import get_db, get_async_db
+from src.infrastructure.payments import DodoPaymentsService
+from src.shared.config.cfg import settings
 from src.shared.dependencies.auth import get_current_user
-from src.shared.models.user import User
+from src.shared.dependencies.services import get_dodo_payments_service
+from src.shared.schemas.user import AuthContext
 from src.shared.schemas.product import ProductResponse, ProductListResponse, ProductQueryParams
 from src.shared.schemas.order import (
-    CartItemCreate, CartItemResponse, CartItemUpdate, CartItemWithProductResponse,
+    CartBatchRequest, CartItemCreate, CartItemResponse, CartItemUpdate, CartItemWithProductResponse,
     CheckoutRequest, CheckoutResponse, OrderResponse
 )
-from .service import BuyerService
+from src.shared.utils.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from src.shared.utils.timing import Timings
+from .service import AsyncBuyerService, BuyerService
 
 router = APIRouter(prefix="/buyers", tags=["buyers"])
 
 
 @router.get("/products", response_model=ProductListResponse)
-def get_products(
+async def get_products(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     price_min: float = Query(None, ge=0),
@@ -25,9 +33,23 @@ def get_products(
     search: str = Query(None),
     sort: str = Query("created_at"),
     order: str = Query("desc"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, max_length=512),
+    count: str = Query("exact", pattern="^(exact|cached|estimated)$"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get paginated list of products with filtering"""
+    """Get paginated list of products with filtering.
+
+    Pass the `next_cursor`/`prev_cursor` of a previous response as `cursor` to page
+    by keyset instead of offset; `page` is ignored in that case. `count` picks how
+    `total` is computed (exact, cached per filter set, or estimated from table
+    statistics); `include_total=false` skips counting altogether. `sort=relevance`
+    ranks full-text `search` matches and only supports page-based pagination.
+
+    Responses carry an ETag derived from the query, the newest `updated_at` in
+    the catalog and a count of catalog changes; send it back in `If-None-Match`
+    to get a 304 when nothing changed.
+    """
     params = ProductQueryParams(
         page=page,
         per_page=per_page,
@@ -36,106 +58,139 @@ def get_products(
         product_type=product_type,
         search=search,
         sort=sort,
-        order=order
+        order=order,
+        cursor=cursor,
+        count=count,
+        include_total=include_total
     )
     
-    service = BuyerService(db)
-    return service.get_products(params)
+    service = AsyncBuyerService(db)
+    version = await service.get_listing_version()
+    etag = make_etag(version.last_modified, version.changes, *sorted(request.query_params.multi_items()), weak=True)
+    headers = cache_headers(etag, version.last_modified, settings.CATALOG_LIST_CACHE_CONTROL)
+    # ETag only: deletions and changes within a second do not move the newest updated_at
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+
+    return await service.get_products(params)
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a single product by ID"""
-    service = BuyerService(db)
-    return service.get_product_by_id(product_id)
+    service = AsyncBuyerService(db)
+    detail = await service.get_product_detail(product_id)
+    headers = cache_headers(detail.etag, detail.last_modified, settings.CATALOG_DETAIL_CACHE_CONTROL)
+    if is_not_modified(request, detail.etag, detail.last_modified):
+        return not_modified_response(headers)
+    # The cached body is already serialized ProductResponse JSON
+    return Response(content=detail.body, media_type="application/json", headers=headers)
 
 
 @router.post("/cart")
-def add_to_cart(
+async def add_to_cart(
     item_data: CartItemCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add item to cart"""
-    service = BuyerService(db)
-    return service.add_to_cart(current_user.id, item_data)
+    service = AsyncBuyerService(db)
+    return await service.add_to_cart(current_user.id, item_data)
+
+
+@router.post("/cart/batch", response_model=List[CartItemResponse])
+async def apply_cart_batch(
+    batch: CartBatchRequest,
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply several add/set/remove operations to the cart at once, returning the resulting cart"""
+    service = AsyncBuyerService(db)
+    return await service.apply_cart_batch(current_user.id, batch)
 
 
 @router.get("/cart", response_model=List[CartItemWithProductResponse])
-def get_cart(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_cart(
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's cart items"""
-    service = BuyerService(db)
-    return service.get_cart(current_user.id)
+    service = AsyncBuyerService(db)
+    return await service.get_cart(current_user.id)
 
 
 @router.put("/cart/{item_id}", response_model=CartItemResponse)
-def update_cart_item(
+async def update_cart_item(
     item_id: str,
     update_data: CartItemUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update cart item quantity"""
-    service = BuyerService(db)
-    return service.update_cart_item(current_user.id, item_id, update_data)
+    service = AsyncBuyerService(db)
+    return await service.update_cart_item(current_user.id, item_id, update_data)
 
 
 @router.delete("/cart/{item_id}")
-def remove_from_cart(
+async def remove_from_cart(
     item_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove item from cart"""
-    service = BuyerService(db)
-    service.remove_from_cart(current_user.id, item_id)
+    service = AsyncBuyerService(db)
+    await service.remove_from_cart(current_user.id, item_id)
     return {"message": "Item removed from cart"}
 
 
 @router.delete("/cart")
-def clear_cart(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def clear_cart(
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Clear all items from cart"""
-    service = BuyerService(db)
-    service.clear_cart(current_user.id)
+    service = AsyncBuyerService(db)
+    await service.clear_cart(current_user.id)
     return {"message": "Cart cleared"}
 
 
 @router.post("/checkout", response_model=CheckoutResponse)
 def checkout(
     checkout_data: CheckoutRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    dodo_payments: DodoPaymentsService = Depends(get_dodo_payments_service)
 ):
     """Process checkout and create order"""
-    service = BuyerService(db)
-    return service.checkout(current_user.id, checkout_data)
+    service = BuyerService(db, dodo_payments=dodo_payments)
+    timings = Timings()
+    result = service.checkout(current_user.id, checkout_data, timings=timings)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return result
 
 
 @router.get("/orders", response_model=List[OrderResponse])
-def get_orders(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_orders(
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's order history"""
-    service = BuyerService(db)
-    return service.get_orders(current_user.id)
+    service = AsyncBuyerService(db)
+    return await service.get_orders(current_user.id)
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-def get_order(
+async def get_order(
     order_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific order details"""
-    service = BuyerService(db)
-    return service.get_order_by_id(current_user.id, order_id)
+    service = AsyncBuyerService(db)
+    return await service.get_order_by_id(current_user.id, order_id)
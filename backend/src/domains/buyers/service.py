@@ -1,8 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import List
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
 from loguru import logger
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, desc, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi import HTTPException, status
 
 from src.shared.models.product import Product, ProductImage
@@ -11,114 +18,189 @@ from src.shared.models.user import User
 from src.shared.models.payments import Customer
 from src.shared.schemas.product import ProductResponse, ProductListResponse, ProductQueryParams
 from src.shared.schemas.order import (
-    CartItemCreate, CartItemResponse, CartItemUpdate,
+    CartBatchRequest, CartItemCreate, CartItemResponse, CartItemUpdate, CartItemWithProductResponse, CartOperation,
     CheckoutRequest, CheckoutResponse, OrderResponse
 )
-from src.infrastructure.payments import DodoPaymentsService
+from src.infrastructure.database.async_session import run_sync_service
+from src.infrastructure.database.routing import read_only
+from src.infrastructure.payments import DodoPaymentsService, get_dodo_payments
+from src.shared.config.cfg import settings
+from src.shared.utils.timing import Timings
+from src.domains.products.service import ListingVersion, ProductDetail, ProductService
+
+# Key of the customer creation among a checkout's concurrent provider calls
+CUSTOMER_CALL = "customer"
+
+
+def _insert_cart_items(session: Session):
+    """The session dialect's INSERT for cart_items, which is where its upsert clause lives"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        return mysql_insert(CartItem)
+    if dialect == "postgresql":
+        return postgresql_insert(CartItem)
+    return sqlite_insert(CartItem)
+
+
+def _inserted(stmt):
+    """Columns of the row an upsert tried to insert"""
+    return stmt.inserted if hasattr(stmt, "on_duplicate_key_update") else stmt.excluded
+
+
+def _on_cart_conflict(stmt, quantity):
+    """Set quantity on the existing row when (user_id, product_id) is already in the cart"""
+    if hasattr(stmt, "on_duplicate_key_update"):
+        return stmt.on_duplicate_key_update(quantity=quantity)
+    return stmt.on_conflict_do_update(
+        index_elements=[CartItem.user_id, CartItem.product_id],
+        set_={"quantity": quantity}
+    )
+
+
+def _cart_upsert(session: Session, user_id: int, product_id: str, quantity: int):
+    """
+    INSERT ... SELECT of a cart row that adds to the quantity of an existing one.
+
+    Selecting from products makes the statement insert nothing for an unknown
+    product.
+    """
+    row = select(
+        literal(str(uuid4())), literal(user_id), Product.id, literal(quantity)
+    ).where(Product.id == product_id)
+    columns = [CartItem.id, CartItem.user_id, CartItem.product_id, CartItem.quantity]
+    stmt = _insert_cart_items(session).from_select(columns, row)
+    return _on_cart_conflict(stmt, CartItem.quantity + quantity)
 
 
 class BuyerService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, dodo_payments: Optional[DodoPaymentsService] = None):
         self.session = session
-        self.dodo_payments = DodoPaymentsService()
+        self._dodo_payments = dodo_payments
 
+    @property
+    def dodo_payments(self) -> DodoPaymentsService:
+        # Only checkout talks to the provider, so other calls never touch the client
+        if self._dodo_payments is None:
+            self._dodo_payments = get_dodo_payments()
+        return self._dodo_payments
+
+    @read_only
     def get_products(self, params: ProductQueryParams) -> ProductListResponse:
         """Get paginated list of products with filtering and sorting"""
-        query = self.session.query(Product)
-        
-        # Apply filters
-        if params.price_min is not None:
-            query = query.filter(Product.price >= params.price_min)
-        
-        if params.price_max is not None:
-            query = query.filter(Product.price <= params.price_max)
-        
-        if params.product_type:
-            query = query.filter(Product.product_type == params.product_type)
-        
-        if params.search:
-            search_term = f"%{params.search}%"
-            query = query.filter(
-                or_(
-                    Product.name.ilike(search_term),
-                    Product.description.ilike(search_term)
-                )
-            )
-        
-        # Apply sorting
-        sort_column = getattr(Product, params.sort, Product.created_at)
-        if params.order == "asc":
-            query = query.order_by(asc(sort_column))
-        else:
-            query = query.order_by(desc(sort_column))
-        
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        offset = (params.page - 1) * params.per_page
-        products = query.offset(offset).limit(params.per_page).all()
-        
-        # Calculate total pages
-        total_pages = (total + params.per_page - 1) // params.per_page
-        
-        return ProductListResponse(
-            products=[ProductResponse.model_validate(product) for product in products],
-            total=total,
+        return ProductService(self.session).query_products(
             page=params.page,
-            per_page=params.per_page,
-            total_pages=total_pages
+            elements=params.per_page,
+            price_min=params.price_min,
+            price_max=params.price_max,
+            product_type=params.product_type,
+            sort=params.sort,
+            search=params.search,
+            order=params.order,
+            cursor=params.cursor,
+            count=params.count,
+            include_total=params.include_total
         )
 
     def get_product_by_id(self, product_id: str) -> ProductResponse:
         """Get a single product by ID"""
-        product = self.session.query(Product).filter(Product.id == product_id).first()
-        
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Product not found"
-            )
-        
-        return ProductResponse.model_validate(product)
+        return ProductService(self.session).get_product_by_id(product_id)
+
+    def get_product_detail(self, product_id: str) -> ProductDetail:
+        """Get a product's cached, serialized detail"""
+        return ProductService(self.session).get_product_detail(product_id)
+
+    def get_listing_version(self) -> ListingVersion:
+        """Current catalog version, for listing ETags"""
+        return ProductService(self.session).get_listing_version()
 
     def add_to_cart(self, user_id: int, item_data: CartItemCreate) -> CartItemResponse:
-        """Add item to user's cart"""
-        # Check if product exists
-        product = self.session.query(Product).filter(Product.id == item_data.product_id).first()
-        if not product:
-            print("Product id: ", item_data.product_id, " not found")
+        """Add item to user's cart, adding to the quantity if it is already there"""
+        # A single statement, so concurrent adds of the same product cannot lose an update
+        result = self.session.execute(_cart_upsert(self.session, user_id, item_data.product_id, item_data.quantity))
+        if result.rowcount == 0:
+            # Nothing was selected from products to insert
+            self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Product not found"
             )
-        
-        # Check if item already in cart
-        existing_item = self.session.query(CartItem).filter(
-            and_(
+
+        cart_item = self.session.query(CartItem).filter(
+            CartItem.user_id == user_id,
+            CartItem.product_id == item_data.product_id
+        ).one()
+        response = CartItemResponse.model_validate(cart_item)
+        self.session.commit()
+        return response
+
+    def apply_cart_batch(self, user_id: int, batch: CartBatchRequest) -> List[CartItemResponse]:
+        """Apply add, set and remove operations to the user's cart in one transaction"""
+        # Fold the operations into one change per product: (True, quantity) once it
+        # was set or removed (quantity 0), (False, increment) while only added to
+        changes: Dict[str, Tuple[bool, int]] = {}
+        for operation in batch.operations:
+            absolute, quantity = changes.get(operation.product_id, (False, 0))
+            if operation.op == CartOperation.ADD:
+                changes[operation.product_id] = (absolute, quantity + operation.quantity)
+            elif operation.op == CartOperation.SET:
+                changes[operation.product_id] = (True, operation.quantity)
+            else:
+                changes[operation.product_id] = (True, 0)
+
+        kept = {product_id: change for product_id, change in changes.items() if change != (True, 0)}
+        if kept:
+            self._check_cart_batch(user_id, kept)
+
+        removed = [product_id for product_id, change in changes.items() if change == (True, 0)]
+        if removed:
+            self.session.execute(delete(CartItem).where(
                 CartItem.user_id == user_id,
-                CartItem.product_id == item_data.product_id
+                CartItem.product_id.in_(removed)
+            ))
+
+        for absolute in (True, False):
+            rows = [
+                {"id": str(uuid4()), "user_id": user_id, "product_id": product_id, "quantity": quantity}
+                for product_id, (is_absolute, quantity) in kept.items() if is_absolute == absolute
+            ]
+            if rows:
+                stmt = _insert_cart_items(self.session).values(rows)
+                quantity = _inserted(stmt).quantity
+                self.session.execute(_on_cart_conflict(stmt, quantity if absolute else CartItem.quantity + quantity))
+
+        cart_items = self.session.query(CartItem).filter(CartItem.user_id == user_id).all()
+        response = [CartItemResponse.model_validate(cart_item) for cart_item in cart_items]
+        self.session.commit()
+        return response
+
+    def _check_cart_batch(self, user_id: int, changes: Dict[str, Tuple[bool, int]]):
+        """Check that every product exists and has the stock for its resulting quantity, in one query"""
+        rows = self.session.execute(
+            select(Product.id, Product.stock_quantity, CartItem.quantity)
+            .outerjoin(CartItem, and_(CartItem.product_id == Product.id, CartItem.user_id == user_id))
+            .where(Product.id.in_(changes))
+        ).all()
+        found = {row.id: row for row in rows}
+
+        missing = sorted(set(changes) - set(found))
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Products not found: {', '.join(missing)}"
             )
-        ).first()
-        
-        if existing_item:
-            # Update quantity
-            existing_item.quantity += item_data.quantity
-            self.session.commit()
-            self.session.refresh(existing_item)
-            return CartItemResponse.model_validate(existing_item)
-        else:
-            # Create new cart item
-            cart_item = CartItem(
-                user_id=user_id,
-                product_id=item_data.product_id,
-                quantity=item_data.quantity
+
+        short = sorted(
+            product_id for product_id, (absolute, quantity) in changes.items()
+            if (quantity if absolute else (found[product_id].quantity or 0) + quantity)
+            > found[product_id].stock_quantity
+        )
+        if short:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock for products: {', '.join(short)}"
             )
-            self.session.add(cart_item)
-            self.session.commit()
-            self.session.refresh(cart_item)
-            return CartItemResponse.model_validate(cart_item)
 
+    @read_only
     def get_cart(self, user_id: int) -> List[CartItemResponse]:
         """Get user's cart items"""
         cart_items = self.session.query(CartItem).filter(CartItem.user_id == user_id).options(joinedload(CartItem.product).options(joinedload(Product.images))).all()
@@ -166,87 +248,117 @@ class BuyerService:
         self.session.query(CartItem).filter(CartItem.user_id == user_id).delete()
         self.session.commit()
 
-    def checkout(self, user_id: int, checkout_data: CheckoutRequest) -> CheckoutResponse:
-        """Process checkout and create payment session (order will be created via webhook)"""
-        # Get user
-        user = self.session.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        # Get cart items
-        cart_items = self.session.query(CartItem).filter(CartItem.user_id == user_id).all()
-        if not cart_items:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cart is empty"
-            )
-        
-        # Calculate total amount and prepare cart items for DodoPayments
-        total_amount = Decimal('0')
-        dodo_cart_items = []
-        
-        for cart_item in cart_items:
-            product = cart_item.product
-            item_total = product.price * cart_item.quantity
-            total_amount += item_total
-            
-            # Ensure product is synced with DodoPayments
-            if not product.dodo_product_id:
-                dodo_product_id = self.dodo_payments.sync_product_with_dodo(
-                    product=product
+    def checkout(
+        self,
+        user_id: int,
+        checkout_data: CheckoutRequest,
+        timings: Optional[Timings] = None
+    ) -> CheckoutResponse:
+        """
+        Process checkout and create payment session (order will be created via webhook).
+
+        No transaction is held open while talking to DodoPayments: products it
+        does not know yet and the customer are created concurrently once the
+        cart is read, their ids saved in a short write transaction, and only
+        then is the checkout session created. Durations go to timings.
+        """
+        timings = timings if timings is not None else Timings()
+
+        with timings.measure("db_read"):
+            user = self.session.query(User).filter(User.id == user_id).first()
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
                 )
-                product.dodo_product_id = dodo_product_id
-                self.session.flush()  # Save the dodo_product_id
-            
-            dodo_cart_items.append({
-                'product_id': product.id,
-                'dodo_product_id': product.dodo_product_id,
-                'quantity': cart_item.quantity
-            })
-        
-        # Get or create customer in payment system
-        customer = self.session.query(Customer).filter(Customer.user_id == user_id).first()
-        
-        if not customer:
-            # Create customer in DodoPayments
-            dodo_customer = self.dodo_payments.create_customer(
-                email=user.email,
-                name=user.username,
-                user_id=user_id
-            )
-            
-            # Save customer locally
-            customer = Customer(
-                user_id=user_id,
-                customer_id=dodo_customer.customer_id,
-                billing_email=user.email,
-                billing_name=user.username
+
+            cart_items = self.session.query(CartItem).options(joinedload(CartItem.product)).filter(
+                CartItem.user_id == user_id
+            ).all()
+            if not cart_items:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cart is empty"
+                )
+
+            customer = self.session.query(Customer).filter(Customer.user_id == user_id).first()
+
+            # Plain copies of what the provider calls need, as the ORM objects expire below
+            email, username = user.email, user.username
+            customer_id = customer.customer_id if customer else None
+            total_amount = sum((item.product.price * item.quantity for item in cart_items), Decimal('0'))
+            quantities = [(item.product.id, item.quantity) for item in cart_items]
+            dodo_product_ids = {item.product.id: item.product.dodo_product_id for item in cart_items}
+            unsynced = {
+                item.product.id: Product(
+                    id=item.product.id,
+                    name=item.product.name,
+                    price=item.product.price,
+                    description=item.product.description
+                )
+                for item in cart_items if not item.product.dodo_product_id
+            }
+        # Release the connection for the duration of the provider calls
+        self.session.rollback()
+
+        calls = {
+            product_id: partial(self.dodo_payments.sync_product_with_dodo, product=product)
+            for product_id, product in unsynced.items()
+        }
+        if customer_id is None:
+            calls[CUSTOMER_CALL] = partial(self.dodo_payments.create_customer, email=email, name=username, user_id=user_id)
+        with timings.measure("dodo_prepare"):
+            results, failed = self._call_dodo_concurrently(calls, timings)
+
+        with timings.measure("db_write"):
+            for product_id in unsynced:
+                if product_id in results:
+                    dodo_product_ids[product_id] = results[product_id]
+                    # Another checkout may have synced it meanwhile; keep whichever id was saved first
+                    self.session.execute(
+                        update(Product)
+                        .where(Product.id == product_id, Product.dodo_product_id.is_(None))
+                        .values(dodo_product_id=results[product_id])
+                    )
+            if CUSTOMER_CALL in results:
+                customer_id = results[CUSTOMER_CALL].customer_id
+                self.session.add(Customer(
+                    user_id=user_id,
+                    customer_id=customer_id,
+                    billing_email=email,
+                    billing_name=username
+                ))
+            self.session.commit()
+
+        if failed:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Payment provider is unavailable, please retry"
             )
-            self.session.add(customer)
-        
+
         # Create checkout session with proper SDK parameters
         # Note: order_id will be None since order will be created in webhook
-        payment_intent = self.dodo_payments.create_checkout_session(
-            cart_items=dodo_cart_items,
-            customer_email=user.email,
-            customer_name=user.username,
-            user_id=user_id,
-            order_id=None,  # Order will be created in webhook
-            existing_customer_id=customer.customer_id if customer else None,
-            metadata={
-                'user_id': str(user_id)
-                # order_id will be added when order is created in webhook
-            }
-        )
-        
+        with timings.measure("dodo_checkout_session"):
+            payment_intent = self.dodo_payments.create_checkout_session(
+                cart_items=[
+                    {'product_id': product_id, 'dodo_product_id': dodo_product_ids[product_id], 'quantity': quantity}
+                    for product_id, quantity in quantities
+                ],
+                customer_email=email,
+                customer_name=username,
+                user_id=user_id,
+                order_id=None,  # Order will be created in webhook
+                existing_customer_id=customer_id,
+                metadata={
+                    'user_id': str(user_id)
+                    # order_id will be added when order is created in webhook
+                }
+            )
+
         # Do NOT clear cart - it will be cleared in webhook when payment succeeds
         # Do NOT create order - it will be created in webhook when payment succeeds
-        
-        self.session.commit()
-        
+        logger.info(f"Checkout for user {user_id} took {timings.summary()}")
+
         return CheckoutResponse(
             order_id=None,  # No order created yet
             payment_url=payment_intent.checkout_url,
@@ -254,6 +366,33 @@ class BuyerService:
             status="payment_pending"
         )
 
+    def _call_dodo_concurrently(
+        self,
+        calls: Dict[str, Callable[[], Any]],
+        timings: Timings
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Run independent provider calls, at most DODO_PAYMENTS_MAX_CONCURRENCY at a time"""
+        if not calls:
+            return {}, []
+
+        def timed(key: str, call: Callable[[], Any]) -> Any:
+            with timings.measure("dodo_create_customer" if key == CUSTOMER_CALL else "dodo_sync_product"):
+                return call()
+
+        workers = min(settings.DODO_PAYMENTS_MAX_CONCURRENCY, len(calls))
+        with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="dodo") as pool:
+            futures = {key: pool.submit(timed, key, call) for key, call in calls.items()}
+
+        results, failed = {}, []
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error(f"DodoPayments call for {key} failed: {e}")
+                failed.append(key)
+        return results, failed
+
+    @read_only
     def get_orders(self, user_id: int) -> List[OrderResponse]:
         """Get user's order history"""
         orders = self.session.query(Order).filter(Order.user_id == user_id).options(joinedload(Order.items).options(
@@ -261,6 +400,7 @@ class BuyerService:
         )).order_by(desc(Order.created_at)).all()
         return orders
 
+    @read_only
     def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
         """Get specific order by ID"""
         order = self.session.query(Order).options(
@@ -281,3 +421,60 @@ class BuyerService:
             )
         
         return order
+
+
+class AsyncBuyerService:
+    """
+    Async variant of BuyerService for handlers using get_async_db.
+
+    Checkout is not offered here: it talks to the payment provider with a
+    blocking client and stays on the sync BuyerService.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_products(self, params: ProductQueryParams) -> ProductListResponse:
+        return await run_sync_service(self.session, BuyerService, "get_products", params)
+
+    async def get_product_by_id(self, product_id: str) -> ProductResponse:
+        return await run_sync_service(self.session, BuyerService, "get_product_by_id", product_id)
+
+    async def get_product_detail(self, product_id: str) -> ProductDetail:
+        return await run_sync_service(self.session, BuyerService, "get_product_detail", product_id)
+
+    async def get_listing_version(self) -> ListingVersion:
+        return await run_sync_service(self.session, BuyerService, "get_listing_version")
+
+    async def add_to_cart(self, user_id: int, item_data: CartItemCreate) -> CartItemResponse:
+        return await run_sync_service(self.session, BuyerService, "add_to_cart", user_id, item_data)
+
+    async def apply_cart_batch(self, user_id: int, batch: CartBatchRequest) -> List[CartItemResponse]:
+        return await run_sync_service(self.session, BuyerService, "apply_cart_batch", user_id, batch)
+
+    async def get_cart(self, user_id: int) -> List[CartItemWithProductResponse]:
+        return await run_sync_service(
+            self.session, BuyerService, "get_cart", user_id,
+            response_type=List[CartItemWithProductResponse]
+        )
+
+    async def update_cart_item(self, user_id: int, item_id: str, update_data: CartItemUpdate) -> CartItemResponse:
+        return await run_sync_service(self.session, BuyerService, "update_cart_item", user_id, item_id, update_data)
+
+    async def remove_from_cart(self, user_id: int, item_id: str) -> None:
+        await run_sync_service(self.session, BuyerService, "remove_from_cart", user_id, item_id)
+
+    async def clear_cart(self, user_id: int) -> None:
+        await run_sync_service(self.session, BuyerService, "clear_cart", user_id)
+
+    async def get_orders(self, user_id: int) -> List[OrderResponse]:
+        return await run_sync_service(
+            self.session, BuyerService, "get_orders", user_id,
+            response_type=List[OrderResponse]
+        )
+
+    async def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
+        return await run_sync_service(
+            self.session, BuyerService, "get_order_by_id", user_id, order_id,
+            response_type=OrderResponse
+        )
@@ -1,12 +1,31 @@
-from fastapi import APIRouter
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from src.infrastructure.database.pool import get_pool_metrics
+from src.shared.config.cfg import settings
 
 
 router = APIRouter()
 
 
+def require_internal_token(x_internal_token: Optional[str] = Header(None)):
+    """Hide internal endpoints from callers without the HEALTH_INTERNAL_TOKEN secret"""
+    expected = settings.HEALTH_INTERNAL_TOKEN.get_secret_value()
+    if not expected or not secrets.compare_digest((x_internal_token or "").encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
 
 
-# TODO: Add health checks for database and other dependencies
\ No newline at end of file
+@router.get("/health/db/pool", dependencies=[Depends(require_internal_token)], include_in_schema=False)
+def database_pool():
+    """Connection pool usage of the worker that served the request"""
+    return {"pools": get_pool_metrics()}
+
+
+# TODO: Add health checks for database and other dependencies
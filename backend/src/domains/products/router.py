@@ -1,42 +1,79 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.infrastructure.database import get_db
+from src.infrastructure.database import get_async_db
+from src.shared.config.cfg import settings
 from src.shared.schemas.product import ProductResponse, ProductListResponse
-from .service import ProductService
+from src.shared.utils.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from .service import AsyncProductService
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 
 @router.get("/", response_model=ProductListResponse)
-def get_products(
+async def get_products(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     elements: int = Query(20, ge=1, le=100),
     price_min: float = Query(None, ge=0),
     price_max: float = Query(None, ge=0),
     product_type: str = Query(None),
-    sort: str = Query("created_at"),
+    sort: str = Query("created_at", pattern="^(name|price|created_at|relevance)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
     search: str = Query(None),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, max_length=512),
+    count: str = Query("exact", pattern="^(exact|cached|estimated)$"),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get paginated list of products with filtering"""
-    service = ProductService(db)
-    return service.query_products(
+    """Get paginated list of products with filtering.
+
+    Pass the `next_cursor`/`prev_cursor` of a previous response as `cursor` to page
+    by keyset instead of offset; `page` is ignored in that case. `count` picks how
+    `total` is computed (exact, cached per filter set, or estimated from table
+    statistics); `include_total=false` skips counting altogether. `sort=relevance`
+    ranks full-text `search` matches and only supports page-based pagination.
+
+    Responses carry an ETag derived from the query, the newest `updated_at` in
+    the catalog and a count of catalog changes; send it back in `If-None-Match`
+    to get a 304 when nothing changed.
+    """
+    service = AsyncProductService(db)
+    version = await service.get_listing_version()
+    etag = make_etag(version.last_modified, version.changes, *sorted(request.query_params.multi_items()), weak=True)
+    headers = cache_headers(etag, version.last_modified, settings.CATALOG_LIST_CACHE_CONTROL)
+    # ETag only: deletions and changes within a second do not move the newest updated_at
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+
+    return await service.query_products(
         page=page,
         elements=elements,
         price_min=price_min,
         price_max=price_max,
         product_type=product_type,
         sort=sort,
-        search=search
+        search=search,
+        order=order,
+        cursor=cursor,
+        count=count,
+        include_total=include_total
     )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a single product by ID"""
-    service = ProductService(db)
-    return service.get_product_by_id(product_id)
\ No newline at end of file
+    service = AsyncProductService(db)
+    detail = await service.get_product_detail(product_id)
+    headers = cache_headers(detail.etag, detail.last_modified, settings.CATALOG_DETAIL_CACHE_CONTROL)
+    if is_not_modified(request, detail.etag, detail.last_modified):
+        return not_modified_response(headers)
+    # The cached body is already serialized ProductResponse JSON
+    return Response(content=detail.body, media_type="application/json", headers=headers)
@@ -1,19 +1,81 @@
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, asc, desc, func, insert, select, update
 from fastapi import HTTPException, status
 
-from src.shared.models.product import Product, ProductImage
+from src.shared.models.product import CatalogState, Product, ProductImage
 from src.shared.schemas.product import (
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
 )
+from src.infrastructure.cache import get_cache
+from src.infrastructure.database.async_session import run_sync_service
+from src.infrastructure.database.routing import on_primary, read_only
+from src.infrastructure.search import get_search_backend
+from src.domains.uploads.references import release_images, remove_objects, retain_images
+from src.infrastructure.database.counting import CountStrategy, count_query, count_signature
+from src.infrastructure.payments.product_sync import enqueue_product_sync
+from src.shared.config.cfg import settings
+from src.shared.utils.http_cache import make_etag
+from src.shared.utils.pagination import decode_cursor, fetch_keyset_page
+
+
+@dataclass(frozen=True)
+class ProductDetail:
+    """Serialized ProductResponse as served to clients, with its validators"""
+    body: str
+    etag: str
+    last_modified: datetime
+
+    def dump(self) -> str:
+        # Serialized JSON has no raw newlines, so they can separate the fields
+        return f"{self.etag}\n{self.last_modified.isoformat()}\n{self.body}"
+
+    @classmethod
+    def load(cls, value: str) -> "ProductDetail":
+        etag, last_modified, body = value.split("\n", 2)
+        return cls(body=body, etag=etag, last_modified=datetime.fromisoformat(last_modified))
+
+
+@dataclass(frozen=True)
+class ListingVersion:
+    """What listing ETags are derived from: the newest updated_at and the catalog change count"""
+    last_modified: Optional[datetime]
+    changes: int
+
+
+# The single catalog_state row
+CATALOG_STATE_ID = 1
+
+
+def product_cache_key(product_id: str) -> str:
+    return f"product:v2:{product_id}"
+
+
+def invalidate_product_cache(product_id: str) -> None:
+    """Drop a product's cached detail; call after committing any change to it"""
+    get_cache().delete(product_cache_key(product_id))
+
+
+def record_catalog_change(session: Session) -> None:
+    """Count a product or product image change in the caller's transaction, so listing ETags change"""
+    bumped = session.execute(
+        update(CatalogState)
+        .where(CatalogState.id == CATALOG_STATE_ID)
+        .values(changes=CatalogState.changes + 1)
+    )
+    if bumped.rowcount == 0:
+        session.execute(insert(CatalogState).values(id=CATALOG_STATE_ID, changes=1))
 
 
 class ProductService:
     def __init__(self, session: Session) -> None:
         self.session = session
 
+    @read_only
     def query_products(
         self,
         page: int = 1,
@@ -22,63 +84,164 @@ class ProductService:
         price_max: Optional[float] = None,
         product_type: Optional[str] = None,
         sort: str = "created_at",
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        count: str = CountStrategy.EXACT,
+        include_total: bool = True
     ) -> ProductListResponse:
-        """Query products with filtering, sorting, and pagination"""
-        query = self.session.query(Product)
-        
-        # Apply filters
-        if price_min is not None:
-            query = query.filter(Product.price >= price_min)
-        
-        if price_max is not None:
-            query = query.filter(Product.price <= price_max)
-        
-        if product_type:
-            query = query.filter(Product.product_type == product_type)
-        
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Product.name.ilike(search_term),
-                    Product.description.ilike(search_term)
+        """Query products with filtering, sorting, and offset or cursor pagination"""
+        if sort == "relevance" and not search:
+            # Nothing to rank by without a search term
+            sort = "created_at"
+
+        keyset_cursor = None
+        if cursor:
+            if sort == "relevance":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor pagination is not available for relevance sort"
+                )
+            try:
+                keyset_cursor = decode_cursor(cursor, sort=sort, order=order)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid cursor: {e}"
                 )
+
+        query = self._filtered_query(price_min, price_max, product_type, search)
+        
+        # Get total count (skipped entirely when the caller does not need it)
+        total, total_is_estimate = None, False
+        if include_total:
+            total, total_is_estimate = count_query(
+                query,
+                strategy=CountStrategy(count),
+                table_name=Product.__tablename__,
+                signature=count_signature(
+                    Product.__tablename__,
+                    price_min=price_min,
+                    price_max=price_max,
+                    product_type=product_type,
+                    search=search
+                ),
+                filtered=any(value not in (None, "") for value in (price_min, price_max, product_type, search))
             )
         
-        # Apply sorting
-        sort_column = getattr(Product, sort, Product.created_at)
-        query = query.order_by(desc(sort_column))
+        # Load every page's images in one extra query instead of one per product
+        query = query.options(selectinload(Product.images))
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
+        # Apply sorting and pagination
+        next_cursor, prev_cursor = None, None
         offset = (page - 1) * elements
-        products = query.offset(offset).limit(elements).all()
+        if sort == "relevance":
+            direction_fn = asc if order == "asc" else desc
+            relevance = get_search_backend(self.session).relevance(query, search)
+            products = query.order_by(
+                direction_fn(relevance), direction_fn(Product.id)
+            ).offset(offset).limit(elements).all()
+        else:
+            # id breaks ties so cursors are stable
+            result_page = fetch_keyset_page(
+                query,
+                sort_column=getattr(Product, sort, Product.created_at),
+                id_column=Product.id,
+                sort=sort,
+                order=order,
+                per_page=elements,
+                cursor=keyset_cursor,
+                offset=offset
+            )
+            products = result_page.items
+            next_cursor, prev_cursor = result_page.next_cursor, result_page.prev_cursor
         
         # Calculate total pages
-        total_pages = (total + elements - 1) // elements
+        total_pages = (total + elements - 1) // elements if total is not None else None
         
         return ProductListResponse(
             products=[ProductResponse.model_validate(product) for product in products],
             total=total,
             page=page,
             per_page=elements,
-            total_pages=total_pages
+            total_pages=total_pages,
+            total_is_estimate=total_is_estimate,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
         )
 
-    def get_product_by_id(self, product_id: str) -> ProductResponse:
-        """Get a single product by ID"""
-        product = self.session.query(Product).filter(Product.id == product_id).first()
+    def _filtered_query(
+        self,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        product_type: Optional[str] = None,
+        search: Optional[str] = None
+    ) -> Query:
+        """Product query restricted by the catalog listing filters"""
+        query = self.session.query(Product)
+        
+        if price_min is not None:
+            query = query.filter(Product.price >= price_min)
         
+        if price_max is not None:
+            query = query.filter(Product.price <= price_max)
+        
+        if product_type:
+            query = query.filter(Product.product_type == product_type)
+        
+        if search:
+            query = get_search_backend(self.session).filter(query, search)
+        
+        return query
+
+    @read_only
+    def get_listing_version(self) -> ListingVersion:
+        """
+        Newest updated_at in the catalog and its change count, for listing ETags.
+
+        Both are single index lookups, fetched in one round trip; the filters are
+        part of the ETag through the query string instead. updated_at catches
+        writes made outside the product services, the count everything they
+        commit, including deletions and changes within the same second.
+        """
+        last_modified, changes = self.session.execute(
+            select(
+                select(func.max(Product.updated_at)).scalar_subquery(),
+                select(CatalogState.changes).where(CatalogState.id == CATALOG_STATE_ID).scalar_subquery()
+            )
+        ).one()
+        return ListingVersion(last_modified=last_modified, changes=changes or 0)
+
+    @read_only
+    def get_product_detail(self, product_id: str) -> ProductDetail:
+        """Get a product's serialized detail, from the cache when possible"""
+        cache = get_cache()
+        key = product_cache_key(product_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return ProductDetail.load(cached)
+
+        # Cached for PRODUCT_CACHE_TTL_SECONDS, so a replica lagging behind an invalidation must not fill it
+        with on_primary(self.session):
+            product = self.session.query(Product).options(
+                selectinload(Product.images)
+            ).filter(Product.id == product_id).first()
+
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Product not found"
             )
-        
-        return ProductResponse.model_validate(product)
+
+        body = ProductResponse.model_validate(product).model_dump_json()
+        # The body includes updated_at, so its hash changes with every edit
+        detail = ProductDetail(body=body, etag=make_etag(body), last_modified=product.updated_at)
+        cache.set(key, detail.dump(), settings.PRODUCT_CACHE_TTL_SECONDS)
+        return detail
+
+    def get_product_by_id(self, product_id: str) -> ProductResponse:
+        """Get a single product by ID"""
+        return ProductResponse.model_validate_json(self.get_product_detail(product_id).body)
 
     def create_product(self, seller_id: int, create_product_schema: ProductCreate) -> ProductResponse:
         """Create a new product"""
@@ -94,17 +257,24 @@ class ProductService:
         
         self.session.add(product)
         self.session.flush()  # Get product ID
+
+        # Pushed to the payment provider by the product sync worker once committed
+        enqueue_product_sync(self.session, product.id)
         
         # Add images if provided
         for image_data in create_product_schema.images:
             image = ProductImage(
                 product_id=product.id,
-                image_url=image_data.image_url
+                image_url=image_data.image_url,
+                variants=image_data.variants
             )
             self.session.add(image)
+        retain_images(self.session, [image_data.image_url for image_data in create_product_schema.images])
+        record_catalog_change(self.session)
         
         self.session.commit()
         self.session.refresh(product)
+        get_search_backend(self.session).index_product(product)
         
         return ProductResponse.model_validate(product)
 
@@ -138,9 +308,16 @@ class ProductService:
         
         if update_product_schema.stock_quantity is not None:
             product.stock_quantity = update_product_schema.stock_quantity
+
+        synced_fields = (update_product_schema.name, update_product_schema.price, update_product_schema.description)
+        if any(value is not None for value in synced_fields):
+            enqueue_product_sync(self.session, product_id)
+        record_catalog_change(self.session)
         
         self.session.commit()
+        invalidate_product_cache(product_id)
         self.session.refresh(product)
+        get_search_backend(self.session).index_product(product)
         
         return ProductResponse.model_validate(product)
 
@@ -159,9 +336,15 @@ class ProductService:
                 detail="Product not found or access denied"
             )
         
+        unused = release_images(self.session, [image.image_url for image in product.images])
         self.session.delete(product)
+        record_catalog_change(self.session)
         self.session.commit()
+        remove_objects(unused)
+        invalidate_product_cache(product_id)
+        get_search_backend(self.session).remove_product(product_id)
 
+    @read_only
     def get_products_by_seller(self, seller_id: int, page: int = 1, per_page: int = 20) -> ProductListResponse:
         """Get all products for a specific seller"""
         query = self.session.query(Product).filter(Product.seller_id == seller_id)
@@ -171,7 +354,9 @@ class ProductService:
         
         # Apply pagination
         offset = (page - 1) * per_page
-        products = query.order_by(desc(Product.created_at)).offset(offset).limit(per_page).all()
+        products = query.options(selectinload(Product.images)).order_by(
+            desc(Product.created_at)
+        ).offset(offset).limit(per_page).all()
         
         # Calculate total pages
         total_pages = (total + per_page - 1) // per_page
@@ -183,3 +368,36 @@ class ProductService:
             per_page=per_page,
             total_pages=total_pages
         )
+
+
+class AsyncProductService:
+    """Async variant of ProductService for handlers using get_async_db"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def query_products(self, **filters) -> ProductListResponse:
+        return await run_sync_service(self.session, ProductService, "query_products", **filters)
+
+    async def get_product_by_id(self, product_id: str) -> ProductResponse:
+        return await run_sync_service(self.session, ProductService, "get_product_by_id", product_id)
+
+    async def get_product_detail(self, product_id: str) -> ProductDetail:
+        return await run_sync_service(self.session, ProductService, "get_product_detail", product_id)
+
+    async def get_listing_version(self) -> ListingVersion:
+        return await run_sync_service(self.session, ProductService, "get_listing_version")
+
+    async def create_product(self, seller_id: int, create_product_schema: ProductCreate) -> ProductResponse:
+        return await run_sync_service(self.session, ProductService, "create_product", seller_id, create_product_schema)
+
+    async def update_product(self, product_id: str, seller_id: int, update_product_schema: ProductUpdate) -> ProductResponse:
+        return await run_sync_service(
+            self.session, ProductService, "update_product", product_id, seller_id, update_product_schema
+        )
+
+    async def delete_product(self, product_id: str, seller_id: int) -> None:
+        await run_sync_service(self.session, ProductService, "delete_product", product_id, seller_id)
+
+    async def get_products_by_seller(self, seller_id: int, page: int = 1, per_page: int = 20) -> ProductListResponse:
+        return await run_sync_service(self.session, ProductService, "get_products_by_seller", seller_id, page, per_page)
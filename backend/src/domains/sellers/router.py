@@ -1,17 +1,19 @@
-import io
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, UploadFile, File, Form, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.infrastructure.database import get_db
+from src.infrastructure.database import get_db, get_async_db
 from src.infrastructure.bucket import R2BucketManager
 from src.shared.dependencies.auth import get_current_user
-from src.shared.models.user import User
+from src.shared.dependencies.services import get_bucket_manager_service
+from src.shared.schemas.user import AuthContext
 from src.shared.schemas.product import (
-    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductImageAttach, ProductImageResponse
 )
 from src.shared.schemas.order import OrderResponse, OrderUpdate
-from .service import SellerService
+from src.domains.uploads.service import PRODUCT_IMAGE_PATH, PRODUCT_IMAGE_TYPES, UploadService
+from .service import MAX_PRODUCT_IMAGES, AsyncSellerService, SellerService
 
 router = APIRouter(prefix="/sellers", tags=["sellers"])
 
@@ -19,11 +21,11 @@ router = APIRouter(prefix="/sellers", tags=["sellers"])
 @router.post("/products", response_model=ProductResponse)
 def create_product(
     product_data: ProductCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthContext = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new product"""
-    service = SellerService(db)
+    service = SellerService(db, principal=current_user)
     return service.create_product(current_user.id, product_data)
 
 
@@ -35,45 +37,29 @@ async def create_product_with_images(
     stock_quantity: int = Form(default=0),
     product_type: Optional[str] = Form(None),
     images: List[UploadFile] = File(default=[]),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
 ):
     """Create a new product with image uploads"""
     try:
         # Validate images
-        if len(images) > 10:
-            raise HTTPException(status_code=400, detail="Maximum 10 images allowed")
+        if len(images) > MAX_PRODUCT_IMAGES:
+            raise HTTPException(status_code=400, detail=f"Maximum {MAX_PRODUCT_IMAGES} images allowed")
         
         # Upload images to R2
-        image_urls = []
+        results = []
         if images and images[0].filename:  # Check if files were actually uploaded
-            bucket_manager = R2BucketManager()
-            
-            for image in images:
-                if image.content_type not in ["image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp"]:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Invalid image type: {image.content_type}"
-                    )
-                
-                # Read and upload image
-                content = await image.read()
-                file_buffer = io.BytesIO(content)
-                
-                file_key = await bucket_manager.put(
-                    path="products/images",
-                    file_buffer=file_buffer,
-                    content_type=image.content_type,
-                    file_type=image.content_type
-                )
-                
-                # Get public URL
-                public_url = bucket_manager.get_public_url(file_key)
-                image_urls.append(public_url)
+            # Either every image is stored or none is
+            results = await UploadService(bucket_manager, db).upload_all_images(
+                images, PRODUCT_IMAGE_PATH, PRODUCT_IMAGE_TYPES, variants=True
+            )
         
         # Create product data
         from src.shared.schemas.product import ProductImageCreate
-        product_images = [ProductImageCreate(image_url=url) for url in image_urls]
+        product_images = [
+            ProductImageCreate(image_url=result["url"], variants=result["variants"]) for result in results
+        ]
         
         product_data = ProductCreate(
             name=name,
@@ -85,7 +71,7 @@ async def create_product_with_images(
         )
         
         # Create product
-        service = SellerService(db)
+        service = SellerService(db, principal=current_user)
         return service.create_product(current_user.id, product_data)
         
     except HTTPException:
@@ -94,93 +80,109 @@ async def create_product_with_images(
         raise HTTPException(status_code=500, detail=f"Failed to create product: {str(e)}")
 
 
+@router.post("/products/{product_id}/images", response_model=ProductImageResponse)
+async def attach_product_image(
+    product_id: str,
+    image: ProductImageAttach,
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
+):
+    """Attach an image uploaded straight to the bucket with an upload grant"""
+    uploaded = await UploadService(bucket_manager).verify_direct_upload(
+        image.file_key, image.upload_token, current_user.id
+    )
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.add_product_image(current_user.id, product_id, image.file_key, uploaded["url"])
+
+
 @router.get("/products", response_model=ProductListResponse)
-def get_seller_products(
+async def get_seller_products(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all products for the current seller"""
-    service = SellerService(db)
-    return service.get_seller_products(current_user.id, page, per_page)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.get_seller_products(current_user.id, page, per_page)
 
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific product by ID"""
-    service = SellerService(db)
-    return service.get_product_by_id(current_user.id, product_id)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.get_product_by_id(current_user.id, product_id)
 
 
 @router.put("/products/{product_id}", response_model=ProductResponse)
-def update_product(
+async def update_product(
     product_id: str,
     update_data: ProductUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a product"""
-    service = SellerService(db)
-    return service.update_product(current_user.id, product_id, update_data)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.update_product(current_user.id, product_id, update_data)
 
 
 @router.delete("/products/{product_id}")
-def delete_product(
+async def delete_product(
     product_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a product"""
-    service = SellerService(db)
-    service.delete_product(current_user.id, product_id)
+    service = AsyncSellerService(db, principal=current_user)
+    await service.delete_product(current_user.id, product_id)
     return {"message": "Product deleted successfully"}
 
 
 @router.get("/orders", response_model=List[OrderResponse])
-def get_seller_orders(
+async def get_seller_orders(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get orders containing seller's products"""
-    service = SellerService(db)
-    return service.get_seller_orders(current_user.id, page, per_page)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.get_seller_orders(current_user.id, page, per_page)
 
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
-def get_order(
+async def get_order(
     order_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get specific order details"""
-    service = SellerService(db)
-    return service.get_order_by_id(current_user.id, order_id)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.get_order_by_id(current_user.id, order_id)
 
 
 @router.put("/orders/{order_id}", response_model=OrderResponse)
-def update_order_status(
+async def update_order_status(
     order_id: str,
     status_update: OrderUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update order status (approve/ship orders)"""
-    service = SellerService(db)
-    return service.update_order_status(current_user.id, order_id, status_update)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.update_order_status(current_user.id, order_id, status_update)
 
 
 @router.get("/analytics")
-def get_seller_analytics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_seller_analytics(
+    current_user: AuthContext = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get seller analytics dashboard data"""
-    service = SellerService(db)
-    return service.get_seller_analytics(current_user.id)
+    service = AsyncSellerService(db, principal=current_user)
+    return await service.get_seller_analytics(current_user.id)
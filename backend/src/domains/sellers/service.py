@@ -1,35 +1,52 @@
+from functools import partial
 from typing import List, Optional
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, desc
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, desc, func, update
 from fastapi import HTTPException, status
 
-from src.infrastructure.payments.dodo import DodoPaymentsService
+from src.infrastructure.database.async_session import run_sync_service
+from src.infrastructure.database.routing import read_only
+from src.infrastructure.payments.product_sync import enqueue_product_sync
+from src.infrastructure.search import get_search_backend
+from src.domains.uploads.references import release_images, remove_objects, retain_images, track_uploads
+from src.domains.products.service import invalidate_product_cache, record_catalog_change
 from src.shared.models.product import Product, ProductImage
 from src.shared.models.order import Order, OrderItem, OrderStatus
+from src.shared.models.storage import StoredObject
 from src.shared.models.user import User, UserRole
 from src.shared.schemas.product import (
-    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+    ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductImageResponse
 )
 from src.shared.schemas.order import OrderResponse, OrderUpdate
+from src.shared.schemas.user import AuthContext
+
+# Images a product may have
+MAX_PRODUCT_IMAGES = 10
 
 
 class SellerService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, principal: Optional[AuthContext] = None):
         self.session = session
-        self.dodo_payments = DodoPaymentsService()
+        # Authenticated caller; lets role checks skip loading the User
+        self.principal = principal
 
-    def _verify_seller_access(self, user_id: int, product_id: Optional[str] = None) -> User:
+    def _verify_seller_access(self, user_id: int, product_id: Optional[str] = None) -> None:
         """Verify user is a seller and has access to the product if specified"""
-        user = self.session.query(User).filter(User.id == user_id).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
+        if self.principal is not None and self.principal.id == user_id:
+            role = self.principal.role
+        else:
+            user = self.session.query(User).filter(User.id == user_id).first()
+            
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            role = user.role
         
-        if user.role != UserRole.SELLER.value:
+        if role != UserRole.SELLER.value:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Seller role required."
@@ -48,16 +65,6 @@ class SellerService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Product not found or access denied"
                 )
-        
-        return user
-
-    def _sync_with_payment_provider(self, product: Product):
-        """Sync product with payment provider"""
-        if not product.dodo_product_id:
-            dodo_product_id = self.dodo_payments.sync_product_with_dodo(
-                product=product
-            )
-            product.dodo_product_id = dodo_product_id
 
     def create_product(self, user_id: int, product_data: ProductCreate) -> ProductResponse:
         """Create a new product"""
@@ -76,21 +83,62 @@ class SellerService:
         self.session.add(product)
         self.session.flush()  # Get product ID
 
-        self._sync_with_payment_provider(product)
+        # Pushed to the payment provider by the product sync worker once committed
+        enqueue_product_sync(self.session, product.id)
 
         # Add images if provided
         for image_data in product_data.images:
             image = ProductImage(
                 product_id=product.id,
-                image_url=image_data.image_url
+                image_url=image_data.image_url,
+                variants=image_data.variants
             )
             self.session.add(image)
+        retain_images(self.session, [image_data.image_url for image_data in product_data.images])
+        record_catalog_change(self.session)
         
         self.session.commit()
         self.session.refresh(product)
+        get_search_backend(self.session).index_product(product)
         
         return ProductResponse.model_validate(product)
 
+    def add_product_image(self, user_id: int, product_id: str, file_key: str, image_url: str) -> ProductImageResponse:
+        """Attach an image already stored in the bucket to a product"""
+        self._verify_seller_access(user_id, product_id)
+
+        count = self.session.query(ProductImage).filter(ProductImage.product_id == product_id).count()
+        if count >= MAX_PRODUCT_IMAGES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {MAX_PRODUCT_IMAGES} images allowed"
+            )
+
+        # A grant's key is fresh, so any existing use means it was attached already
+        attached = self.session.query(StoredObject).filter(
+            StoredObject.key == file_key, StoredObject.refcount > 0
+        ).first() or self.session.query(ProductImage).filter(ProductImage.image_url == image_url).first()
+        if attached:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload is already attached to a product"
+            )
+
+        image = ProductImage(product_id=product_id, image_url=image_url)
+        self.session.add(image)
+        # Images are part of the product's representation, so its validators must change too
+        self.session.execute(update(Product).where(Product.id == product_id).values(updated_at=func.now()))
+        # Direct uploads never passed through the API, so this is where they start being counted
+        track_uploads(self.session, [file_key])
+        retain_images(self.session, [image_url])
+        record_catalog_change(self.session)
+        self.session.commit()
+        invalidate_product_cache(product_id)
+        self.session.refresh(image)
+
+        return ProductImageResponse.model_validate(image)
+
+    @read_only
     def get_seller_products(self, user_id: int, page: int = 1, per_page: int = 20) -> ProductListResponse:
         """Get all products for a seller"""
         self._verify_seller_access(user_id)
@@ -102,7 +150,9 @@ class SellerService:
         
         # Apply pagination
         offset = (page - 1) * per_page
-        products = query.order_by(desc(Product.created_at)).offset(offset).limit(per_page).all()
+        products = query.options(selectinload(Product.images)).order_by(
+            desc(Product.created_at)
+        ).offset(offset).limit(per_page).all()
         
         # Calculate total pages
         total_pages = (total + per_page - 1) // per_page
@@ -115,6 +165,7 @@ class SellerService:
             total_pages=total_pages
         )
 
+    @read_only
     def get_product_by_id(self, user_id: int, product_id: str) -> ProductResponse:
         """Get a specific product by ID (seller must own it)"""
         self._verify_seller_access(user_id, product_id)
@@ -154,9 +205,15 @@ class SellerService:
         
         if update_data.stock_quantity is not None:
             product.stock_quantity = update_data.stock_quantity
+
+        if any(value is not None for value in (update_data.name, update_data.price, update_data.description)):
+            enqueue_product_sync(self.session, product_id)
+        record_catalog_change(self.session)
         
         self.session.commit()
+        invalidate_product_cache(product_id)
         self.session.refresh(product)
+        get_search_backend(self.session).index_product(product)
         
         return ProductResponse.model_validate(product)
 
@@ -185,9 +242,15 @@ class SellerService:
             )
         ).first()
         
+        unused = release_images(self.session, [image.image_url for image in product.images])
         self.session.delete(product)
+        record_catalog_change(self.session)
         self.session.commit()
+        remove_objects(unused)
+        invalidate_product_cache(product_id)
+        get_search_backend(self.session).remove_product(product_id)
 
+    @read_only
     def get_seller_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
         """Get orders containing seller's products"""
         self._verify_seller_access(user_id)
@@ -199,6 +262,7 @@ class SellerService:
         
         return orders
 
+    @read_only
     def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
         """Get specific order details (if it contains seller's products)"""
         self._verify_seller_access(user_id)
@@ -270,6 +334,7 @@ class SellerService:
         
         return OrderResponse.model_validate(order)
 
+    @read_only
     def get_seller_analytics(self, user_id: int) -> dict:
         """Get basic analytics for seller"""
         self._verify_seller_access(user_id)
@@ -306,3 +371,50 @@ class SellerService:
             "total_revenue": total_revenue,
             "pending_orders": pending_orders
         }
+
+
+class AsyncSellerService:
+    """
+    Async variant of SellerService for handlers using get_async_db.
+
+    Product creation syncs with the payment provider through a blocking client
+    and stays on the sync SellerService.
+    """
+
+    def __init__(self, session: AsyncSession, principal: Optional[AuthContext] = None):
+        self.session = session
+        self.service_factory = partial(SellerService, principal=principal)
+
+    async def get_seller_products(self, user_id: int, page: int = 1, per_page: int = 20) -> ProductListResponse:
+        return await run_sync_service(self.session, self.service_factory, "get_seller_products", user_id, page, per_page)
+
+    async def get_product_by_id(self, user_id: int, product_id: str) -> ProductResponse:
+        return await run_sync_service(self.session, self.service_factory, "get_product_by_id", user_id, product_id)
+
+    async def add_product_image(self, user_id: int, product_id: str, file_key: str, image_url: str) -> ProductImageResponse:
+        return await run_sync_service(
+            self.session, self.service_factory, "add_product_image", user_id, product_id, file_key, image_url
+        )
+
+    async def update_product(self, user_id: int, product_id: str, update_data: ProductUpdate) -> ProductResponse:
+        return await run_sync_service(self.session, self.service_factory, "update_product", user_id, product_id, update_data)
+
+    async def delete_product(self, user_id: int, product_id: str) -> None:
+        await run_sync_service(self.session, self.service_factory, "delete_product", user_id, product_id)
+
+    async def get_seller_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
+        return await run_sync_service(
+            self.session, self.service_factory, "get_seller_orders", user_id, page, per_page,
+            response_type=List[OrderResponse]
+        )
+
+    async def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
+        return await run_sync_service(self.session, self.service_factory, "get_order_by_id", user_id, order_id)
+
+    async def update_order_status(self, user_id: int, order_id: str, status_update: OrderUpdate) -> OrderResponse:
+        return await run_sync_service(
+            self.session, self.service_factory, "update_order_status", user_id, order_id, status_update
+        )
+
+    async def get_seller_analytics(self, user_id: int) -> dict:
+        return await run_sync_service(self.session, self.service_factory, "get_seller_analytics", user_id)
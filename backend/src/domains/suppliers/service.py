@@ -1,35 +1,46 @@
-from typing import List
+from functools import partial
+from typing import List, Optional
+
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, desc
 from fastapi import HTTPException, status
 
 from src.shared.models.order import Order, OrderItem, OrderStatus
 from src.shared.models.user import User, UserRole
 from src.shared.schemas.order import OrderResponse, OrderUpdate
+from src.shared.schemas.user import AuthContext
 from src.shared.models.product import Product
+from src.infrastructure.database.async_session import run_sync_service
+from src.infrastructure.database.routing import read_only
 
 class SupplierService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, principal: Optional[AuthContext] = None):
         self.session = session
+        # Authenticated caller; lets role checks skip loading the User
+        self.principal = principal
 
-    def _verify_supplier_access(self, user_id: int) -> User:
+    def _verify_supplier_access(self, user_id: int) -> None:
         """Verify user is a supplier"""
-        user = self.session.query(User).filter(User.id == user_id).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        if user.role != UserRole.SUPPLIER.value:
+        if self.principal is not None and self.principal.id == user_id:
+            role = self.principal.role
+        else:
+            user = self.session.query(User).filter(User.id == user_id).first()
+            
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            role = user.role
+        
+        if role != UserRole.SUPPLIER.value:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Supplier role required."
             )
-        
-        return user
 
+    @read_only
     def get_orders_for_approval(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
         """Get orders that need supplier approval (confirmed orders)"""
         self._verify_supplier_access(user_id)
@@ -41,6 +52,7 @@ class SupplierService:
         
         return orders
 
+    @read_only
     def get_all_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
         """Get all orders (suppliers can view all orders)"""
         self._verify_supplier_access(user_id)
@@ -51,6 +63,7 @@ class SupplierService:
         
         return orders
 
+    @read_only
     def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
         """Get specific order details"""
         self._verify_supplier_access(user_id)
@@ -149,6 +162,7 @@ class SupplierService:
         
         return order
 
+    @read_only
     def get_supplier_analytics(self, user_id: int) -> dict:
         """Get analytics for supplier dashboard"""
         self._verify_supplier_access(user_id)
@@ -177,3 +191,44 @@ class SupplierService:
             "total_revenue": total_revenue,
             "orders_needing_approval": confirmed_orders  # Orders waiting for supplier approval
         }
+
+
+class AsyncSupplierService:
+    """Async variant of SupplierService for handlers using get_async_db"""
+
+    def __init__(self, session: AsyncSession, principal: Optional[AuthContext] = None):
+        self.session = session
+        self.service_factory = partial(SupplierService, principal=principal)
+
+    async def get_orders_for_approval(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
+        return await run_sync_service(
+            self.session, self.service_factory, "get_orders_for_approval", user_id, page, per_page,
+            response_type=List[OrderResponse]
+        )
+
+    async def get_all_orders(self, user_id: int, page: int = 1, per_page: int = 20) -> List[OrderResponse]:
+        return await run_sync_service(
+            self.session, self.service_factory, "get_all_orders", user_id, page, per_page,
+            response_type=List[OrderResponse]
+        )
+
+    async def get_order_by_id(self, user_id: int, order_id: str) -> OrderResponse:
+        return await run_sync_service(
+            self.session, self.service_factory, "get_order_by_id", user_id, order_id,
+            response_type=OrderResponse
+        )
+
+    async def approve_order(self, user_id: int, order_id: str) -> OrderResponse:
+        return await run_sync_service(
+            self.session, self.service_factory, "approve_order", user_id, order_id,
+            response_type=OrderResponse
+        )
+
+    async def update_order_status(self, user_id: int, order_id: str, status_update: OrderUpdate) -> OrderResponse:
+        return await run_sync_service(
+            self.session, self.service_factory, "update_order_status", user_id, order_id, status_update,
+            response_type=OrderResponse
+        )
+
+    async def get_supplier_analytics(self, user_id: int) -> dict:
+        return await run_sync_service(self.session, self.service_factory, "get_supplier_analytics", user_id)
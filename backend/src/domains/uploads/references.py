@@ -0,0 +1,126 @@
+"""
+Reference counts for content-addressed uploads.
+
+In content-addressed mode identical files share one bucket object, so the
+object can only be removed when no product image points at it any more.
+stored_objects counts those product images per key. Keys without a row
+(random-keyed uploads from before, external URLs) are never touched here.
+
+Counts change in the caller's transaction; removing objects from the bucket
+happens after it commits, via remove_objects.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.infrastructure.bucket import get_bucket_manager
+from src.infrastructure.bucket.base import BaseBucketManager
+from src.infrastructure.images import FORMATS, VARIANTS
+from src.shared.config.cfg import settings
+from src.shared.models.storage import StoredObject
+from src.shared.utils.bucket import extract_file_key_from_url, variant_key
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def stored_keys(file_key: str) -> List[str]:
+    """An uploaded image's key and every key its variants may have been stored under"""
+    return [file_key] + [variant_key(file_key, name, fmt) for name in VARIANTS for fmt in FORMATS]
+
+
+def _keys(image_urls: Iterable[str]) -> List[str]:
+    keys = (extract_file_key_from_url(url, settings.R2_PUBLIC_DOMAIN) for url in image_urls)
+    return [key for key in keys if key]
+
+
+def track_uploads(session: Session, keys: Iterable[str]) -> None:
+    """Track freshly uploaded keys in the session's transaction, restarting their grace period"""
+    keys = set(keys)
+    if not keys:
+        return
+    now = _utcnow()
+    existing = set(session.scalars(select(StoredObject.key).where(StoredObject.key.in_(keys))))
+    session.execute(update(StoredObject).where(StoredObject.key.in_(existing)).values(last_uploaded_at=now))
+    session.add_all(
+        StoredObject(key=key, refcount=0, last_uploaded_at=now, created_at=now) for key in keys - existing
+    )
+    session.flush()
+
+
+def record_uploads(session: Session, keys: Iterable[str]) -> None:
+    """track_uploads and commit"""
+    keys = set(keys)
+    try:
+        track_uploads(session, keys)
+        session.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content inserted the row first
+        session.rollback()
+        track_uploads(session, keys)
+        session.commit()
+
+
+def retain_images(session: Session, image_urls: Iterable[str]) -> None:
+    """Count new product images against the objects they point at"""
+    for key, count in Counter(_keys(image_urls)).items():
+        session.execute(
+            update(StoredObject).where(StoredObject.key == key).values(refcount=StoredObject.refcount + count)
+        )
+
+
+def release_images(session: Session, image_urls: Iterable[str]) -> List[str]:
+    """
+    Uncount removed product images and forget objects nothing uses any more.
+
+    Returns the keys that may now be removed from the bucket once the session
+    commits; unreferenced objects still in their grace period are left to the
+    bucket garbage collector.
+    """
+    counts = Counter(_keys(image_urls))
+    if not counts:
+        return []
+    for key, count in counts.items():
+        session.execute(
+            update(StoredObject)
+            .where(StoredObject.key == key)
+            .values(refcount=case((StoredObject.refcount > count, StoredObject.refcount - count), else_=0))
+        )
+
+    return forget_unused(session, counts)
+
+
+def forget_unused(session: Session, keys: Iterable[str]) -> List[str]:
+    """
+    Drop the rows of keys that are unreferenced and past their grace period, returning those keys.
+
+    Each row is deleted by a statement repeating both conditions, and only keys whose
+    DELETE matched are returned: an upload that restarts a key's grace period between
+    the check and the delete keeps its row, and its object.
+    """
+    grace_cutoff = _utcnow() - timedelta(seconds=settings.UPLOAD_ORPHAN_GRACE_SECONDS)
+    unused = [StoredObject.refcount == 0, StoredObject.last_uploaded_at < grace_cutoff]
+    candidates = list(session.scalars(select(StoredObject.key).where(StoredObject.key.in_(list(keys)), *unused)))
+    forgotten = []
+    for key in candidates:
+        if session.execute(delete(StoredObject).where(StoredObject.key == key, *unused)).rowcount:
+            forgotten.append(key)
+    return forgotten
+
+
+def remove_objects(keys: List[str], bucket_manager: Optional[BaseBucketManager] = None) -> None:
+    """Delete objects and their variants from the bucket; failures are left to the garbage collector"""
+    if not keys:
+        return
+    bucket_manager = bucket_manager or get_bucket_manager()
+    try:
+        bucket_manager.delete([stored for key in keys for stored in stored_keys(key)])
+    except Exception as e:
+        logger.warning(f"Could not remove {len(keys)} unreferenced objects: {e}")
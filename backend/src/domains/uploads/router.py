@@ -1,4 +1,3 @@
-import io
 from typing import List
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form
 from sqlalchemy.orm import Session
@@ -6,74 +5,31 @@ from sqlalchemy.orm import Session
 from src.infrastructure.database import get_db
 from src.infrastructure.bucket import R2BucketManager
 from src.shared.dependencies.auth import get_current_user
-from src.shared.models.user import User
+from src.shared.dependencies.services import get_bucket_manager_service
+from src.shared.schemas.upload import UploadGrantRequest, UploadGrantResponse
+from src.shared.schemas.user import AuthContext
 from src.shared.exceptions import FileUploadError
+from .service import UploadService
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
-# Allowed image types
-ALLOWED_IMAGE_TYPES = {
-    "image/jpeg", "image/jpg", "image/png", 
-    "image/gif", "image/webp", "image/svg+xml"
-}
-
-# Maximum file size (5MB)
-MAX_FILE_SIZE = 5 * 1024 * 1024
-
-
-def validate_image_file(file: UploadFile) -> None:
-    """Validate uploaded image file."""
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}"
-        )
-    
-    if file.size and file.size > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {MAX_FILE_SIZE / (1024 * 1024):.1f}MB"
-        )
-
 
 @router.post("/image")
 async def upload_image(
     file: UploadFile = File(...),
     path: str = Form(default="images"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    variants: bool = Form(default=False),
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
 ):
-    """Upload a single image to R2 bucket."""
+    """Upload a single image to R2 bucket, optionally with resized variants."""
     try:
-        # Validate file
-        validate_image_file(file)
-        
-        # Read file content
-        content = await file.read()
-        file_buffer = io.BytesIO(content)
-        
-        # Initialize bucket manager
-        bucket_manager = R2BucketManager()
-        
-        # Upload file
-        file_key = await bucket_manager.put(
-            path=path,
-            file_buffer=file_buffer,
-            content_type=file.content_type,
-            file_type=file.content_type
-        )
-        
-        # Get public URL
-        public_url = bucket_manager.get_public_url(file_key)
-        
-        return {
-            "success": True,
-            "file_key": file_key,
-            "url": public_url,
-            "content_type": file.content_type,
-            "size": len(content)
-        }
+        result = await UploadService(bucket_manager, db).upload_image(file, path, variants=variants)
+        return {"success": True, **result}
         
+    except HTTPException:
+        raise
     except FileUploadError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -84,60 +40,19 @@ async def upload_image(
 async def upload_multiple_images(
     files: List[UploadFile] = File(...),
     path: str = Form(default="images"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    variants: bool = Form(default=False),
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
 ):
-    """Upload multiple images to R2 bucket."""
+    """Upload multiple images to R2 bucket, optionally with resized variants."""
     if len(files) > 10:
         raise HTTPException(
             status_code=400,
             detail="Maximum 10 files allowed per upload"
         )
     
-    results = []
-    bucket_manager = R2BucketManager()
-    
-    for file in files:
-        try:
-            # Validate file
-            validate_image_file(file)
-            
-            # Read file content
-            content = await file.read()
-            file_buffer = io.BytesIO(content)
-            
-            # Upload file
-            file_key = await bucket_manager.put(
-                path=path,
-                file_buffer=file_buffer,
-                content_type=file.content_type,
-                file_type=file.content_type
-            )
-            
-            # Get public URL
-            public_url = bucket_manager.get_public_url(file_key)
-            
-            results.append({
-                "success": True,
-                "filename": file.filename,
-                "file_key": file_key,
-                "url": public_url,
-                "content_type": file.content_type,
-                "size": len(content)
-            })
-            
-        except FileUploadError as e:
-            results.append({
-                "success": False,
-                "filename": file.filename,
-                "error": str(e)
-            })
-        except Exception as e:
-            results.append({
-                "success": False,
-                "filename": file.filename,
-                "error": f"Upload failed: {str(e)}"
-            })
+    results = await UploadService(bucket_manager, db).upload_images(files, path, variants=variants)
     
     return {
         "results": results,
@@ -147,23 +62,41 @@ async def upload_multiple_images(
     }
 
 
+@router.post("/image/grant", response_model=UploadGrantResponse)
+async def grant_image_upload(
+    grant: UploadGrantRequest,
+    current_user: AuthContext = Depends(get_current_user),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
+):
+    """
+    Presigned upload of one product image straight to the bucket.
+
+    Sellers only. Send the file to the returned URL, then attach file_key and
+    upload_token with POST /sellers/products/{product_id}/images.
+    """
+    return UploadService(bucket_manager).grant_upload(current_user, grant.content_type, grant.size, grant.method)
+
+
 @router.delete("/image/{file_key:path}")
 async def delete_image(
     file_key: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
 ):
-    """Delete an image from R2 bucket."""
+    """Delete an image from R2 bucket, unless products still use it."""
     try:
-        bucket_manager = R2BucketManager()
-        bucket_manager.delete([file_key])
+        deleted = await UploadService(bucket_manager, db).delete_image(file_key)
         
         return {
             "success": True,
-            "message": "Image deleted successfully",
-            "file_key": file_key
+            "message": "Image deleted successfully" if deleted else "Image will be removed once unused",
+            "file_key": file_key,
+            "deleted": deleted
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -174,12 +107,12 @@ async def delete_image(
 @router.get("/image/{file_key:path}/url")
 async def get_image_url(
     file_key: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: AuthContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    bucket_manager: R2BucketManager = Depends(get_bucket_manager_service)
 ):
     """Get public URL for an image."""
     try:
-        bucket_manager = R2BucketManager()
         public_url = bucket_manager.get_public_url(file_key)
         
         return {
@@ -0,0 +1,377 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Collection, Dict, List, Optional, Union
+
+import jwt
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from src.infrastructure.bucket.base import BaseBucketManager
+from src.infrastructure.images import (
+    PROCESSABLE_TYPES, VARIANTS, ImageProcessor, available_formats, get_image_processor
+)
+from src.shared.config.cfg import settings
+from src.shared.exceptions import FileUploadError, ImageProcessingError
+from src.shared.models.storage import StoredObject
+from src.shared.models.user import UserRole
+from src.shared.schemas.user import AuthContext
+from src.shared.utils.bucket import content_filepath, generate_unique_filepath, variant_key
+from src.shared.utils.images import sniff_image_type
+from .references import forget_unused, record_uploads, stored_keys
+
+# Allowed image types
+ALLOWED_IMAGE_TYPES = {
+    "image/jpeg", "image/jpg", "image/png", 
+    "image/gif", "image/webp", "image/svg+xml"
+}
+
+# Product photos are shown inline, so no SVG
+PRODUCT_IMAGE_TYPES = ALLOWED_IMAGE_TYPES - {"image/svg+xml"}
+
+# Where product images are stored, whether uploaded through the API or straight to the bucket
+PRODUCT_IMAGE_PATH = "products/images"
+
+# Bytes read from the upload per await; also enough for type sniffing
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Audience of upload grant tokens; access token checks reject anything carrying it
+UPLOAD_GRANT_AUDIENCE = "upload-grant"
+
+
+def sign_upload_grant(file_key: str, user_id: int) -> str:
+    """
+    Token proving file_key was granted to user_id.
+
+    It stays valid for the orphan grace period: after that an unattached upload
+    may be garbage collected, so attaching it must not be possible either.
+    """
+    expires = datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_ORPHAN_GRACE_SECONDS)
+    claims = {"key": file_key, "grantee": user_id, "aud": UPLOAD_GRANT_AUDIENCE, "exp": expires}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def read_upload_grant(token: str, user_id: int) -> str:
+    """Key a grant token was issued for; 403 unless it is valid and was issued to user_id"""
+    try:
+        claims = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], audience=UPLOAD_GRANT_AUDIENCE
+        )
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=403, detail="Invalid or expired upload grant")
+    if claims.get("grantee") != user_id or not isinstance(claims.get("key"), str):
+        raise HTTPException(status_code=403, detail="Upload grant was issued to another user")
+    return claims["key"]
+
+
+def validate_image_file(file: UploadFile, allowed_types: Collection[str] = ALLOWED_IMAGE_TYPES) -> None:
+    """Validate uploaded image file before reading it."""
+    if file.content_type not in allowed_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed types: {', '.join(sorted(allowed_types))}"
+        )
+
+    # Cheap early rejection; the cap is enforced on the bytes actually read either way
+    if file.size and file.size > settings.UPLOAD_MAX_IMAGE_BYTES:
+        raise _too_large()
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size: {settings.UPLOAD_MAX_IMAGE_BYTES / (1024 * 1024):.1f}MB"
+    )
+
+
+async def _read_capped(file: UploadFile, head: bytes) -> AsyncIterator[bytes]:
+    """Yield the upload in chunks, failing with 413 as soon as it passes the size cap"""
+    size = 0
+    chunk = head
+    while chunk:
+        size += len(chunk)
+        if size > settings.UPLOAD_MAX_IMAGE_BYTES:
+            raise _too_large()
+        yield chunk
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+
+
+class UploadService:
+    def __init__(
+        self,
+        bucket_manager: BaseBucketManager,
+        session: Optional[Session] = None,
+        image_processor: Optional[ImageProcessor] = None
+    ):
+        self.bucket_manager = bucket_manager
+        # Records content-addressed uploads for reference counting; without one they go untracked
+        self.session = session
+        self._image_processor = image_processor
+        # Concurrent uploads of one request share the session
+        self._session_lock = asyncio.Lock()
+
+    @property
+    def image_processor(self) -> ImageProcessor:
+        # Resolved on first use so uploads without variants never start the process pool
+        if self._image_processor is None:
+            self._image_processor = get_image_processor()
+        return self._image_processor
+
+    async def upload_image(
+        self,
+        file: UploadFile,
+        path: str,
+        allowed_types: Collection[str] = ALLOWED_IMAGE_TYPES,
+        variants: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Validate and stream one image to the bucket, returning its key, public URL, type, size,
+        whether an identical object was already stored and, when asked for, the URLs of its
+        resized variants.
+
+        The stored type comes from the file's leading bytes rather than the declared one.
+        """
+        return await self._store_image(file, path, allowed_types, variants)
+
+    async def _store_image(
+        self,
+        file: UploadFile,
+        path: str,
+        allowed_types: Collection[str],
+        variants: bool
+    ) -> Dict[str, Any]:
+        validate_image_file(file, allowed_types)
+
+        head = await file.read(UPLOAD_CHUNK_SIZE)
+        content_type = sniff_image_type(head)
+        if content_type not in allowed_types:
+            raise HTTPException(status_code=400, detail="File content is not a supported image")
+
+        deduplicated = False
+        if settings.UPLOAD_CONTENT_ADDRESSED:
+            # Hash a first pass over the (spooled) upload so an existing object can be reused
+            digest = hashlib.sha256()
+            size = 0
+            async for chunk in _read_capped(file, head):
+                digest.update(chunk)
+                size += len(chunk)
+            file_key = content_filepath(path, digest.hexdigest(), content_type)
+            # Restart the grace period before looking: once the object is found to exist, nothing may
+            # delete it before this upload's URL is handed out
+            await self._record_upload(file_key)
+            deduplicated = await self.bucket_manager.get_checksum(file_key) is not None
+            if not deduplicated:
+                await file.seek(0)
+                head = await file.read(UPLOAD_CHUNK_SIZE)
+
+        if not deduplicated:
+            file_key, size = await self.bucket_manager.put_stream(
+                path=path,
+                chunks=_read_capped(file, head),
+                content_type=content_type,
+                file_type=content_type,
+                key=file_key if settings.UPLOAD_CONTENT_ADDRESSED else None
+            )
+
+        variant_urls = None
+        if variants and content_type in PROCESSABLE_TYPES:
+            variant_urls = await self._upload_variants(file, file_key, deduplicated)
+
+        return {
+            "file_key": file_key,
+            "url": self.bucket_manager.get_public_url(file_key),
+            "content_type": content_type,
+            "size": size,
+            "deduplicated": deduplicated,
+            "variants": variant_urls
+        }
+
+    async def _upload_variants(self, file: UploadFile, file_key: str, deduplicated: bool) -> Dict[str, Dict[str, str]]:
+        """Render and store the variants of an uploaded image, removing what this upload stored if that fails"""
+        if deduplicated:
+            formats = available_formats()
+            if await self.bucket_manager.get_checksum(variant_key(file_key, "thumbnail", formats[0])) is not None:
+                return {
+                    name: {fmt: self.bucket_manager.get_public_url(variant_key(file_key, name, fmt)) for fmt in formats}
+                    for name in VARIANTS
+                }
+
+        # The whole image is needed to decode it; it is within the upload cap by now
+        await file.seek(0)
+        data = await file.read()
+        try:
+            renditions = await self.image_processor.render(data)
+            return await self.bucket_manager.put_variants(file_key, renditions)
+        except BaseException as e:
+            # A deduplicated original belongs to whoever stored it first
+            keys = stored_keys(file_key)[1:] if deduplicated else stored_keys(file_key)
+            await asyncio.to_thread(self.bucket_manager.delete, keys)
+            if isinstance(e, ImageProcessingError):
+                raise HTTPException(status_code=400, detail=str(e)) from e
+            raise
+
+    async def _record_upload(self, file_key: str) -> None:
+        if self.session is not None:
+            async with self._session_lock:
+                await asyncio.to_thread(record_uploads, self.session, [file_key])
+
+    async def upload_images(
+        self,
+        files: List[UploadFile],
+        path: str,
+        allowed_types: Collection[str] = ALLOWED_IMAGE_TYPES,
+        variants: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload images concurrently, at most UPLOAD_MAX_PARALLEL at a time.
+
+        Returns one result per file, in order; a failed file does not stop the others.
+        """
+        outcomes = await self._upload_bounded(files, path, allowed_types, variants)
+
+        results = []
+        for file, outcome in zip(files, outcomes):
+            if isinstance(outcome, HTTPException):
+                results.append({"success": False, "filename": file.filename, "error": outcome.detail})
+            elif isinstance(outcome, FileUploadError):
+                results.append({"success": False, "filename": file.filename, "error": str(outcome)})
+            elif isinstance(outcome, BaseException):
+                results.append({"success": False, "filename": file.filename, "error": f"Upload failed: {str(outcome)}"})
+            else:
+                results.append({"success": True, "filename": file.filename, **outcome})
+        return results
+
+    async def upload_all_images(
+        self,
+        files: List[UploadFile],
+        path: str,
+        allowed_types: Collection[str] = ALLOWED_IMAGE_TYPES,
+        variants: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload images concurrently, all or nothing.
+
+        If any file fails, the objects this call stored are deleted and the first error is raised.
+        """
+        for file in files:
+            validate_image_file(file, allowed_types)
+
+        outcomes = await self._upload_bounded(files, path, allowed_types, variants)
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if errors:
+            uploaded = [
+                key
+                for outcome in outcomes if not isinstance(outcome, BaseException) and not outcome["deduplicated"]
+                for key in stored_keys(outcome["file_key"])
+            ]
+            if uploaded:
+                await asyncio.to_thread(self.bucket_manager.delete, uploaded)
+            raise errors[0]
+
+        return outcomes
+
+    async def delete_image(self, file_key: str) -> bool:
+        """
+        Delete an uploaded image and its variants unless something still uses it.
+
+        Raises 409 while product images reference it. An unreferenced upload within its grace
+        period is kept, as another upload of the same content may be about to use it, and is
+        left to the garbage collector; False is returned then.
+        """
+        if self.session is not None:
+            stored = await asyncio.to_thread(self.session.get, StoredObject, file_key)
+            if stored is not None:
+                if stored.refcount > 0:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=f"Image is still used by {stored.refcount} product image(s)"
+                    )
+                removable = await asyncio.to_thread(forget_unused, self.session, [file_key])
+                await asyncio.to_thread(self.session.commit)
+                if not removable:
+                    return False
+
+        await asyncio.to_thread(self.bucket_manager.delete, stored_keys(file_key))
+        return True
+
+    def grant_upload(self, user: AuthContext, content_type: str, size: int, method: str = "PUT") -> Dict[str, Any]:
+        """
+        Let a seller upload one product image straight to the bucket.
+
+        The bytes never pass through the API. The grant is for a fresh random key,
+        so direct uploads are not deduplicated; attaching the key to a product
+        takes the returned upload_token and verifies what was actually uploaded.
+        """
+        if user.role != UserRole.SELLER.value:
+            raise HTTPException(status_code=403, detail="Access denied. Seller role required.")
+        if content_type not in PRODUCT_IMAGE_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file type. Allowed types: {', '.join(sorted(PRODUCT_IMAGE_TYPES))}"
+            )
+        if size > settings.UPLOAD_MAX_IMAGE_BYTES:
+            raise _too_large()
+
+        file_key = generate_unique_filepath(PRODUCT_IMAGE_PATH, content_type)
+        expires_in = settings.UPLOAD_GRANT_EXPIRES_SECONDS
+        grant = {
+            "file_key": file_key,
+            "upload_token": sign_upload_grant(file_key, user.id),
+            "method": method,
+            "expires_in": expires_in,
+            "max_bytes": settings.UPLOAD_MAX_IMAGE_BYTES
+        }
+        if method == "POST":
+            post = self.bucket_manager.generate_presigned_post(
+                file_key, content_type, settings.UPLOAD_MAX_IMAGE_BYTES, expires_in
+            )
+            return {**grant, "url": post["url"], "fields": post["fields"]}
+
+        url = self.bucket_manager.generate_presigned_put_url(file_key, content_type, size, expires_in)
+        return {**grant, "url": url, "headers": {"Content-Type": content_type, "Content-Length": str(size)}}
+
+    async def verify_direct_upload(self, file_key: str, upload_token: str, user_id: int) -> Dict[str, Any]:
+        """
+        Check an image uploaded with a grant before it is used: the grant must have been issued
+        to this user for this key, and the object must exist, be within the size cap and start
+        like a supported image.
+
+        Returns its public URL, content type and size. Rejected objects are left for the bucket
+        garbage collector, as the key may be in use elsewhere.
+        """
+        if read_upload_grant(upload_token, user_id) != file_key:
+            raise HTTPException(status_code=403, detail="Upload grant is for another file")
+        # Grants are only issued for originals directly under the image path, never for variants
+        name = file_key.removeprefix(f"{PRODUCT_IMAGE_PATH}/")
+        if name == file_key or "/" in name or ".." in name:
+            raise HTTPException(status_code=400, detail="Not a product image upload")
+
+        stat = await self.bucket_manager.head(file_key)
+        if stat is None:
+            raise HTTPException(status_code=404, detail="Uploaded file not found")
+
+        if stat["size"] > settings.UPLOAD_MAX_IMAGE_BYTES:
+            raise _too_large()
+        if sniff_image_type(await self.bucket_manager.get_prefix(file_key, 64)) not in PRODUCT_IMAGE_TYPES:
+            raise HTTPException(status_code=400, detail="File content is not a supported image")
+
+        return {
+            "url": self.bucket_manager.get_public_url(file_key),
+            "content_type": stat["content_type"],
+            "size": stat["size"]
+        }
+
+    async def _upload_bounded(
+        self,
+        files: List[UploadFile],
+        path: str,
+        allowed_types: Collection[str],
+        variants: bool
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        semaphore = asyncio.Semaphore(settings.UPLOAD_MAX_PARALLEL)
+
+        async def upload(file: UploadFile) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._store_image(file, path, allowed_types, variants)
+
+        return await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, Request, Header
 from sqlalchemy.orm import Session
 
 from src.infrastructure.database import get_db
+from src.infrastructure.payments import DodoPaymentsService
+from src.shared.dependencies.services import get_dodo_payments_service
 from .service import WebhookService
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
@@ -11,14 +13,15 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 async def handle_dodo_payment_webhook(
     request: Request,
     x_signature: str = Header(..., alias="webhook-signature"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    dodo_payments: DodoPaymentsService = Depends(get_dodo_payments_service)
 ):
     """Handle DodoPayments webhook events"""
     
     # Get raw request body for signature verification
     body = await request.body()
     
-    service = WebhookService(db)
+    service = WebhookService(db, dodo_payments=dodo_payments)
     result = service.handle_dodo_payment_webhook(body, x_signature)
     
     return result
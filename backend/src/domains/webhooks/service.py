@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 from decimal import Decimal
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
@@ -7,13 +7,13 @@ from fastapi import HTTPException, status
 from src.shared.models.order import Order, OrderItem, OrderStatus, CartItem
 from src.shared.models.user import User
 from src.shared.schemas.payment import WebhookRequest
-from src.infrastructure.payments import DodoPaymentsService
+from src.infrastructure.payments import DodoPaymentsService, get_dodo_payments
 
 
 class WebhookService:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, dodo_payments: Optional[DodoPaymentsService] = None):
         self.session = session
-        self.dodo_payments = DodoPaymentsService()
+        self.dodo_payments = dodo_payments if dodo_payments is not None else get_dodo_payments()
 
     def handle_dodo_payment_webhook(
         self, 
@@ -1,5 +1,25 @@
-from src.infrastructure.bucket.manager import R2BucketManager
+import threading
+from typing import Optional
+
+from src.infrastructure.bucket.manager import R2BucketManager, build_r2_client, build_transfer_config
+
+_bucket_manager: Optional[R2BucketManager] = None
+_lock = threading.Lock()
+
+
+def get_bucket_manager() -> R2BucketManager:
+    """Return the process-wide R2 bucket manager, creating its client on first use"""
+    global _bucket_manager
+    if _bucket_manager is None:
+        with _lock:
+            if _bucket_manager is None:
+                _bucket_manager = R2BucketManager()
+    return _bucket_manager
+
 
 __all__ = [
-    "R2BucketManager"
+    "R2BucketManager",
+    "build_r2_client",
+    "build_transfer_config",
+    "get_bucket_manager"
 ]
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 import io
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 
 from fastapi import UploadFile
 
@@ -14,6 +14,14 @@ class BaseBucketManager(ABC):
     async def get_checksum(self, path: str) -> str | None:
         pass
 
+    @abstractmethod
+    async def head(self, path: str) -> dict | None:
+        pass
+
+    @abstractmethod
+    async def get_prefix(self, path: str, length: int) -> bytes:
+        pass
+
     @abstractmethod
     async def put(
         self, 
@@ -25,7 +33,26 @@ class BaseBucketManager(ABC):
         pass
 
     @abstractmethod
-    def delete(self, keys: list[str]) -> None:
+    async def put_stream(
+        self,
+        path: str,
+        chunks: AsyncIterator[bytes],
+        content_type: Optional[str] = None,
+        file_type: Optional[str] = None,
+        key: Optional[str] = None
+    ) -> tuple[str, int]:
+        pass
+
+    @abstractmethod
+    async def put_variants(self, file_key: str, renditions: dict[str, dict[str, bytes]]) -> dict[str, dict[str, str]]:
+        pass
+
+    @abstractmethod
+    def delete(self, keys: list[str]) -> list[str]:
+        pass
+
+    @abstractmethod
+    def list_objects(self, prefix: str) -> Iterator[dict]:
         pass
 
     @abstractmethod
@@ -35,3 +62,13 @@ class BaseBucketManager(ABC):
     @abstractmethod
     def generate_presigned_get_url(self, file_path: str, expiration: int = 3600) -> str | None:
         pass
+
+    @abstractmethod
+    def generate_presigned_put_url(
+        self, file_path: str, content_type: str, content_length: int, expiration: int = 600
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def generate_presigned_post(self, file_path: str, content_type: str, max_bytes: int, expiration: int = 600) -> dict:
+        pass
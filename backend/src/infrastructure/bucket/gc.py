@@ -0,0 +1,288 @@
+"""
+Garbage collection of product images nothing uses any more.
+
+Deleting a product removes its images from the bucket only when they are
+reference-counted content-addressed uploads; older random-keyed uploads,
+uploads never attached to a product and objects whose removal failed stay
+behind. This job lists the bucket under BUCKET_GC_PREFIX, keeps everything
+a ProductImage points at (with its resized variants) or that was uploaded
+within the grace period, and deletes the rest in DeleteObjects batches.
+
+The listing is taken before the references are read, so an image attached
+while the listing runs is still seen as referenced. Tracked uploads are
+checked again just before each batch is deleted, so content re-uploaded or
+attached since then is kept.
+
+Nothing is deleted when a product image URL under the prefix does not resolve
+to a key (e.g. it points at an old public domain), or when more than
+BUCKET_GC_MAX_ORPHAN_FRACTION of the listed objects look orphaned: both
+usually mean the references were misread rather than that the images are
+unused.
+
+Run it with:
+
+    python -m src.infrastructure.bucket.gc --dry-run
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from loguru import logger
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from src.infrastructure.bucket import get_bucket_manager
+from src.infrastructure.bucket.base import BaseBucketManager
+from src.infrastructure.images import VARIANTS
+from src.shared.config.cfg import settings
+from src.shared.models.product import ProductImage
+from src.shared.models.storage import StoredObject
+from src.shared.utils.timing import Timings
+
+# DeleteObjects accepts at most 1000 keys
+DELETE_BATCH_SIZE = 1000
+
+# Orphan keys listed in a report
+REPORT_SAMPLE_SIZE = 20
+
+
+def image_stem(key: str) -> str:
+    """
+    The stored image an object belongs to, as its key without extension.
+
+    Variants belong to their original: 'products/images/<id>/card.webp' and
+    'products/images/<id>.png' both give 'products/images/<id>'.
+    """
+    folder, _, name = key.rpartition("/")
+    base = name.rsplit(".", 1)[0] if "." in name else name
+    if folder and base in VARIANTS:
+        return folder
+    return f"{folder}/{base}" if folder else base
+
+
+def url_file_key(url: str, domain: str) -> Optional[str]:
+    """Key of an image URL served from the bucket's public domain, ignoring query and fragment"""
+    parts = urlsplit(url if "://" in url else f"//{url}")
+    base = domain.replace("https://", "").replace("http://", "").rstrip("/") + "/"
+    location = parts.netloc + parts.path
+    if not location.startswith(base):
+        return None
+    return location[len(base):] or None
+
+
+@dataclass
+class GCReport:
+    dry_run: bool
+    listed: int = 0
+    referenced: int = 0
+    recent: int = 0
+    orphaned: int = 0
+    orphaned_bytes: int = 0
+    deleted: int = 0
+    failed: int = 0
+    # Orphans found in use again just before their batch was deleted
+    reused: int = 0
+    aborted: Optional[str] = None
+    sample: List[str] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+    timings: Timings = field(default_factory=Timings)
+
+    def metrics(self) -> Dict[str, float]:
+        """Phase durations in milliseconds and objects handled per second"""
+        durations = self.timings.summary()
+        metrics = dict(durations)
+        if durations.get("list"):
+            metrics["listed_per_second"] = round(self.listed / durations["list"] * 1000, 1)
+        if durations.get("delete"):
+            metrics["deleted_per_second"] = round(self.deleted / durations["delete"] * 1000, 1)
+        return metrics
+
+    def summary(self) -> str:
+        if self.aborted:
+            action = "aborted, kept"
+        elif self.dry_run:
+            action = "would delete"
+        else:
+            action = f"deleted {self.deleted}, failed {self.failed}, kept {self.reused} reused of"
+        summary = (
+            f"Listed {self.listed} objects: {self.referenced} referenced, {self.recent} within the grace period, "
+            f"{action} {self.orphaned} orphans ({self.orphaned_bytes / (1024 * 1024):.1f}MB); {self.metrics()}"
+        )
+        return f"{summary}. Aborted: {self.aborted}" if self.aborted else summary
+
+
+class BucketGarbageCollector:
+    """Deletes objects under a prefix that no product image references"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        bucket_manager: Optional[BaseBucketManager] = None,
+        prefix: Optional[str] = None,
+        grace_seconds: Optional[int] = None,
+        max_orphan_fraction: Optional[float] = None
+    ):
+        self.session_factory = session_factory
+        self.bucket_manager = bucket_manager if bucket_manager is not None else get_bucket_manager()
+        self.prefix = prefix if prefix is not None else settings.BUCKET_GC_PREFIX
+        self.grace_seconds = grace_seconds if grace_seconds is not None else settings.UPLOAD_ORPHAN_GRACE_SECONDS
+        self.max_orphan_fraction = (
+            max_orphan_fraction if max_orphan_fraction is not None else settings.BUCKET_GC_MAX_ORPHAN_FRACTION
+        )
+
+    def run(self, dry_run: bool = False) -> GCReport:
+        report = GCReport(dry_run=dry_run)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+
+        with report.timings.measure("list"):
+            candidates, originals = self._list_candidates(report, cutoff)
+        with report.timings.measure("references"):
+            referenced, recent_uploads = self._load_references(report, cutoff.replace(tzinfo=None))
+
+        orphans = []
+        for key, size in candidates:
+            stem = image_stem(key)
+            if stem in referenced:
+                report.referenced += 1
+            elif stem in recent_uploads:
+                # Re-uploaded content reuses an old object, so its LastModified says nothing
+                report.recent += 1
+            else:
+                orphans.append(key)
+                report.orphaned_bytes += size
+        report.orphaned = len(orphans)
+        report.sample = orphans[:REPORT_SAMPLE_SIZE]
+
+        if report.unresolved:
+            report.aborted = (
+                f"{len(report.unresolved)} product image URLs under {self.prefix!r} do not resolve to a key "
+                f"on {settings.R2_PUBLIC_DOMAIN}"
+            )
+        elif report.listed and report.orphaned / report.listed > self.max_orphan_fraction:
+            report.aborted = (
+                f"{report.orphaned} of {report.listed} objects look orphaned, "
+                f"more than the {self.max_orphan_fraction:.0%} allowed"
+            )
+
+        if not dry_run and not report.aborted:
+            with report.timings.measure("delete"):
+                self._delete(orphans, originals, report)
+        return report
+
+    def _list_candidates(self, report: GCReport, cutoff: datetime) -> Tuple[List[Tuple[str, int]], Dict[str, str]]:
+        """
+        Objects under the prefix older than the grace period, as (key, size),
+        and the key of every listed original (not variant) by stem
+        """
+        candidates, originals = [], {}
+        for obj in self.bucket_manager.list_objects(self.prefix):
+            report.listed += 1
+            key = obj["Key"]
+            stem = image_stem(key)
+            if key.rpartition("/")[0] != stem:
+                originals[stem] = key
+            if obj["LastModified"] >= cutoff:
+                report.recent += 1
+            else:
+                candidates.append((key, obj["Size"]))
+        return candidates, originals
+
+    def _load_references(self, report: GCReport, cutoff: datetime) -> Tuple[Set[str], Set[str]]:
+        """
+        Stems of every image a product uses, and the stems of uploads still in
+        their grace period. URLs that mention the prefix but resolve to no key
+        are collected in report.unresolved.
+        """
+        with self.session_factory() as session:
+            referenced = set()
+            for url in session.scalars(select(ProductImage.image_url).execution_options(yield_per=1000)):
+                key = url_file_key(url, settings.R2_PUBLIC_DOMAIN)
+                if key:
+                    referenced.add(image_stem(key))
+                elif self.prefix in urlsplit(url).path:
+                    report.unresolved.append(url)
+
+            recent = session.scalars(select(StoredObject.key).where(StoredObject.last_uploaded_at >= cutoff))
+            return referenced, {image_stem(key) for key in recent}
+
+    def _in_use(self, batch: List[str], originals: Dict[str, str]) -> Set[str]:
+        """Stems in a batch whose tracked upload is now referenced or was uploaded again recently"""
+        keys = {originals[stem] for stem in {image_stem(key) for key in batch} if stem in originals}
+        if not keys:
+            return set()
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=self.grace_seconds)
+        with self.session_factory() as session:
+            in_use = session.scalars(
+                select(StoredObject.key).where(
+                    StoredObject.key.in_(keys),
+                    or_(StoredObject.refcount > 0, StoredObject.last_uploaded_at >= cutoff)
+                )
+            )
+            return {image_stem(key) for key in in_use}
+
+    def _delete(self, orphans: List[str], originals: Dict[str, str], report: GCReport) -> None:
+        for start in range(0, len(orphans), DELETE_BATCH_SIZE):
+            batch = orphans[start:start + DELETE_BATCH_SIZE]
+            in_use = self._in_use(batch, originals)
+            if in_use:
+                report.reused += sum(1 for key in batch if image_stem(key) in in_use)
+                batch = [key for key in batch if image_stem(key) not in in_use]
+                if not batch:
+                    continue
+            try:
+                failed = set(self.bucket_manager.delete(batch))
+            except Exception as e:
+                logger.error(f"Deleting {len(batch)} orphaned objects failed: {e}")
+                report.failed += len(batch)
+                continue
+            report.failed += len(failed)
+            removed = [key for key in batch if key not in failed]
+            report.deleted += len(removed)
+
+            # Forget tracked keys that are gone, unless something started using them meanwhile
+            with self.session_factory() as session:
+                session.execute(
+                    delete(StoredObject).where(StoredObject.key.in_(removed), StoredObject.refcount == 0)
+                )
+                session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete product images no product uses")
+    parser.add_argument("--dry-run", action="store_true", help="Report orphans without deleting them")
+    parser.add_argument("--prefix", default=None, help="Bucket prefix to sweep (default BUCKET_GC_PREFIX)")
+    parser.add_argument("--grace-seconds", type=int, default=None)
+    parser.add_argument(
+        "--max-orphan-fraction", type=float, default=None,
+        help="Abort when more of the listed objects than this look orphaned (default BUCKET_GC_MAX_ORPHAN_FRACTION)"
+    )
+    args = parser.parse_args()
+
+    from src.core.logger import setup_logger
+    from src.infrastructure.database.connection import SessionLocal
+
+    setup_logger()
+    collector = BucketGarbageCollector(
+        SessionLocal,
+        prefix=args.prefix,
+        grace_seconds=args.grace_seconds,
+        max_orphan_fraction=args.max_orphan_fraction
+    )
+    report = collector.run(dry_run=args.dry_run)
+    if report.aborted:
+        logger.error(report.summary())
+    else:
+        logger.info(report.summary())
+    for url in report.unresolved[:REPORT_SAMPLE_SIZE]:
+        logger.warning(f"Unresolved image URL: {url}")
+    for key in report.sample:
+        logger.info(f"{'Orphan' if args.dry_run or report.aborted else 'Deleted'}: {key}")
+    if report.aborted:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
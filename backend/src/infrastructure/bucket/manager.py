@@ -1,26 +1,55 @@
+import asyncio
 import io
+from typing import AsyncIterator, Iterator
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from loguru import logger
 
 from src.infrastructure.bucket.base import BaseBucketManager
 from src.shared.exceptions import FileUploadError, PresignedUrlError, FileDeleteError
-from src.shared.utils.bucket import generate_unique_filepath, get_public_url
+from src.shared.utils.bucket import generate_unique_filepath, get_public_url, variant_key
 from src.shared.config import settings
 
 
-class R2BucketManager(BaseBucketManager):
-    _client: boto3.Session
+def build_r2_client():
+    """
+    S3 client for R2 with a pooled keep-alive connection set, timeouts and retries from settings.
+
+    boto3 clients are thread-safe once created, so one is shared by the whole process.
+    """
+    return boto3.session.Session().client(
+        service_name='s3',
+        endpoint_url=settings.R2_ENDPOINT_URL or None,
+        aws_access_key_id=settings.R2_ACCESS_KEY_ID.get_secret_value(),
+        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY.get_secret_value(),
+        region_name='auto',
+        config=Config(
+            max_pool_connections=settings.R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.R2_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.R2_READ_TIMEOUT_SECONDS,
+            retries={"total_max_attempts": settings.R2_MAX_ATTEMPTS, "mode": "standard"},
+            tcp_keepalive=True,
+        ))
+
 
-    def __init__(self):
+def build_transfer_config() -> TransferConfig:
+    """Multipart thresholds and upload concurrency from settings"""
+    return TransferConfig(
+        multipart_threshold=settings.R2_MULTIPART_THRESHOLD_BYTES,
+        multipart_chunksize=settings.R2_MULTIPART_CHUNK_BYTES,
+        max_concurrency=settings.R2_TRANSFER_MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+class R2BucketManager(BaseBucketManager):
+    def __init__(self, client=None, transfer_config: TransferConfig | None = None):
         super().__init__()
-        self._client = boto3.client(
-            service_name='s3',
-            endpoint_url=settings.R2_ENDPOINT_URL,
-            aws_access_key_id=settings.R2_ACCESS_KEY_ID.get_secret_value(),
-            aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY.get_secret_value(),
-            region_name='auto')
+        self._client = client if client is not None else build_r2_client()
+        self._transfer_config = transfer_config if transfer_config is not None else build_transfer_config()
 
     def get(
             self,
@@ -38,19 +67,52 @@ class R2BucketManager(BaseBucketManager):
             raise FileUploadError(
                 f"Error getting file from R2: {e}")
 
-    async def get_checksum(self, path: str) -> str:
+    async def get_checksum(self, path: str) -> str | None:
+        """ETag of the object at path, or None if there is no such object"""
+        response = await asyncio.to_thread(self._head_object, path)
+        return response["ETag"] if response else None
+
+    async def head(self, path: str) -> dict | None:
+        """Size, content type and ETag of the object at path, or None if there is no such object"""
+        response = await asyncio.to_thread(self._head_object, path)
+        if response is None:
+            return None
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType"),
+            "etag": response["ETag"]
+        }
+
+    def _head_object(self, path: str) -> dict | None:
         try:
-            response = self._client.head_object(
+            return self._client.head_object(
                 Bucket=settings.R2_BUCKET_NAME,
                 Key=path,
             )
-            return response["ETag"]
-        except self._client.exceptions.NoSuchKey:
-            return None
+        except ClientError as e:
+            # HEAD responses have no body, so a missing key surfaces as a bare 404
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise FileUploadError(
+                f"Error getting file checksum from R2: {e}")
         except Exception as e:
             raise FileUploadError(
                 f"Error getting file checksum from R2: {e}")
 
+    async def get_prefix(self, path: str, length: int) -> bytes:
+        """The first length bytes of an object, fetched with a ranged GET"""
+        def read() -> bytes:
+            response = self._client.get_object(
+                Bucket=settings.R2_BUCKET_NAME, Key=path, Range=f"bytes=0-{length - 1}"
+            )
+            return response["Body"].read()
+
+        try:
+            return await asyncio.to_thread(read)
+        except Exception as e:
+            raise FileUploadError(
+                f"Error reading file from R2: {e}")
+
     async def put(
             self,
             path: str,
@@ -67,38 +129,162 @@ class R2BucketManager(BaseBucketManager):
         """
         try:
             unique_key = generate_unique_filepath(path, file_type)
-            self._client.upload_fileobj(
+            # boto3 blocks; run it on a worker thread so the event loop keeps serving
+            await asyncio.to_thread(
+                self._client.upload_fileobj,
                 file_buffer,
                 Bucket=settings.R2_BUCKET_NAME,
                 Key=unique_key,
                 ExtraArgs={
                     "ContentType": content_type
-                }
+                },
+                Config=self._transfer_config
             )
             return unique_key
         except Exception as e:
             raise FileUploadError(
                 f"Error uploading file to R2: {e}")
 
+    async def put_stream(
+            self,
+            path: str,
+            chunks: AsyncIterator[bytes],
+            content_type: str | None = None,
+            file_type: str | None = None,
+            key: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Uploads a file to R2 storage from an async iterator of chunks.
+
+        It is stored under key when given, otherwise under a new unique key in path.
+
+        Files smaller than one multipart chunk go up in a single PUT, larger ones
+        as a multipart upload holding one part in memory at a time. Errors raised
+        by the chunk source propagate unchanged once any partial upload is aborted.
+        :return: The unique key of the uploaded file and its size in bytes.
+        """
+        unique_key = key or generate_unique_filepath(path, file_type)
+        target = {"Bucket": settings.R2_BUCKET_NAME, "Key": unique_key}
+        extra = {"ContentType": content_type} if content_type else {}
+        part_size = self._transfer_config.multipart_chunksize
+
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        parts = []
+
+        async def upload_part(body: bytes):
+            response = await self._call(
+                self._client.upload_part, **target, UploadId=upload_id, PartNumber=len(parts) + 1, Body=body
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": len(parts) + 1})
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        response = await self._call(self._client.create_multipart_upload, **target, **extra)
+                        upload_id = response["UploadId"]
+                    await upload_part(bytes(buffer[:part_size]))
+                    del buffer[:part_size]
+
+            if upload_id is None:
+                await self._call(self._client.put_object, **target, Body=bytes(buffer), **extra)
+            else:
+                if buffer:
+                    await upload_part(bytes(buffer))
+                await self._call(
+                    self._client.complete_multipart_upload, **target, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+            return unique_key, size
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await asyncio.to_thread(self._client.abort_multipart_upload, **target, UploadId=upload_id)
+                except Exception as e:
+                    logger.warning("Could not abort multipart upload of {}: {}", unique_key, e)
+            raise
+
+    async def put_variants(
+            self,
+            file_key: str,
+            renditions: dict[str, dict[str, bytes]],
+    ) -> dict[str, dict[str, str]]:
+        """
+        Uploads the resized variants of a stored image next to it, concurrently.
+
+        Variant keys are unique per original and never rewritten, so they are
+        marked cacheable forever.
+        :return: Public URL of each variant, by variant name and format.
+        """
+        uploads = [
+            (variant, fmt, variant_key(file_key, variant, fmt), body)
+            for variant, encoded in renditions.items()
+            for fmt, body in encoded.items()
+        ]
+        await asyncio.gather(*(
+            self._call(
+                self._client.put_object,
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=key,
+                Body=body,
+                ContentType=f"image/{fmt}",
+                CacheControl="public, max-age=31536000, immutable"
+            )
+            for _, fmt, key, body in uploads
+        ))
+
+        urls: dict[str, dict[str, str]] = {}
+        for variant, fmt, key, _ in uploads:
+            urls.setdefault(variant, {})[fmt] = self.get_public_url(key)
+        return urls
+
+    async def _call(self, method, **kwargs):
+        """Run a blocking client call on a worker thread"""
+        try:
+            return await asyncio.to_thread(method, **kwargs)
+        except Exception as e:
+            raise FileUploadError(
+                f"Error uploading file to R2: {e}") from e
+
     def delete(
             self,
             keys: list[str]
-    ) -> None:
+    ) -> list[str]:
+        """
+        Deletes objects, 1000 per request (the DeleteObjects maximum).
+        :return: The keys the bucket reported it could not delete.
+        """
+        failed = []
         if keys:
             delete_keys = [{"Key": key} for key in keys]
             for i in range(0, len(delete_keys), 1000):
                 batch = delete_keys[i:i + 1000]
                 try:
-                    self._client.delete_objects(
+                    response = self._client.delete_objects(
                         Bucket=settings.R2_BUCKET_NAME,
-                        Delete={"Objects": batch}
+                        Delete={"Objects": batch, "Quiet": True}
                     )
+                    failed.extend(error["Key"] for error in response.get("Errors", []))
                 except ClientError as e:
                     raise FileDeleteError(
                         f"Error deleting objects from R2: {e}")
                 except Exception as e:
                     raise FileDeleteError(
                         f"Unexpected error deleting objects from R2: {e}")
+        return failed
+
+    def list_objects(self, prefix: str) -> Iterator[dict]:
+        """
+        Every object under prefix, one listing page (up to 1000 keys) fetched at a time.
+
+        Yields the listing entries: Key, Size, LastModified, ETag.
+        """
+        paginator = self._client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=settings.R2_BUCKET_NAME, Prefix=prefix):
+            yield from page.get("Contents", [])
 
     def delete_folder(
             self,
@@ -107,19 +293,10 @@ class R2BucketManager(BaseBucketManager):
         if not folder_prefix.endswith("/"):
             folder_prefix += "/"
 
-        objects_to_delete = []
         try:
-            paginator = self._client.get_paginator('list_objects_v2')
-            pages = paginator.paginate(
-                Bucket=settings.R2_BUCKET_NAME, Prefix=folder_prefix)
-
-            for page in pages:
-                if "Contents" in page:
-                    for obj in page["Contents"]:
-                        objects_to_delete.append({"Key": obj["Key"]})
-
-            if objects_to_delete:
-                self.delete([obj["Key"] for obj in objects_to_delete])
+            keys = [obj["Key"] for obj in self.list_objects(folder_prefix)]
+            if keys:
+                self.delete(keys)
 
         except ClientError as e:
             raise FileDeleteError(
@@ -148,6 +325,64 @@ class R2BucketManager(BaseBucketManager):
             raise PresignedUrlError(
                 f"Unexpected error generating presigned URL: {e}")
 
+    def generate_presigned_put_url(
+            self,
+            file_path: str,
+            content_type: str,
+            content_length: int,
+            expiration: int = 600
+    ) -> str:
+        """
+        URL a client can PUT one object to directly.
+
+        Content-Type and Content-Length are signed, so the upload must carry
+        exactly the declared type and size.
+        """
+        try:
+            return self._client.generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': settings.R2_BUCKET_NAME,
+                    'Key': file_path,
+                    'ContentType': content_type,
+                    'ContentLength': content_length
+                },
+                ExpiresIn=expiration,
+                HttpMethod='PUT'
+            )
+        except Exception as e:
+            raise PresignedUrlError(
+                f"Unexpected error generating presigned URL: {e}")
+
+    def generate_presigned_post(
+            self,
+            file_path: str,
+            content_type: str,
+            max_bytes: int,
+            expiration: int = 600
+    ) -> dict:
+        """
+        URL and form fields for a browser form upload of one object (S3 POST policy).
+
+        The policy pins the key and content type and bounds the size. R2 does not
+        accept POST uploads; use presigned PUT there.
+        :return: {"url": ..., "fields": {...}}
+        """
+        try:
+            return self._client.generate_presigned_post(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=file_path,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_bytes]
+                ],
+                ExpiresIn=expiration
+            )
+        except Exception as e:
+            raise PresignedUrlError(
+                f"Unexpected error generating presigned POST: {e}")
+
     def get_public_url(self, file_key: str) -> str:
         """
         Get the public URL for a file stored in R2.
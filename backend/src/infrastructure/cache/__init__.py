@@ -0,0 +1,52 @@
+import threading
+from typing import Optional
+
+from src.infrastructure.cache.base import BaseCache
+from src.infrastructure.cache.memory import MemoryCache
+from src.infrastructure.cache.redis import RedisCache
+from src.infrastructure.cache.tiered import TieredCache
+from src.shared.config.cfg import settings
+
+_cache: Optional[BaseCache] = None
+_shared: Optional[BaseCache] = None
+_lock = threading.Lock()
+
+
+def get_shared_cache() -> BaseCache:
+    """
+    Return the cache every worker sees: Redis when CACHE_REDIS_URL is set.
+
+    Without it this falls back to a process-local store, which is only shared
+    by everyone in single-worker deployments.
+    """
+    global _shared
+    if _shared is None:
+        with _lock:
+            if _shared is None:
+                _shared = RedisCache(settings.CACHE_REDIS_URL) if settings.CACHE_REDIS_URL else MemoryCache()
+    return _shared
+
+
+def get_cache() -> BaseCache:
+    """Return the process-wide cache: a local LRU, backed by Redis when CACHE_REDIS_URL is set"""
+    global _cache
+    if _cache is None:
+        shared = get_shared_cache() if settings.CACHE_REDIS_URL else None
+        with _lock:
+            if _cache is None:
+                _cache = TieredCache(
+                    local=MemoryCache(max_entries=settings.CACHE_LOCAL_MAX_ENTRIES),
+                    shared=shared,
+                    local_ttl_seconds=settings.CACHE_LOCAL_TTL_SECONDS
+                )
+    return _cache
+
+
+__all__ = [
+    "BaseCache",
+    "MemoryCache",
+    "RedisCache",
+    "TieredCache",
+    "get_cache",
+    "get_shared_cache"
+]
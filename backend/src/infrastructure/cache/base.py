@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class BaseCache(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None on a miss"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store a value that expires after ttl_seconds"""
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Drop the given keys, ignoring the ones that are not cached"""
+        pass
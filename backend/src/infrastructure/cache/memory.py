@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.infrastructure.cache.base import BaseCache
+
+
+class MemoryCache(BaseCache):
+    """
+    Thread-safe in-process cache with per-entry TTL.
+
+    With max_entries set it evicts least recently used entries, which makes it
+    the in-process tier of TieredCache. Unbounded, it stands in for the shared
+    tier in tests and single-process deployments; entries that must not be
+    evicted early (revoked tokens) live there, so expired ones are swept out on
+    writes at most every sweep_interval_seconds instead.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, sweep_interval_seconds: float = 60) -> None:
+        self.max_entries = max_entries
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_sweep:
+                self._sweep(now)
+            self._entries[key] = (now + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def _sweep(self, now: float) -> None:
+        """Drop every expired entry; the caller holds the lock"""
+        for key in [key for key, (expires_at, _) in self._entries.items() if expires_at < now]:
+            del self._entries[key]
+        self._next_sweep = now + self.sweep_interval_seconds
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
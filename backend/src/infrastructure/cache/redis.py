@@ -0,0 +1,26 @@
+from typing import Optional
+
+from src.infrastructure.cache.base import BaseCache
+
+
+class RedisCache(BaseCache):
+    """Shared cache tier on Redis or any server speaking its protocol (Valkey, KeyDB, ...)"""
+
+    def __init__(self, url: str, prefix: str = "team1gc:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package is not installed (pip install redis)") from e
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from loguru import logger
+
+from src.infrastructure.cache.base import BaseCache
+
+
+class TieredCache(BaseCache):
+    """
+    In-process tier in front of an optional shared tier.
+
+    Deletes only reach the local tier of the worker that issued them, so local
+    entries live at most local_ttl_seconds; that bounds how long other workers
+    can serve a value invalidated elsewhere. The shared tier is best effort:
+    its errors are logged and treated as misses.
+    """
+
+    def __init__(self, local: BaseCache, shared: Optional[BaseCache] = None, local_ttl_seconds: float = 5) -> None:
+        self.local = local
+        self.shared = shared
+        self.local_ttl_seconds = local_ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            value = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared cache get failed for {key}: {e}")
+            return None
+
+        if value is not None:
+            self.local.set(key, value, self.local_ttl_seconds)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self.local.set(key, value, min(ttl_seconds, self.local_ttl_seconds))
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Shared cache set failed for {key}: {e}")
+
+    def delete(self, *keys: str) -> None:
+        self.local.delete(*keys)
+        if self.shared is not None:
+            try:
+                self.shared.delete(*keys)
+            except Exception as e:
+                logger.error(f"Shared cache delete failed for {keys}: {e}")
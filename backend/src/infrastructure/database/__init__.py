@@ -1,6 +1,8 @@
 from .connection import get_db, Base
+from .async_session import get_async_db
 
 __all__ = [
     "get_db",
+    "get_async_db",
     "Base"
 ]
\ No newline at end of file
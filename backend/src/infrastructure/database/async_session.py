@@ -0,0 +1,103 @@
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+from fastapi import Request
+from pydantic import TypeAdapter
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from src.infrastructure.database.pool import get_engine_options, instrument_engine
+from src.infrastructure.database.routing import ReplicaSet, RoutingSession
+from src.shared.config.cfg import settings
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+_lock = threading.Lock()
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Swap the sync driver of a database URL for its asyncio counterpart"""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Lazily create the process-wide async engine"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        with _lock:
+            if _async_engine is None:
+                database_url = get_async_database_url(settings.get_database_url)
+                _async_engine = create_async_engine(
+                    database_url,
+                    echo=settings.DEBUG,
+                    **get_engine_options(database_url, is_async=True)
+                )
+                instrument_engine(_async_engine.sync_engine, "async")
+
+                replica_engines = []
+                for index, replica_url in enumerate(settings.get_replica_urls):
+                    replica_url = get_async_database_url(replica_url)
+                    replica_engine = create_async_engine(
+                        replica_url,
+                        echo=settings.DEBUG,
+                        **get_engine_options(replica_url, is_async=True)
+                    )
+                    instrument_engine(replica_engine.sync_engine, f"async-replica-{index}")
+                    replica_engines.append(replica_engine.sync_engine)
+
+                _async_sessionmaker = async_sessionmaker(
+                    bind=_async_engine,
+                    sync_session_class=RoutingSession,
+                    autoflush=False,
+                    expire_on_commit=False,
+                    replicas=ReplicaSet(replica_engines)
+                )
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    get_async_engine()
+    return _async_sessionmaker
+
+
+# Dependency to get async database session
+async def get_async_db(request: Request) -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        db.info["request_state"] = request.state  # Sticky key for replica routing
+        yield db
+
+
+async def run_sync_service(
+    session: AsyncSession,
+    service_factory: Callable[[Session], Any],
+    method: str,
+    *args: Any,
+    response_type: Any = None,
+    **kwargs: Any
+) -> Any:
+    """
+    Run a sync service method on an AsyncSession without blocking the event loop.
+
+    The service gets the AsyncSession's underlying Session, and every query it
+    issues, lazy loads included, goes through the async driver. Pass response_type
+    when the method returns ORM objects, so they are serialized before leaving
+    that context.
+    """
+    def call(sync_session: Session) -> Any:
+        result = getattr(service_factory(sync_session), method)(*args, **kwargs)
+        if response_type is not None:
+            return TypeAdapter(response_type).validate_python(result, from_attributes=True)
+        return result
+
+    return await session.run_sync(call)
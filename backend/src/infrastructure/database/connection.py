@@ -1,6 +1,13 @@
-from sqlalchemy import create_engine, MetaData
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request
+from src.infrastructure.database.pool import get_engine_options, instrument_engine
+from src.infrastructure.database.routing import ReplicaSet, RoutingSession
 from src.shared.config.cfg import settings
 import logging
 
@@ -12,30 +19,74 @@ SQLALCHEMY_DATABASE_URL = settings.get_database_url
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_recycle=300,    # Recycle connections every 5 minutes
-    echo=settings.DEBUG  # Log SQL queries in debug mode
+    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **get_engine_options(SQLALCHEMY_DATABASE_URL)  # Pool sizing, pre-ping and recycle from settings
 )
+instrument_engine(engine, "primary")
+
+replica_engines = []
+for index, replica_url in enumerate(settings.get_replica_urls):
+    replica_engine = create_engine(replica_url, echo=settings.DEBUG, **get_engine_options(replica_url))
+    instrument_engine(replica_engine, f"replica-{index}")
+    replica_engines.append(replica_engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Read-only service methods are routed to the replicas, see routing.py
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    replicas=ReplicaSet(replica_engines)
+)
 
 Base = declarative_base()
 
+# Revision that matches the schema Base.metadata.create_all used to build.
+# Databases created before migrations existed are stamped with it on first run.
+INITIAL_REVISION = "0001"
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+
+
+def import_models():
+    """Import all models to ensure they are registered with Base"""
+    from src.shared.models.user import User
+    from src.shared.models.product import Product, ProductImage
+    from src.shared.models.order import Order, OrderItem, CartItem
+    from src.shared.models.payments import Customer, ProductSyncTask
+    from src.shared.models.storage import StoredObject
+    from src.shared.models.auth import RevokedToken
+
+
+def get_alembic_config(connection=None) -> Config:
+    """Alembic config pointing at the bundled migrations, optionally bound to a connection"""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def run_migrations(revision: str = "head", bind=None):
+    """Upgrade the database schema to the given Alembic revision"""
+    with (bind or engine).begin() as connection:
+        config = get_alembic_config(connection)
+        tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables and "users" in tables:
+            logger.info(f"Existing schema without migration history, stamping {INITIAL_REVISION}")
+            command.stamp(config, INITIAL_REVISION)
+        command.upgrade(config, revision)
+
+
 def create_tables():
-    """Create all tables in the database"""
+    """Create or upgrade all tables in the database by applying migrations"""
     try:
-        # Import all models to ensure they are registered with Base
-        from src.shared.models.user import User
-        from src.shared.models.product import Product, ProductImage
-        from src.shared.models.order import Order, OrderItem, CartItem
-        from src.shared.models.payments import Customer
-        
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully!")
+        logger.info("Applying database migrations...")
+        run_migrations()
+        logger.info("Database migrations applied successfully!")
         
     except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
+        logger.error(f"Error applying database migrations: {e}")
         raise
 
 def init_database():
@@ -47,8 +98,9 @@ def init_database():
     # seed_initial_data()
 
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["request_state"] = request.state  # Sticky key for replica routing
     try:
         yield db
     finally:
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from enum import StrEnum
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from src.shared.config.cfg import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CountStrategy(StrEnum):
+    EXACT = "exact"          # COUNT(*) on every request
+    CACHED = "cached"        # COUNT(*) once per filter signature, reused for a TTL
+    ESTIMATED = "estimated"  # Table statistics when unfiltered, cached-exact otherwise
+
+
+class CountCache:
+    """Bounded, thread-safe TTL cache of row counts keyed by filter signature"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+def count_signature(table_name: str, **filters: Any) -> str:
+    """Build a stable cache key for a filtered count"""
+    normalized = {key: str(value) for key, value in filters.items() if value not in (None, "")}
+    raw = json.dumps({"table": table_name, "filters": normalized}, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def estimate_table_rows(session: Session, table_name: str) -> Optional[int]:
+    """Read the planner's row estimate for a table, or None if the backend has none"""
+    dialect = session.get_bind().dialect.name
+    try:
+        if dialect == "mysql":
+            return session.execute(
+                text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+                ),
+                {"table_name": table_name},
+            ).scalar()
+        if dialect == "sqlite":
+            stat = session.execute(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table_name LIMIT 1"),
+                {"table_name": table_name},
+            ).scalar()
+            return int(stat.split()[0]) if stat else None
+    except Exception as e:
+        # sqlite_stat1 only exists after ANALYZE; any failure just means "no estimate"
+        logger.debug(f"No row estimate for {table_name}: {e}")
+    return None
+
+
+def count_query(
+    query: Query,
+    strategy: CountStrategy,
+    table_name: str,
+    signature: str,
+    filtered: bool,
+) -> Tuple[int, bool]:
+    """
+    Count the rows matched by a query using the requested strategy.
+
+    Returns (total, is_estimate). Cached counts may lag behind writes by up to
+    COUNT_CACHE_TTL_SECONDS; only the statistics-based path sets is_estimate.
+    """
+    if strategy == CountStrategy.ESTIMATED and not filtered:
+        estimate = estimate_table_rows(query.session, table_name)
+        if estimate is not None:
+            return int(estimate), True
+
+    if strategy == CountStrategy.EXACT:
+        return query.count(), False
+
+    cached = count_cache.get(signature)
+    if cached is not None:
+        return cached, False
+
+    total = query.count()
+    count_cache.set(signature, total)
+    return total, False
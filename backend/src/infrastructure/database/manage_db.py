@@ -13,12 +13,14 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.infrastructure.database.connection import engine, Base, create_tables
+from sqlalchemy import text
+
+from src.infrastructure.database.connection import engine, Base, create_tables, import_models
 from src.core.logger import setup_logger
 import logging
 
 def create_all_tables():
-    """Create all database tables"""
+    """Create all database tables by applying migrations"""
     logger = logging.getLogger(__name__)
     try:
         logger.info("Creating all database tables...")
@@ -35,12 +37,13 @@ def drop_all_tables():
         logger.warning("Dropping all database tables...")
         
         # Import all models to ensure they are registered
-        from src.shared.models.user import User
-        from src.shared.models.product import Product, ProductImage
-        from src.shared.models.order import Order, OrderItem, CartItem
-        from src.shared.models.payments import Customer
+        import_models()
         
         Base.metadata.drop_all(bind=engine)
+        
+        # Forget migration history so the next create starts from the first revision
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
         logger.info("All tables dropped successfully!")
     except Exception as e:
         logger.error(f"Failed to drop tables: {e}")
@@ -0,0 +1,84 @@
+"""hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 14:54:44.791408
+
+Composite indexes matched to the filters and orderings used by the buyer,
+seller, supplier and webhook services, plus the FULLTEXT index used by
+catalog search on MySQL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns) for every plain index added by this revision
+INDEXES = [
+    # Catalog: default newest-first listing and keyset pagination tie-breaker on id
+    ('ix_products_created_at_id', 'products', ['created_at', 'id']),
+    ('ix_products_price_id', 'products', ['price', 'id']),
+    ('ix_products_name_id', 'products', ['name', 'id']),
+    # Catalog filtered by product_type
+    ('ix_products_product_type_created_at', 'products', ['product_type', 'created_at']),
+    # Seller product listing and analytics: WHERE seller_id = ? ORDER BY created_at DESC
+    ('ix_products_seller_id_created_at', 'products', ['seller_id', 'created_at']),
+    # Cart reads, add_to_cart lookup and the webhook clearing a user's cart
+    ('ix_cart_items_user_id_product_id', 'cart_items', ['user_id', 'product_id']),
+    # Buyer order history: WHERE user_id = ? ORDER BY created_at DESC
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at']),
+    # Supplier approval queue and per-status counts
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at']),
+    # Supplier listing of all orders
+    ('ix_orders_created_at', 'orders', ['created_at']),
+    # Seller order views and the pending-order check before deleting a product
+    ('ix_order_items_product_id_order_id', 'order_items', ['product_id', 'order_id']),
+    # Customer lookup during checkout
+    ('ix_customers_user_id', 'customers', ['user_id']),
+]
+
+# Foreign keys whose implicit MySQL index gets replaced by one of the indexes above.
+# MySQL refuses to drop an index a foreign key relies on, so downgrade recreates these first.
+FOREIGN_KEY_COLUMNS = [
+    ('products', 'seller_id'),
+    ('cart_items', 'user_id'),
+    ('orders', 'user_id'),
+    ('order_items', 'product_id'),
+    ('customers', 'user_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index(
+            'ix_products_name_description_fulltext',
+            'products',
+            ['name', 'description'],
+            unique=False,
+            mysql_prefix='FULLTEXT'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_mysql = op.get_bind().dialect.name == 'mysql'
+
+    if is_mysql:
+        op.drop_index('ix_products_name_description_fulltext', table_name='products')
+        for table, column in FOREIGN_KEY_COLUMNS:
+            op.create_index(f'fk_{table}_{column}', table, [column], unique=False)
+
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,59 @@
+"""unique cart items
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 18:20:11.304512
+
+Makes (user_id, product_id) unique on cart_items so add-to-cart can upsert.
+Duplicate rows left by concurrent adds are merged into the oldest one first,
+summing their quantities.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _merge_duplicate_cart_items(connection) -> None:
+    duplicates = connection.execute(sa.text(
+        "SELECT user_id, product_id FROM cart_items "
+        "GROUP BY user_id, product_id HAVING COUNT(*) > 1"
+    )).all()
+
+    for user_id, product_id in duplicates:
+        rows = connection.execute(sa.text(
+            "SELECT id, quantity FROM cart_items "
+            "WHERE user_id = :user_id AND product_id = :product_id "
+            "ORDER BY created_at, id"
+        ), {"user_id": user_id, "product_id": product_id}).all()
+
+        keep, *extra = rows
+        connection.execute(
+            sa.text("UPDATE cart_items SET quantity = :quantity WHERE id = :id"),
+            {"quantity": sum(quantity for _, quantity in rows), "id": keep.id}
+        )
+        connection.execute(
+            sa.text("DELETE FROM cart_items WHERE id IN :ids").bindparams(sa.bindparam("ids", expanding=True)),
+            {"ids": [row.id for row in extra]}
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _merge_duplicate_cart_items(op.get_bind())
+    # Created before the old index is dropped so the user_id foreign key always has an index on MySQL
+    op.create_index('uq_cart_items_user_id_product_id', 'cart_items', ['user_id', 'product_id'], unique=True)
+    op.drop_index('ix_cart_items_user_id_product_id', table_name='cart_items')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_cart_items_user_id_product_id', 'cart_items', ['user_id', 'product_id'], unique=False)
+    op.drop_index('uq_cart_items_user_id_product_id', table_name='cart_items')
@@ -0,0 +1,51 @@
+"""product sync outbox
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 19:02:37.518240
+
+Outbox of products waiting to be pushed to DodoPayments by the product sync
+worker.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_sync_outbox',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('product_id', sa.String(length=36), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('claimed_by', sa.String(length=36), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_sync_outbox_next_attempt_at', 'product_sync_outbox', ['next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_product_sync_outbox_product_id'), 'product_sync_outbox', ['product_id'], unique=False)
+
+    # Products created before the worker existed and never bought are still unsynced
+    op.execute(
+        "INSERT INTO product_sync_outbox (product_id, attempts, next_attempt_at, created_at) "
+        "SELECT id, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP FROM products WHERE dodo_product_id IS NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_product_sync_outbox_product_id'), table_name='product_sync_outbox')
+    op.drop_index('ix_product_sync_outbox_next_attempt_at', table_name='product_sync_outbox')
+    op.drop_table('product_sync_outbox')
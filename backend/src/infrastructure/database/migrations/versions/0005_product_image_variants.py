@@ -0,0 +1,30 @@
+"""product image variants
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 21:14:03.204117
+
+URLs of the resized WebP/AVIF renditions generated for each product image.
+Images uploaded before this stay without variants and are served as-is.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('product_images', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('product_images', 'variants')
@@ -0,0 +1,36 @@
+"""stored objects
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 22:37:51.660942
+
+Reference counts of content-addressed uploads. Objects uploaded before
+this under random keys are not tracked and never removed by it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_objects',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('last_uploaded_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stored_objects')
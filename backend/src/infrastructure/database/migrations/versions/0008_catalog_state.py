@@ -0,0 +1,38 @@
+"""catalog state
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 11:03:47.902516
+
+Listing ETags come from the newest products.updated_at, which the new
+index makes a single lookup, and from a count of catalog changes kept in
+the one catalog_state row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    catalog_state = op.create_table('catalog_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('changes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(catalog_state, [{'id': 1, 'changes': 0}])
+    op.create_index('ix_products_updated_at', 'products', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_updated_at', table_name='products')
+    op.drop_table('catalog_state')
@@ -0,0 +1,194 @@
+"""
+Connection pool sizing and metrics.
+
+Every uvicorn worker is its own process with its own engines, so the pool
+settings apply per worker. When DB_MAX_CONNECTIONS is set, each pool is shrunk
+so that all workers together stay within that budget.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.shared.config.cfg import settings
+
+# Upper bounds of the checkout wait histogram, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Each worker opens a sync and an async engine, both drawing on the connection budget
+ENGINES_PER_WORKER = 2
+
+
+class WaitHistogram:
+    """Cumulative histogram of how long checkouts waited for a connection"""
+
+    def __init__(self, buckets_ms: Tuple[int, ...] = WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._counts = [0] * (len(buckets_ms) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = bisect_left(self.buckets_ms, seconds * 1000)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._max = max(self._max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total, max_seconds = self._sum, self._max
+
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets_ms, counts):
+            cumulative += count
+            buckets[f"le_{bound}ms"] = cumulative
+        cumulative += counts[-1]
+        buckets["le_inf"] = cumulative
+
+        return {
+            "buckets": buckets,
+            "count": cumulative,
+            "sum_seconds": round(total, 6),
+            "max_seconds": round(max_seconds, 6),
+        }
+
+
+class PoolMetrics:
+    """Event counters and checkout wait times for one engine's pool"""
+
+    COUNTERS = ("connects", "checkouts", "checkins", "invalidations", "soft_invalidations", "timeouts")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait = WaitHistogram()
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def listen(self, pool: Pool):
+        """Register the pool event listeners feeding the counters"""
+        event.listen(pool, "connect", lambda *args: self.increment("connects"))
+        event.listen(pool, "checkout", lambda *args: self.increment("checkouts"))
+        event.listen(pool, "checkin", lambda *args: self.increment("checkins"))
+        event.listen(pool, "invalidate", lambda *args: self.increment("invalidations"))
+        event.listen(pool, "soft_invalidate", lambda *args: self.increment("soft_invalidations"))
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "name": self.name,
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **counters,
+            "wait": self.wait.snapshot(),
+        }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout spent waiting on the pool queue or opening a connection"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.increment("timeouts")
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.wait.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: Dict[str, Engine] = {}
+_registry_lock = threading.Lock()
+
+
+def get_pool_size() -> Tuple[int, int]:
+    """Return (pool_size, max_overflow) for one engine of this worker"""
+    pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    if settings.DB_MAX_CONNECTIONS > 0:
+        pools = max(1, settings.UVICORN_WORKERS) * ENGINES_PER_WORKER
+        budget = max(1, settings.DB_MAX_CONNECTIONS // pools)
+        pool_size = min(pool_size, budget)
+        max_overflow = min(max_overflow, budget - pool_size)
+    return pool_size, max_overflow
+
+
+def get_engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine built from the pool settings"""
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    # SQLite picks its own pool class, in-memory databases can't use a queue pool
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return options
+
+    pool_size, max_overflow = get_pool_size()
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    )
+    return options
+
+
+def instrument_engine(engine: Engine, name: str) -> Optional[PoolMetrics]:
+    """Attach metrics to an engine created with get_engine_options; pass AsyncEngine.sync_engine"""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedPoolMixin):
+        return None
+
+    metrics = PoolMetrics(name)
+    metrics.listen(pool)
+    pool.metrics = metrics
+    with _registry_lock:
+        _engines[name] = engine
+    return metrics
+
+
+def get_pool_metrics() -> List[Dict[str, Any]]:
+    """Snapshot the pools of every instrumented engine in this worker"""
+    with _registry_lock:
+        engines = list(_engines.values())
+    return [
+        engine.pool.metrics.snapshot(engine.pool)
+        for engine in engines
+        if getattr(engine.pool, "metrics", None) is not None
+    ]
@@ -0,0 +1,182 @@
+"""
+Read-replica routing.
+
+Sessions handed out by get_db and get_async_db are RoutingSessions. Everything
+runs on the primary except SELECTs issued inside a @read_only service method,
+which go to a healthy replica unless:
+
+- the session has already written in this request, or
+- the caller committed a write within DB_REPLICA_STICKY_SECONDS, so a lagging
+  replica could still be missing it (the caller is identified by the sticky
+  key get_current_user stores on the request).
+
+A replica that fails with an OperationalError is taken out of rotation for
+DB_REPLICA_RETRY_SECONDS and the read is retried, ending up on the primary
+once no replica is left.
+"""
+
+import functools
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.shared.config.cfg import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Bound on remembered writers; expired entries are pruned once it is reached
+MAX_TRACKED_WRITERS = 10_000
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping the ones marked down"""
+
+    def __init__(self, engines: Sequence[Engine] = ()):
+        self.engines = list(engines)
+        self._down_until: Dict[Engine, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def choose(self) -> Optional[Engine]:
+        if not self.engines:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._counter)
+            for offset in range(len(self.engines)):
+                engine = self.engines[(start + offset) % len(self.engines)]
+                if self._down_until.get(engine, 0) <= now:
+                    return engine
+        return None
+
+    def mark_down(self, engine: Engine):
+        logger.warning(f"Replica {engine.url.host} failed, routing its reads to other databases")
+        with self._lock:
+            self._down_until[engine] = time.monotonic() + settings.DB_REPLICA_RETRY_SECONDS
+
+
+class WriteTracker:
+    """Remembers recent writers so their reads stay on the primary until replicas catch up"""
+
+    def __init__(self):
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expires) >= MAX_TRACKED_WRITERS:
+                self._expires = {k: t for k, t in self._expires.items() if t > now}
+            self._expires[key] = now + settings.DB_REPLICA_STICKY_SECONDS
+
+    def wrote_recently(self, key: str) -> bool:
+        with self._lock:
+            return self._expires.get(key, 0) > time.monotonic()
+
+
+write_tracker = WriteTracker()
+
+
+class RoutingSession(Session):
+    """Session that sends read-only SELECTs to replicas and everything else to its bind"""
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas if replicas is not None else ReplicaSet()
+
+    @property
+    def sticky_key(self) -> Optional[str]:
+        if "sticky_key" in self.info:
+            return self.info["sticky_key"]
+        return getattr(self.info.get("request_state"), "db_sticky_key", None)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if clause is not None and getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        elif self._reads_from_replica(clause):
+            replica = self.replicas.choose()
+            if replica is not None:
+                self.info["replica"] = replica
+                return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+    def _reads_from_replica(self, clause) -> bool:
+        if not self.info.get("read_only") or self.info.get("wrote") or self._flushing:
+            return False
+        if clause is None or not getattr(clause, "is_select", False):
+            return False
+        key = self.sticky_key
+        return key is None or not write_tracker.wrote_recently(key)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_flush(session: RoutingSession, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_commit(session: RoutingSession):
+    key = session.sticky_key
+    if session.info.get("wrote") and key is not None:
+        write_tracker.record(key)
+
+
+def read_only(method: F) -> F:
+    """
+    Mark a service method as safe to run against a replica.
+
+    The method's queries go through self.session; writes it makes anyway still
+    land on the primary. Nested read-only calls leave replica failover to the
+    outermost one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        session = self.session
+        outer = session.info.get("read_only", False)
+        session.info["read_only"] = True
+        try:
+            failed = 0
+            while True:
+                session.info.pop("replica", None)
+                try:
+                    return method(self, *args, **kwargs)
+                except OperationalError:
+                    replica = session.info.pop("replica", None)
+                    failed += 1
+                    if outer or replica is None or failed > len(session.replicas):
+                        raise
+                    session.replicas.mark_down(replica)
+                    session.rollback()
+        finally:
+            session.info["read_only"] = outer
+
+    return wrapper
+
+
+@contextmanager
+def on_primary(session: Session) -> Iterator[Session]:
+    """
+    Run the block's queries on the primary, even inside a @read_only method.
+
+    For reads whose result outlives the request, such as cache fills, where a
+    lagging replica would keep serving a row that was already changed.
+    """
+    outer = session.info.get("read_only", False)
+    session.info["read_only"] = False
+    try:
+        yield session
+    finally:
+        session.info["read_only"] = outer
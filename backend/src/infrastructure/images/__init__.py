@@ -0,0 +1,51 @@
+import threading
+from typing import Optional
+
+from src.infrastructure.images.processor import (
+    FORMATS,
+    PROCESSABLE_TYPES,
+    VARIANTS,
+    ImageProcessor,
+    Renditions,
+    available_formats,
+    render_variants
+)
+from src.shared.config.cfg import settings
+
+_processor: Optional[ImageProcessor] = None
+_lock = threading.Lock()
+
+
+def get_image_processor() -> ImageProcessor:
+    """Return the process-wide image processing pool sized from settings"""
+    global _processor
+    if _processor is None:
+        with _lock:
+            if _processor is None:
+                _processor = ImageProcessor(
+                    workers=settings.IMAGE_PROCESS_WORKERS,
+                    max_pixels=settings.IMAGE_MAX_PIXELS
+                )
+    return _processor
+
+
+def shutdown_image_processor() -> None:
+    """Stop the pool's worker processes, if it was ever started"""
+    global _processor
+    with _lock:
+        processor, _processor = _processor, None
+    if processor is not None:
+        processor.shutdown()
+
+
+__all__ = [
+    "FORMATS",
+    "PROCESSABLE_TYPES",
+    "VARIANTS",
+    "ImageProcessor",
+    "Renditions",
+    "available_formats",
+    "get_image_processor",
+    "render_variants",
+    "shutdown_image_processor"
+]
@@ -0,0 +1,107 @@
+"""
+Resized, metadata-free renditions of uploaded images.
+
+Decoding and encoding are CPU bound and hold the GIL, so they run in a
+process pool; request handlers only await the result.
+"""
+
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Tuple
+
+from PIL import Image, ImageOps, features
+
+from src.shared.exceptions import ImageProcessingError
+
+# Longest edge of each variant in pixels; smaller originals are never upscaled
+VARIANTS: Dict[str, int] = {
+    "full": 1600,
+    "card": 600,
+    "thumbnail": 200,
+}
+
+# Encoder options per output format
+FORMATS: Dict[str, Dict[str, Any]] = {
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 60, "speed": 6},
+}
+
+# Raster types that get variants; SVG and (possibly animated) GIF are served as uploaded
+PROCESSABLE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp"}
+
+# variant name -> format -> encoded bytes
+Renditions = Dict[str, Dict[str, bytes]]
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Output formats this Pillow build can encode"""
+    return tuple(fmt for fmt in FORMATS if features.check(fmt))
+
+
+def render_variants(data: bytes, max_pixels: int) -> Renditions:
+    """
+    Decode an image and encode every variant in every available format.
+
+    Runs inside a pool process. Orientation from EXIF is applied to the pixels,
+    then all metadata (EXIF, XMP, ICC, comments) is left out of the output.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        # Only the header has been read so far; refuse before decoding any pixels
+        if original.width * original.height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image has {original.width * original.height} pixels, more than the {max_pixels} allowed"
+            )
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    image.info = {}
+
+    formats = available_formats()
+    renditions: Renditions = {}
+    # Largest first, each variant downscaled from the previous one
+    for name, edge in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        renditions[name] = {}
+        for fmt in formats:
+            buffer = io.BytesIO()
+            image.save(buffer, format=fmt.upper(), **FORMATS[fmt])
+            renditions[name][fmt] = buffer.getvalue()
+    return renditions
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for pool processes.
+
+    The pool is created inside a running, multi-threaded API worker, and a
+    forked child can inherit locks held by its other threads, so workers come
+    from a fork server instead. It preloads only this module: the default
+    would import __main__, which builds the whole application.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+class ImageProcessor:
+    """Renders image variants on a dedicated process pool"""
+
+    def __init__(self, workers: int, max_pixels: int) -> None:
+        self.workers = workers
+        self.max_pixels = max_pixels
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+
+    async def render(self, data: bytes) -> Renditions:
+        """Variants of an encoded image; ImageProcessingError if it cannot be decoded"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, render_variants, data, self.max_pixels)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            raise ImageProcessingError(f"Could not process image: {e}") from e
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
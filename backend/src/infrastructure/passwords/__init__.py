@@ -0,0 +1,27 @@
+import threading
+from typing import Optional
+
+from src.infrastructure.passwords.hasher import PasswordHasher
+from src.shared.config.cfg import settings
+
+_hasher: Optional[PasswordHasher] = None
+_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hashing pool sized from settings"""
+    global _hasher
+    if _hasher is None:
+        with _lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(
+                    workers=settings.PASSWORD_HASH_WORKERS,
+                    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+                )
+    return _hasher
+
+
+__all__ = [
+    "PasswordHasher",
+    "get_password_hasher"
+]
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from src.shared.exceptions import PasswordHasherBusyError
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt work on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so worker threads hash in parallel. At most
+    workers + max_queue operations are admitted at once; callers beyond that
+    get PasswordHasherBusyError straight away instead of piling up in the
+    request threadpool that also serves every other endpoint.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on the pool and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusyError("Password hashing pool is saturated")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
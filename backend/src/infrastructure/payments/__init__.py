@@ -1 +1,24 @@
-from .dodo import DodoPaymentsService
\ No newline at end of file
+import threading
+from typing import Optional
+
+from .dodo import DodoPaymentsService, build_dodo_client
+
+_dodo_payments: Optional[DodoPaymentsService] = None
+_lock = threading.Lock()
+
+
+def get_dodo_payments() -> DodoPaymentsService:
+    """Return the process-wide DodoPayments service, creating its client on first use"""
+    global _dodo_payments
+    if _dodo_payments is None:
+        with _lock:
+            if _dodo_payments is None:
+                _dodo_payments = DodoPaymentsService()
+    return _dodo_payments
+
+
+__all__ = [
+    "DodoPaymentsService",
+    "build_dodo_client",
+    "get_dodo_payments"
+]
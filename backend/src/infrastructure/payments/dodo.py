@@ -1,5 +1,6 @@
 from math import prod
 import dodopayments
+import httpx
 from typing import Dict, Any, Optional, List
 from decimal import Decimal
 
@@ -11,15 +12,35 @@ from src.shared.models.product import Product
 from src.shared.config.cfg import settings
 
 
+def build_dodo_client() -> dodopayments.DodoPayments:
+    """DodoPayments client with timeouts, retries and a keep-alive connection pool from settings"""
+    return dodopayments.DodoPayments(
+        bearer_token=settings.DODO_PAYMENTS_API_KEY,
+        environment="test_mode",
+        timeout=httpx.Timeout(
+            settings.DODO_PAYMENTS_TIMEOUT_SECONDS,
+            connect=settings.DODO_PAYMENTS_CONNECT_TIMEOUT_SECONDS
+        ),
+        max_retries=settings.DODO_PAYMENTS_MAX_RETRIES,
+        http_client=dodopayments.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.DODO_PAYMENTS_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DODO_PAYMENTS_MAX_CONNECTIONS,
+                keepalive_expiry=settings.DODO_PAYMENTS_KEEPALIVE_SECONDS
+            )
+        )
+    )
+
+
 class DodoPaymentsService:
     """Service for integrating with DodoPayments using official SDK"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[dodopayments.DodoPayments] = None):
         self.api_key = settings.DODO_PAYMENTS_API_KEY
         self.webhook_secret = settings.DODO_PAYMENTS_WEBHOOK_SECRET
         
-        # Initialize DodoPayments client
-        self.client = dodopayments.DodoPayments(bearer_token=self.api_key, environment="test_mode")
+        # The client is thread-safe; share one through get_dodo_payments rather than building more
+        self.client = client if client is not None else build_dodo_client()
 
     def create_checkout_session(
         self,
@@ -148,16 +169,9 @@ class DodoPaymentsService:
         """Get customer details"""
         return self.client.customers.retrieve(customer_id)
     
-    def create_product_in_dodo(
-        self,
-        name: str,
-        price: Decimal,
-        description: str = "",
-        metadata: Optional[Dict[str, str]] = None
-    ):
-        """Create a product in DodoPayments"""
-        # Create proper price object for DodoPayments
-        price_obj = OneTimePrice(
+    def _one_time_price(self, price: Decimal) -> OneTimePrice:
+        """Proper price object for DodoPayments"""
+        return OneTimePrice(
             price=int(price * 100),  # Convert to cents
             discount=0,
             currency="USD",
@@ -166,10 +180,18 @@ class DodoPaymentsService:
             purchasing_power_parity=False,
             tax_inclusive=False
         )
-        
+
+    def create_product_in_dodo(
+        self,
+        name: str,
+        price: Decimal,
+        description: str = "",
+        metadata: Optional[Dict[str, str]] = None
+    ):
+        """Create a product in DodoPayments"""
         return self.client.products.create(
             name=name,
-            price=price_obj,
+            price=self._one_time_price(price),
             tax_category="digital_products",
             description=description,
             metadata=metadata or {}
@@ -193,3 +215,18 @@ class DodoPaymentsService:
         )
 
         return dodo_product.product_id
+
+    def update_product_in_dodo(
+        self,
+        dodo_product_id: str,
+        name: str,
+        price: Decimal,
+        description: str = ""
+    ) -> None:
+        """Update the name, price and description of a product in DodoPayments"""
+        self.client.products.update(
+            dodo_product_id,
+            name=name,
+            price=self._one_time_price(price),
+            description=description
+        )
@@ -0,0 +1,192 @@
+"""
+Background sync of products to DodoPayments through an outbox table.
+
+Product changes call enqueue_product_sync in their own transaction, so a
+sync is requested exactly when the change commits. The worker claims due
+rows with a lease, pushes each product's current state (creating it in
+DodoPayments the first time), and deletes the rows it handled. Failures
+are retried with exponential backoff.
+
+Run the worker with:
+
+    python -m src.infrastructure.payments.product_sync
+"""
+
+import argparse
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from loguru import logger
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.infrastructure.payments import DodoPaymentsService, get_dodo_payments
+from src.shared.config.cfg import settings
+from src.shared.models.payments import ProductSyncTask
+from src.shared.models.product import Product
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_product_sync(session: Session, product_id: str) -> None:
+    """Ask the worker to push the product to DodoPayments once the session commits"""
+    now = _utcnow()
+    session.add(ProductSyncTask(product_id=product_id, attempts=0, next_attempt_at=now, created_at=now))
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retrying after the given number of failed attempts, with jitter"""
+    delay = min(settings.PRODUCT_SYNC_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.PRODUCT_SYNC_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class ProductSyncWorker:
+    """Drains the product sync outbox; several workers can share it"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        dodo_payments: Optional[DodoPaymentsService] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.dodo_payments = dodo_payments if dodo_payments is not None else get_dodo_payments()
+        self.batch_size = batch_size or settings.PRODUCT_SYNC_BATCH_SIZE
+        self.worker_id = str(uuid4())
+
+    def run_once(self) -> int:
+        """Sync the products of one batch of due rows, returning how many products were handled"""
+        claimed = self._claim()
+        for product_id, tasks in claimed.items():
+            self._sync(product_id, tasks)
+        return len(claimed)
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        logger.info(f"Product sync worker {self.worker_id} started")
+        while not stop.is_set():
+            try:
+                handled = self.run_once()
+            except Exception as e:
+                logger.error(f"Product sync poll failed: {e}")
+                handled = 0
+            if not handled:
+                stop.wait(settings.PRODUCT_SYNC_POLL_SECONDS)
+
+    def _claim(self) -> Dict[str, List[ProductSyncTask]]:
+        """Lease due rows to this worker and group them by product"""
+        now = _utcnow()
+        unclaimed = or_(ProductSyncTask.locked_until.is_(None), ProductSyncTask.locked_until < now)
+        with self.session_factory() as session:
+            due = select(ProductSyncTask.id).where(
+                ProductSyncTask.next_attempt_at <= now, unclaimed
+            ).order_by(ProductSyncTask.id).limit(self.batch_size)
+            ids = session.scalars(due).all()
+            if not ids:
+                return {}
+
+            # Conditional on the lease still being free, so concurrent workers never share a row
+            session.execute(
+                update(ProductSyncTask)
+                .where(ProductSyncTask.id.in_(ids), unclaimed)
+                .values(
+                    claimed_by=self.worker_id,
+                    locked_until=now + timedelta(seconds=settings.PRODUCT_SYNC_LEASE_SECONDS)
+                )
+            )
+            session.commit()
+
+            tasks = session.scalars(
+                select(ProductSyncTask).where(ProductSyncTask.id.in_(ids), ProductSyncTask.claimed_by == self.worker_id)
+            ).all()
+            session.expunge_all()
+
+        claimed = defaultdict(list)
+        for task in tasks:
+            claimed[task.product_id].append(task)
+        return claimed
+
+    def _sync(self, product_id: str, tasks: List[ProductSyncTask]) -> None:
+        task_ids = [task.id for task in tasks]
+        with self.session_factory() as session:
+            product = session.get(Product, product_id)
+            if product is None:
+                # Deleted since; nothing left to sync
+                session.execute(delete(ProductSyncTask).where(ProductSyncTask.id.in_(task_ids)))
+                session.commit()
+                return
+
+            snapshot = Product(
+                id=product.id,
+                name=product.name,
+                price=product.price,
+                description=product.description,
+                dodo_product_id=product.dodo_product_id
+            )
+            # No transaction is held while DodoPayments is called
+            session.rollback()
+
+            try:
+                if snapshot.dodo_product_id:
+                    self.dodo_payments.update_product_in_dodo(
+                        snapshot.dodo_product_id,
+                        name=snapshot.name,
+                        price=snapshot.price,
+                        description=snapshot.description or ""
+                    )
+                else:
+                    dodo_product_id = self.dodo_payments.sync_product_with_dodo(product=snapshot)
+                    # Checkout may have synced it meanwhile; keep whichever id was saved first
+                    session.execute(
+                        update(Product)
+                        .where(Product.id == product_id, Product.dodo_product_id.is_(None))
+                        .values(dodo_product_id=dodo_product_id)
+                    )
+            except Exception as e:
+                attempts = max(task.attempts for task in tasks) + 1
+                delay = retry_delay(attempts)
+                logger.warning(f"Syncing product {product_id} failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+                session.execute(
+                    update(ProductSyncTask)
+                    .where(ProductSyncTask.id.in_(task_ids))
+                    .values(
+                        attempts=attempts,
+                        next_attempt_at=_utcnow() + timedelta(seconds=delay),
+                        claimed_by=None,
+                        locked_until=None,
+                        last_error=str(e)[:1000]
+                    )
+                )
+                session.commit()
+                return
+
+            # Rows added after the claim stay queued and sync the newer state
+            session.execute(delete(ProductSyncTask).where(ProductSyncTask.id.in_(task_ids)))
+            session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push product changes to DodoPayments")
+    parser.add_argument("--once", action="store_true", help="Process one batch and exit")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    from src.core.logger import setup_logger
+    from src.infrastructure.database.connection import SessionLocal
+
+    setup_logger()
+    worker = ProductSyncWorker(SessionLocal, batch_size=args.batch_size)
+    if args.once:
+        logger.info(f"Synced {worker.run_once()} products")
+    else:
+        worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import threading
+from typing import Optional
+
+from src.infrastructure.ratelimit.base import BaseRateLimitBackend, RateLimitResult
+from src.infrastructure.ratelimit.limiter import SLIDING_WINDOW, TOKEN_BUCKET, RateLimiter, RateLimitRule
+from src.infrastructure.ratelimit.memory import MemoryRateLimitBackend
+from src.infrastructure.ratelimit.redis import RedisRateLimitBackend
+from src.shared.config.cfg import settings
+
+_limiter: Optional[RateLimiter] = None
+_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Return the process-wide rate limiter.
+
+    Budgets are shared by every worker through Redis when CACHE_REDIS_URL is
+    set, and counted per process otherwise.
+    """
+    global _limiter
+    if _limiter is None:
+        with _lock:
+            if _limiter is None:
+                if settings.CACHE_REDIS_URL:
+                    backend = RedisRateLimitBackend(settings.CACHE_REDIS_URL)
+                else:
+                    backend = MemoryRateLimitBackend()
+                _limiter = RateLimiter(backend)
+    return _limiter
+
+
+__all__ = [
+    "BaseRateLimitBackend",
+    "MemoryRateLimitBackend",
+    "RateLimitResult",
+    "RateLimitRule",
+    "RateLimiter",
+    "RedisRateLimitBackend",
+    "SLIDING_WINDOW",
+    "TOKEN_BUCKET",
+    "get_rate_limiter"
+]
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    # Seconds until the request would be allowed; 0 when it was
+    retry_after: float = 0.0
+
+
+class BaseRateLimitBackend(ABC):
+    @abstractmethod
+    def token_bucket(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+        """Take cost tokens from a bucket of capacity tokens refilled at a steady rate"""
+        pass
+
+    @abstractmethod
+    def sliding_window(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """Count a hit against at most limit hits in any window_seconds period"""
+        pass
@@ -0,0 +1,58 @@
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+from src.infrastructure.ratelimit.base import BaseRateLimitBackend, RateLimitResult
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET = "token_bucket"
+SLIDING_WINDOW = "sliding_window"
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    A budget of limit hits per period_seconds.
+
+    A sliding window allows at most limit hits in any period. A token bucket
+    allows bursts of up to limit hits and refills at limit / period_seconds.
+    """
+    name: str
+    limit: int
+    period_seconds: float
+    algorithm: str = SLIDING_WINDOW
+
+
+class RateLimiter:
+    """Evaluates rules against a backend, one subject (an IP, a username...) per rule"""
+
+    def __init__(self, backend: BaseRateLimitBackend) -> None:
+        self.backend = backend
+
+    def hit(self, rule: RateLimitRule, subject: str) -> RateLimitResult:
+        key = f"{rule.name}:{subject}"
+        if rule.algorithm == TOKEN_BUCKET:
+            return self.backend.token_bucket(key, rule.limit, rule.limit / rule.period_seconds)
+        if rule.algorithm == SLIDING_WINDOW:
+            return self.backend.sliding_window(key, rule.limit, rule.period_seconds)
+        raise ValueError(f"Unknown rate limit algorithm: {rule.algorithm}")
+
+    def check(self, checks: Iterable[Tuple[RateLimitRule, str]]) -> RateLimitResult:
+        """
+        Count a hit against each rule in order, stopping at the first one exceeded.
+
+        Put the narrowest budgets first so requests they reject do not use up
+        the broader ones. A failing backend lets requests through.
+        """
+        for rule, subject in checks:
+            if rule.limit <= 0:
+                continue
+            try:
+                result = self.hit(rule, subject)
+            except Exception as e:
+                logger.warning(f"Rate limit backend failed, allowing request: {e}")
+                return RateLimitResult(allowed=True)
+            if not result.allowed:
+                return result
+        return RateLimitResult(allowed=True)
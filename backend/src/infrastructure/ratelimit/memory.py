@@ -0,0 +1,80 @@
+import math
+import threading
+import time
+from typing import Callable, Dict, List
+
+from src.infrastructure.ratelimit.base import BaseRateLimitBackend, RateLimitResult
+
+
+class MemoryRateLimitBackend(BaseRateLimitBackend):
+    """
+    Per-process rate limit state.
+
+    Sliding windows use the two-bucket approximation: the previous window's
+    count, weighted by how much of it still overlaps, plus the current one.
+    State idle for longer than its period is dropped once max_keys is reached.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> [expires_at, *algorithm state]
+        self._state: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        if len(self._state) >= self.max_keys:
+            self._state = {key: state for key, state in self._state.items() if state[0] > now}
+
+    def token_bucket(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+        now = self.clock()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                self._prune(now)
+                tokens = float(capacity)
+            else:
+                _, tokens, updated_at = state
+                tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Full again after this long, at which point the state can be forgotten
+            expires_at = now + (capacity - tokens) / refill_per_second
+            self._state[key] = [expires_at, tokens, now]
+
+        if allowed:
+            return RateLimitResult(allowed=True)
+        return RateLimitResult(allowed=False, retry_after=(cost - tokens) / refill_per_second)
+
+    def sliding_window(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        now = self.clock()
+        window = math.floor(now / window_seconds)
+        elapsed = now - window * window_seconds
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                self._prune(now)
+                previous, current = 0.0, 0.0
+            else:
+                _, state_window, previous, current = state
+                if state_window == window - 1:
+                    previous, current = current, 0.0
+                elif state_window != window:
+                    previous, current = 0.0, 0.0
+
+            weight = 1 - elapsed / window_seconds
+            allowed = previous * weight + current + 1 <= limit
+            if allowed:
+                current += 1
+            self._state[key] = [(window + 2) * window_seconds, window, previous, current]
+
+        if allowed:
+            return RateLimitResult(allowed=True)
+        if current + 1 > limit or previous == 0:
+            retry_after = window_seconds - elapsed
+        else:
+            # Wait until enough of the previous window has slid out
+            retry_after = window_seconds * (1 - (limit - 1 - current) / previous) - elapsed
+        return RateLimitResult(allowed=False, retry_after=max(retry_after, 0.0))
@@ -0,0 +1,82 @@
+from src.infrastructure.ratelimit.base import BaseRateLimitBackend, RateLimitResult
+
+# Both scripts read the clock from Redis so every worker agrees on it.
+# They return {allowed, retry_after_ms}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + (now - tonumber(state[2])) * rate)
+end
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, math.ceil(retry_after * 1000)}
+"""
+
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now_ms = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = math.floor(now_ms / window_ms)
+local elapsed = now_ms - window * window_ms
+
+local current_key = KEYS[1] .. ':' .. window
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (window - 1)) or '0')
+local current = tonumber(redis.call('GET', current_key) or '0')
+
+if previous * (1 - elapsed / window_ms) + current + 1 <= limit then
+    redis.call('INCR', current_key)
+    redis.call('PEXPIRE', current_key, window_ms * 2)
+    return {1, 0}
+end
+
+local retry_after = window_ms - elapsed
+if current + 1 <= limit and previous > 0 then
+    retry_after = window_ms * (1 - (limit - 1 - current) / previous) - elapsed
+end
+return {0, math.max(math.ceil(retry_after), 0)}
+"""
+
+
+class RedisRateLimitBackend(BaseRateLimitBackend):
+    """Rate limit state shared by every worker, kept in Redis and updated atomically by Lua scripts"""
+
+    def __init__(self, url: str, prefix: str = "team1gc:ratelimit:") -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_REDIS_URL is set but the redis package is not installed (pip install redis)") from e
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._token_bucket = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._sliding_window = self.client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def token_bucket(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+        allowed, retry_after_ms = self._token_bucket(keys=[self.prefix + key], args=[capacity, refill_per_second, cost])
+        return RateLimitResult(allowed=bool(allowed), retry_after=int(retry_after_ms) / 1000)
+
+    def sliding_window(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        allowed, retry_after_ms = self._sliding_window(
+            keys=[self.prefix + key], args=[limit, int(window_seconds * 1000)]
+        )
+        return RateLimitResult(allowed=bool(allowed), retry_after=int(retry_after_ms) / 1000)
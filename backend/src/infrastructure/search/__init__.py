@@ -0,0 +1,34 @@
+import threading
+from weakref import WeakKeyDictionary
+
+from sqlalchemy.orm import Session
+
+from src.infrastructure.search.base import BaseSearchBackend
+from src.infrastructure.search.memory import InMemorySearchBackend
+from src.infrastructure.search.mysql import MySQLFullTextSearchBackend
+
+_backends: "WeakKeyDictionary" = WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_search_backend(session: Session) -> BaseSearchBackend:
+    """Return the search backend for the database the session is bound to"""
+    # Key on the primary: replicas serve the same data and share its backend
+    engine = session.bind or session.get_bind()
+    with _lock:
+        backend = _backends.get(engine)
+        if backend is None:
+            if engine.dialect.name == "mysql":
+                backend = MySQLFullTextSearchBackend()
+            else:
+                backend = InMemorySearchBackend()
+            _backends[engine] = backend
+        return backend
+
+
+__all__ = [
+    "BaseSearchBackend",
+    "InMemorySearchBackend",
+    "MySQLFullTextSearchBackend",
+    "get_search_backend"
+]
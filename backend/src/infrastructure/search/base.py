@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement
+
+from src.shared.models.product import Product
+
+
+class BaseSearchBackend(ABC):
+    @abstractmethod
+    def filter(self, query: Query, term: str) -> Query:
+        """Restrict a Product query to rows matching the search term"""
+        pass
+
+    @abstractmethod
+    def relevance(self, query: Query, term: str) -> ColumnElement:
+        """SQL expression scoring how well each Product row matches the term"""
+        pass
+
+    @abstractmethod
+    def index_product(self, product: Product) -> None:
+        """Add or refresh a product in the index"""
+        pass
+
+    @abstractmethod
+    def remove_product(self, product_id: str) -> None:
+        """Drop a product from the index"""
+        pass
@@ -0,0 +1,128 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, false
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import ColumnElement, literal
+
+from src.infrastructure.search.base import BaseSearchBackend
+from src.shared.models.product import Product
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Name matches count for more than description matches
+NAME_WEIGHT = 2
+
+# BM25 tuning constants
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InMemorySearchBackend(BaseSearchBackend):
+    """
+    Pure-Python inverted index with BM25 ranking.
+
+    Meant for SQLite and tests, where no FULLTEXT index exists. The index is built
+    from the products table on first use and kept current by the product services;
+    writes made by other processes are not seen until rebuild() is called.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Counter] = {}
+        self._total_length = 0
+        self._built = False
+        self._lock = threading.RLock()
+
+    def rebuild(self, session: Session) -> None:
+        """Re-index every product from the database"""
+        rows = session.query(Product.id, Product.name, Product.description).all()
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._doc_terms = {}
+            self._total_length = 0
+            for product_id, name, description in rows:
+                self._add(product_id, name, description)
+            self._built = True
+
+    def _ensure_built(self, session: Session) -> None:
+        if not self._built:
+            self.rebuild(session)
+
+    def _add(self, product_id: str, name: Optional[str], description: Optional[str]) -> None:
+        terms = Counter()
+        for token in tokenize(name):
+            terms[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            terms[token] += 1
+
+        self._doc_terms[product_id] = terms
+        self._total_length += sum(terms.values())
+        for token, frequency in terms.items():
+            self._postings[token][product_id] = frequency
+
+    def _remove(self, product_id: str) -> None:
+        terms = self._doc_terms.pop(product_id, None)
+        if not terms:
+            return
+        self._total_length -= sum(terms.values())
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def index_product(self, product: Product) -> None:
+        with self._lock:
+            if not self._built:
+                # The first search will load everything, including this product
+                return
+            self._remove(product.id)
+            self._add(product.id, product.name, product.description)
+
+    def remove_product(self, product_id: str) -> None:
+        with self._lock:
+            self._remove(product_id)
+
+    def search(self, session: Session, term: str) -> Dict[str, float]:
+        """Return BM25 scores for every product matching any token of the term"""
+        self._ensure_built(session)
+        with self._lock:
+            document_count = len(self._doc_terms)
+            if not document_count:
+                return {}
+            average_length = self._total_length / document_count
+
+            scores: Dict[str, float] = defaultdict(float)
+            for token in set(tokenize(term)):
+                postings = self._postings.get(token)
+                if not postings:
+                    continue
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for product_id, frequency in postings.items():
+                    length = sum(self._doc_terms[product_id].values())
+                    norm = K1 * (1 - B + B * length / average_length)
+                    scores[product_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+            return dict(scores)
+
+    def filter(self, query: Query, term: str) -> Query:
+        scores = self.search(query.session, term)
+        if not scores:
+            return query.filter(false())
+        return query.filter(Product.id.in_(list(scores)))
+
+    def relevance(self, query: Query, term: str) -> ColumnElement:
+        scores = self.search(query.session, term)
+        if not scores:
+            return literal(0.0)
+        return case(scores, value=Product.id, else_=0.0)
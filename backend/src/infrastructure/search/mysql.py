@@ -0,0 +1,46 @@
+import re
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement, literal
+
+from src.infrastructure.search.base import BaseSearchBackend
+from src.shared.models.product import Product
+
+# InnoDB ignores tokens shorter than innodb_ft_min_token_size (3 by default)
+MIN_TOKEN_LENGTH = 3
+
+
+class MySQLFullTextSearchBackend(BaseSearchBackend):
+    """Search backed by the FULLTEXT index on products(name, description)"""
+
+    def _match(self, term: str) -> ColumnElement:
+        return match(Product.name, Product.description, against=term).in_natural_language_mode()
+
+    def _indexable(self, term: str) -> bool:
+        return any(len(token) >= MIN_TOKEN_LENGTH for token in re.findall(r"\w+", term))
+
+    def filter(self, query: Query, term: str) -> Query:
+        if not self._indexable(term):
+            # The index cannot answer very short terms, fall back to a LIKE scan
+            search_term = f"%{term}%"
+            return query.filter(
+                or_(
+                    Product.name.ilike(search_term),
+                    Product.description.ilike(search_term)
+                )
+            )
+        return query.filter(self._match(term))
+
+    def relevance(self, query: Query, term: str) -> ColumnElement:
+        if not self._indexable(term):
+            return literal(0)
+        return self._match(term)
+
+    def index_product(self, product: Product) -> None:
+        # InnoDB maintains FULLTEXT indexes as part of the write itself
+        pass
+
+    def remove_product(self, product_id: str) -> None:
+        pass
@@ -13,15 +13,92 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = ""
     DB_NAME: str = "team1gc_db"
 
+    # Connection pool settings, applied to each engine of each worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+    # Connections the database grants this app across all workers; 0 leaves pools at the sizes above
+    DB_MAX_CONNECTIONS: int = 0
+    UVICORN_WORKERS: int = 1
+    # Shared secret monitoring sends as X-Internal-Token to read GET /health/db/pool;
+    # empty keeps the endpoint disabled
+    HEALTH_INTERNAL_TOKEN: SecretStr = SecretStr("")
+
+    # Read replicas: comma-separated database URLs, empty to read from the primary only
+    DATABASE_REPLICA_URLS: str = ""
+    # How long a caller's reads stay on the primary after they commit a write (cover replica lag)
+    DB_REPLICA_STICKY_SECONDS: float = 5
+    # How long a failed replica is skipped before it is tried again
+    DB_REPLICA_RETRY_SECONDS: float = 30
+
+    # Listing count cache settings (used by the "cached" count strategy)
+    COUNT_CACHE_TTL_SECONDS: int = 30
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+
+    # Response cache: in-process LRU tier, plus a shared Redis tier when CACHE_REDIS_URL is set.
+    # Local entries expire after CACHE_LOCAL_TTL_SECONDS so other workers pick up invalidations.
+    CACHE_REDIS_URL: str = ""
+    CACHE_LOCAL_MAX_ENTRIES: int = 2048
+    CACHE_LOCAL_TTL_SECONDS: float = 5
+    PRODUCT_CACHE_TTL_SECONDS: int = 300
+
+    # Cache-Control sent with catalog responses, for browsers and CDNs; empty to omit the header
+    CATALOG_LIST_CACHE_CONTROL: str = "public, max-age=30, stale-while-revalidate=60"
+    CATALOG_DETAIL_CACHE_CONTROL: str = "public, max-age=60, stale-while-revalidate=300"
 
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # How long a user's role and active flag are trusted before being re-read from the database.
+    # Changes committed through the ORM invalidate the cached entry straight away.
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # Logouts are stored in the database; other workers may accept a logged-out token for this long
+    AUTH_REVOCATION_CHECK_SECONDS: float = 5
+
+    # bcrypt cost factor; stored hashes with another cost are rehashed on the next login
+    PASSWORD_HASH_ROUNDS: int = 12
+    # Threads dedicated to bcrypt, and how many more operations may wait before answering 429
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+
+    # Sign-in and sign-up throttling, checked before any password hashing. Budgets are per
+    # worker unless CACHE_REDIS_URL is set; a limit of 0 disables that budget.
+    RATE_LIMIT_ENABLED: bool = True
+    # Take the client IP from the last X-Forwarded-For entry (only behind a trusted proxy)
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_IP_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 10
+    LOGIN_RATE_LIMIT_USERNAME_WINDOW_SECONDS: int = 300
+    REGISTER_RATE_LIMIT_PER_IP: int = 5
+    REGISTER_RATE_LIMIT_IP_WINDOW_SECONDS: int = 3600
+    # Token bucket shared by every login and registration: bursts of AUTH_RATE_LIMIT_GLOBAL_BURST,
+    # refilled at AUTH_RATE_LIMIT_GLOBAL_PER_SECOND
+    AUTH_RATE_LIMIT_GLOBAL_PER_SECOND: int = 20
+    AUTH_RATE_LIMIT_GLOBAL_BURST: int = 50
 
     # DodoPayments settings
     DODO_PAYMENTS_API_KEY: str = ""
     DODO_PAYMENTS_BASE_URL: str = "https://api.dodopayments.com"
     DODO_PAYMENTS_WEBHOOK_SECRET: str
+    # One client per process: request timeouts, retries of failed calls and its keep-alive pool
+    DODO_PAYMENTS_TIMEOUT_SECONDS: float = 10.0
+    DODO_PAYMENTS_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    DODO_PAYMENTS_MAX_RETRIES: int = 2
+    DODO_PAYMENTS_MAX_CONNECTIONS: int = 20
+    DODO_PAYMENTS_KEEPALIVE_SECONDS: float = 30.0
+    # Provider calls a checkout may have in flight at once (product syncs and customer creation)
+    DODO_PAYMENTS_MAX_CONCURRENCY: int = 4
+    # Product sync worker: rows claimed per poll, idle poll interval, how long a claim is held,
+    # and the exponential retry backoff bounds
+    PRODUCT_SYNC_BATCH_SIZE: int = 50
+    PRODUCT_SYNC_POLL_SECONDS: float = 2.0
+    PRODUCT_SYNC_LEASE_SECONDS: int = 60
+    PRODUCT_SYNC_RETRY_BASE_SECONDS: float = 5.0
+    PRODUCT_SYNC_RETRY_MAX_SECONDS: float = 3600.0
     
     # Frontend/Backend URLs for payment redirects
     FRONTEND_URL: str = "http://localhost:3000"
@@ -39,6 +116,33 @@ class Settings(BaseSettings):
     R2_SECRET_ACCESS_KEY: SecretStr = SecretStr("")
     R2_BUCKET_NAME: str = ""
     R2_PUBLIC_DOMAIN: str = "s.fertit.com"
+    # Shared R2 client: connection pool size (match the threads uploading at once), timeouts and retries
+    R2_MAX_POOL_CONNECTIONS: int = 32
+    R2_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    R2_READ_TIMEOUT_SECONDS: float = 30.0
+    R2_MAX_ATTEMPTS: int = 3
+    # Uploads above the threshold go multipart, in chunks sent by up to R2_TRANSFER_MAX_CONCURRENCY threads
+    R2_MULTIPART_THRESHOLD_BYTES: int = 8 * 1024 * 1024
+    R2_MULTIPART_CHUNK_BYTES: int = 8 * 1024 * 1024
+    R2_TRANSFER_MAX_CONCURRENCY: int = 4
+    # Files of one multi-image request uploaded at the same time
+    UPLOAD_MAX_PARALLEL: int = 4
+    # Hard cap on an uploaded image, enforced while it streams (413 beyond it)
+    UPLOAD_MAX_IMAGE_BYTES: int = 5 * 1024 * 1024
+    # Store uploads under the SHA-256 of their bytes so identical files share one object
+    UPLOAD_CONTENT_ADDRESSED: bool = True
+    # An unreferenced upload younger than this is kept: it may be about to be attached to a product
+    UPLOAD_ORPHAN_GRACE_SECONDS: int = 3600
+    # Lifetime of presigned direct-to-bucket upload grants
+    UPLOAD_GRANT_EXPIRES_SECONDS: int = 600
+    # Bucket garbage collector: prefix swept for images no product uses (orphans younger than
+    # UPLOAD_ORPHAN_GRACE_SECONDS are kept)
+    BUCKET_GC_PREFIX: str = "products/images/"
+    # The collector deletes nothing when more than this fraction of the listed objects look orphaned
+    BUCKET_GC_MAX_ORPHAN_FRACTION: float = 0.5
+    # Processes rendering image variants, and the largest image (in pixels) they will decode
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_MAX_PIXELS: int = 40_000_000
 
 
     model_config = SettingsConfigDict(
@@ -58,4 +162,9 @@ class Settings(BaseSettings):
             return self.DATABASE_URL
         return f"mysql+pymysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def get_replica_urls(self) -> list[str]:
+        """Get the read replica URLs from DATABASE_REPLICA_URLS."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 settings = Settings()
@@ -1,11 +1,11 @@
 from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from src.domains.auth.service import AuthService
 from src.infrastructure.database import get_db
-from src.shared.models.user import User
+from src.shared.schemas.user import AuthContext
 
 security = HTTPBearer()
 
@@ -17,13 +17,14 @@ def get_auth_service(
 
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
-) -> User:
-    """Get current authenticated user from JWT token"""
+) -> AuthContext:
+    """Get the authenticated principal from the JWT claims"""
     
     token = credentials.credentials
-    user = auth_service.get_user_by_access_token(token)
+    user = auth_service.get_auth_context(token)
     
     if not user:
         raise HTTPException(
@@ -37,5 +38,7 @@ def get_current_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
+
+    # Keeps this user's reads on the primary right after their writes, see routing.py
+    request.state.db_sticky_key = f"user:{user.id}"
     return user
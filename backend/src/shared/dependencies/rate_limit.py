@@ -0,0 +1,62 @@
+import math
+from typing import Iterable, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from src.infrastructure.ratelimit import TOKEN_BUCKET, RateLimitRule, get_rate_limiter
+from src.shared.config.cfg import settings
+
+
+def get_client_ip(request: Request) -> str:
+    """The caller's address, taken from the proxy's X-Forwarded-For entry when it is trusted"""
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for", "")
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            return hops[-1]
+    return request.client.host if request.client else "unknown"
+
+
+def _global_rule() -> RateLimitRule:
+    burst = settings.AUTH_RATE_LIMIT_GLOBAL_BURST
+    per_second = settings.AUTH_RATE_LIMIT_GLOBAL_PER_SECOND
+    return RateLimitRule(
+        name="auth:global",
+        limit=burst if per_second > 0 else 0,
+        period_seconds=burst / per_second if per_second > 0 else 1,
+        algorithm=TOKEN_BUCKET
+    )
+
+
+def _enforce(checks: Iterable[Tuple[RateLimitRule, str]], detail: str):
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    result = get_rate_limiter().check(checks)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
+        )
+
+
+def enforce_login_rate_limit(request: Request, username: str):
+    """Count a login attempt against the per-IP, per-username and global budgets, answering 429 once one is spent"""
+    _enforce([
+        (RateLimitRule("login:ip", settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_IP_WINDOW_SECONDS),
+         get_client_ip(request)),
+        (RateLimitRule("login:user", settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+                       settings.LOGIN_RATE_LIMIT_USERNAME_WINDOW_SECONDS),
+         username.strip().lower()),
+        (_global_rule(), "all"),
+    ], detail="Too many login attempts, please retry later")
+
+
+def enforce_register_rate_limit(request: Request):
+    """Count a registration against the per-IP and global budgets, answering 429 once one is spent"""
+    _enforce([
+        (RateLimitRule("register:ip", settings.REGISTER_RATE_LIMIT_PER_IP,
+                       settings.REGISTER_RATE_LIMIT_IP_WINDOW_SECONDS),
+         get_client_ip(request)),
+        (_global_rule(), "all"),
+    ], detail="Too many registrations, please retry later")
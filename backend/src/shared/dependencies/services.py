@@ -1 +1,12 @@
-# TODO: Write dependencies for initialization of services
\ No newline at end of file
+from src.infrastructure.bucket import R2BucketManager, get_bucket_manager
+from src.infrastructure.payments import DodoPaymentsService, get_dodo_payments
+
+
+def get_dodo_payments_service() -> DodoPaymentsService:
+    """The shared DodoPayments service; override this dependency to swap in a fake"""
+    return get_dodo_payments()
+
+
+def get_bucket_manager_service() -> R2BucketManager:
+    """The shared R2 bucket manager; override this dependency to use another bucket"""
+    return get_bucket_manager()
@@ -29,3 +29,13 @@ class AuthenticationError(Exception):
 class AuthorizationError(Exception):
     """Raised when authorization fails."""
     pass
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing pool is saturated."""
+    pass
+
+
+class ImageProcessingError(Exception):
+    """Raised when an uploaded image cannot be decoded or resized."""
+    pass
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.database import Base
+
+
+class RevokedToken(Base):
+    """
+    An access token logged out before it expired.
+
+    Rows are the source of truth every worker checks; caches only remember the
+    verdict for a while. Rows past expires_at can be dropped, as the token is
+    rejected as expired by then anyway. Times are naive UTC.
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import String, Numeric, Integer, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import String, Numeric, Integer, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from uuid import uuid4
@@ -22,6 +22,11 @@ class OrderStatus(PyEnum):
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # One row per product in a cart, which add-to-cart upserts against.
+        # Also serves cart reads, which filter on user, then product.
+        Index("uq_cart_items_user_id_product_id", "user_id", "product_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -35,6 +40,10 @@ class CartItem(Base):
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        # Seller order views and pending-order checks join from product to order
+        Index("ix_order_items_product_id_order_id", "product_id", "order_id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     order_id: Mapped[str] = mapped_column(String(36), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
@@ -48,6 +57,14 @@ class OrderItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Buyer order history: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # Supplier queues and status counts: WHERE status = ? ORDER BY created_at DESC
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        # Supplier "all orders" listing
+        Index("ix_orders_created_at", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -1,6 +1,7 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,10 +20,38 @@ class Customer(Base):
     )
     user_id: Mapped[int] = mapped_column(
         ForeignKey('users.id'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     customer_id: Mapped[str] = mapped_column(String(255), nullable=False)
     billing_email: Mapped[str] = mapped_column(String(255), nullable=False)
     billing_name: Mapped[str] = mapped_column(String(255), nullable=False)
 
     user: Mapped["User"] = relationship("User", back_populates="customer")
+
+
+class ProductSyncTask(Base):
+    """
+    Outbox row asking the product sync worker to push a product to DodoPayments.
+
+    Written in the same transaction as the product change. A product can have
+    several rows; the worker syncs its current state once for all of them.
+    Times are naive UTC.
+    """
+    __tablename__ = "product_sync_outbox"
+    __table_args__ = (
+        # The worker's poll: due, unclaimed rows
+        Index("ix_product_sync_outbox_next_attempt_at", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("products.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Set while a worker holds the row; a lease past locked_until may be taken over
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
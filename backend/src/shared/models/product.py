@@ -1,5 +1,5 @@
-from typing import TYPE_CHECKING
-from sqlalchemy import String, Numeric, Integer, Text, DateTime, ForeignKey
+from typing import TYPE_CHECKING, Optional
+from sqlalchemy import JSON, String, Numeric, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from uuid import uuid4
@@ -11,6 +11,22 @@ if TYPE_CHECKING:
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Seller dashboards: WHERE seller_id = ? ORDER BY created_at DESC
+        Index("ix_products_seller_id_created_at", "seller_id", "created_at"),
+        # Catalog filtered by type, default newest-first ordering
+        Index("ix_products_product_type_created_at", "product_type", "created_at"),
+        # Catalog sort orders with the id tie-breaker used by keyset pagination
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        # Newest change in the catalog, for listing ETags
+        Index("ix_products_updated_at", "updated_at"),
+        # Serves catalog search; only exists on MySQL
+        Index(
+            "ix_products_name_description_fulltext", "name", "description", mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
     
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     seller_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -33,3 +49,18 @@ class ProductImage(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     product_id: Mapped[str] = mapped_column(String(36), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
     image_url: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Resized renditions: {"thumbnail": {"webp": url, "avif": url}, "card": ..., "full": ...}
+    variants: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+
+class CatalogState(Base):
+    """
+    Catalog-wide change counter listing ETags are derived from, in a single row.
+
+    MAX(updated_at) misses deletions and has one second resolution, so product
+    services also count every change they commit here.
+    """
+    __tablename__ = "catalog_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    changes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
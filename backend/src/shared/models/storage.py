@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.infrastructure.database import Base
+
+
+class StoredObject(Base):
+    """
+    A content-addressed object in the bucket and how many product images use it.
+
+    Identical uploads share one key, so an object may only be removed once
+    refcount is zero. last_uploaded_at protects an upload that has not been
+    attached to a product yet. Times are naive UTC.
+    """
+    __tablename__ = "stored_objects"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    refcount: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_uploaded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
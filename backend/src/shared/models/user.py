@@ -8,6 +8,7 @@ from sqlalchemy.sql import func
 import bcrypt
 
 from src.infrastructure.database import Base
+from src.shared.config.cfg import settings
 
 if TYPE_CHECKING:
     from .payments import Customer
@@ -54,14 +55,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     
     return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    """Hash a password using bcrypt, with PASSWORD_HASH_ROUNDS unless rounds is given"""
     # Bcrypt has a 72-byte limit, so truncate if necessary
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
     
     # Generate salt and hash the password
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or settings.PASSWORD_HASH_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a bcrypt hash was made with a cost other than PASSWORD_HASH_ROUNDS"""
+    # Hashes look like $2b$12$<salt+digest>
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) != settings.PASSWORD_HASH_ROUNDS
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import StrEnum
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from src.shared.schemas.product import ProductBase, ProductWithImages
 # from src.shared.schemas.product import ProductBase
@@ -35,6 +35,32 @@ class CartItemResponse(CartItemBase):
     class Config:
         from_attributes = True
 
+class CartOperation(StrEnum):
+    ADD = "add"
+    SET = "set"
+    REMOVE = "remove"
+
+
+MAX_CART_BATCH_OPERATIONS = 100
+
+
+class CartBatchOperation(BaseModel):
+    op: CartOperation
+    product_id: str
+    # Required by add and set, ignored by remove
+    quantity: Optional[int] = Field(None, gt=0)
+
+    @model_validator(mode="after")
+    def check_quantity(self) -> "CartBatchOperation":
+        if self.op != CartOperation.REMOVE and self.quantity is None:
+            raise ValueError(f"quantity is required for {self.op.value}")
+        return self
+
+
+class CartBatchRequest(BaseModel):
+    operations: List[CartBatchOperation] = Field(..., min_length=1, max_length=MAX_CART_BATCH_OPERATIONS)
+
+
 class CartItemWithProductResponse(CartItemBase):
     id: str
     user_id: int
@@ -1,11 +1,13 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
 class ProductImageBase(BaseModel):
     image_url: str = Field(..., max_length=255)
+    # Resized URLs by variant ("thumbnail", "card", "full") and format ("webp", "avif")
+    variants: Optional[Dict[str, Dict[str, str]]] = None
 
 
 class ProductImageCreate(ProductImageBase):
@@ -20,6 +22,12 @@ class ProductImageResponse(ProductImageBase):
         from_attributes = True
 
 
+class ProductImageAttach(BaseModel):
+    """An image uploaded straight to the bucket with an upload grant"""
+    file_key: str = Field(..., max_length=255)
+    upload_token: str = Field(..., max_length=1024)
+
+
 class ProductBase(BaseModel):
     name: str = Field(..., max_length=255)
     price: Decimal = Field(..., gt=0, decimal_places=2)
@@ -56,10 +64,13 @@ class ProductResponse(ProductBase):
 
 class ProductListResponse(BaseModel):
     products: List[ProductResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class ProductQueryParams(BaseModel):
@@ -69,5 +80,8 @@ class ProductQueryParams(BaseModel):
     price_max: Optional[Decimal] = Field(default=None, ge=0)
     product_type: Optional[str] = Field(default=None, max_length=100)
     search: Optional[str] = Field(default=None, max_length=255)
-    sort: Optional[str] = Field(default="created_at", pattern="^(name|price|created_at)$")
+    sort: Optional[str] = Field(default="created_at", pattern="^(name|price|created_at|relevance)$")
     order: Optional[str] = Field(default="desc", pattern="^(asc|desc)$")
+    cursor: Optional[str] = Field(default=None, max_length=512)
+    count: Optional[str] = Field(default="exact", pattern="^(exact|cached|estimated)$")
+    include_total: bool = True
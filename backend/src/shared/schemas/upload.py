@@ -0,0 +1,23 @@
+from typing import Dict, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class UploadGrantRequest(BaseModel):
+    """A product image the client wants to upload straight to the bucket"""
+    content_type: str = Field(..., max_length=100)
+    size: int = Field(..., gt=0)
+    # PUT works everywhere; POST (a browser form upload) only on S3 proper, not R2
+    method: Literal["PUT", "POST"] = "PUT"
+
+
+class UploadGrantResponse(BaseModel):
+    file_key: str
+    # Proof of the grant, sent back with file_key when attaching the upload
+    upload_token: str
+    method: str
+    url: str
+    # Headers to send with a PUT, or form fields to send before the file with a POST
+    headers: Optional[Dict[str, str]] = None
+    fields: Optional[Dict[str, str]] = None
+    expires_in: int
+    max_bytes: int
@@ -1,5 +1,6 @@
 from datetime import datetime
 from enum import StrEnum
+from typing import Optional
 from pydantic import BaseModel, EmailStr, Field
 
 class UserRoleEnum(StrEnum):
@@ -31,3 +32,12 @@ class UserResponse(UserBase):
 class AuthResponse(BaseModel):
     user: UserResponse
     access_token: str
+
+class AuthContext(BaseModel):
+    """Authenticated principal, built from verified token claims without loading the User"""
+    id: int
+    username: str
+    role: UserRoleEnum
+    is_active: bool
+    jti: Optional[str] = None
+    expires_at: Optional[datetime] = None
@@ -14,28 +14,39 @@ def generate_unique_filepath(path: str, file_type: Optional[str] = None) -> str:
     Returns:
         Unique filepath with UUID
     """
-    # Generate unique identifier
-    unique_id = str(uuid.uuid4())
-    
-    # Extract file extension from file_type if provided
-    if file_type:
-        if file_type.startswith('image/'):
-            # Convert MIME type to extension
-            extension_map = {
-                'image/jpeg': 'jpg',
-                'image/jpg': 'jpg', 
-                'image/png': 'png',
-                'image/gif': 'gif',
-                'image/webp': 'webp',
-                'image/svg+xml': 'svg'
-            }
-            extension = extension_map.get(file_type, 'jpg')
-        else:
-            # Assume it's already an extension
-            extension = file_type.lstrip('.')
-    else:
-        extension = 'jpg'  # Default extension
-    
+    return f"{_folder(path)}{uuid.uuid4()}.{_extension(file_type)}"
+
+
+def content_filepath(path: str, digest: str, file_type: Optional[str] = None) -> str:
+    """
+    Filepath addressed by the hash of a file's content.
+
+    Uploading the same bytes to the same path always yields the same key.
+    """
+    return f"{_folder(path)}{digest}.{_extension(file_type)}"
+
+
+def _extension(file_type: Optional[str]) -> str:
+    """File extension for a MIME type or extension, 'jpg' when unknown"""
+    if not file_type:
+        return 'jpg'  # Default extension
+    if file_type.startswith('image/'):
+        # Convert MIME type to extension
+        extension_map = {
+            'image/jpeg': 'jpg',
+            'image/jpg': 'jpg', 
+            'image/png': 'png',
+            'image/gif': 'gif',
+            'image/webp': 'webp',
+            'image/svg+xml': 'svg'
+        }
+        return extension_map.get(file_type, 'jpg')
+    # Assume it's already an extension
+    return file_type.lstrip('.')
+
+
+def _folder(path: str) -> str:
+    """Path without a leading slash and with a trailing one (empty stays empty)"""
     # Ensure path doesn't start with /
     if path.startswith('/'):
         path = path[1:]
@@ -43,8 +54,18 @@ def generate_unique_filepath(path: str, file_type: Optional[str] = None) -> str:
     # Ensure path ends with /
     if path and not path.endswith('/'):
         path += '/'
-    
-    return f"{path}{unique_id}.{extension}"
+    return path
+
+
+def variant_key(file_key: str, variant: str, fmt: str) -> str:
+    """
+    Key of a resized variant of a stored image.
+
+    Variants sit in a folder named after the original, e.g.
+    'products/images/<uuid>.png' -> 'products/images/<uuid>/card.webp'.
+    """
+    stem = file_key.rsplit('.', 1)[0] if '.' in file_key.rsplit('/', 1)[-1] else file_key
+    return f"{stem}/{variant}.{fmt}"
 
 
 def get_public_url(file_key: str, domain: str) -> str:
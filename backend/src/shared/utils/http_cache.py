@@ -0,0 +1,69 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """
+    Build a quoted ETag from the values a response is derived from.
+
+    Use weak=True when the parts only fingerprint the content (e.g. a max
+    updated_at and a row count) rather than hash the exact bytes sent.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime for Last-Modified; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True when the request's validators show the client already has this representation"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime], cache_control: str) -> Dict[str, str]:
+    """Validator and Cache-Control headers for a cacheable response"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """Empty 304 carrying the same validators and caching headers a 200 would"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,167 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, asc, desc, or_
+from sqlalchemy.orm import Query
+
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+
+@dataclass
+class KeysetCursor:
+    """Position in a keyset-paginated listing: the (sort value, id) of a boundary row."""
+    sort: str
+    order: str
+    value: Any
+    id: str
+    direction: str = CURSOR_NEXT
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def _serialize_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize_value(sort: str, value: Any) -> Any:
+    if sort == "created_at":
+        return datetime.fromisoformat(value)
+    if sort == "price":
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort: str, order: str, value: Any, row_id: str, direction: str = CURSOR_NEXT) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor string"""
+    payload = {
+        "s": sort,
+        "o": order,
+        "v": _serialize_value(value),
+        "id": row_id,
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str] = None, order: Optional[str] = None) -> KeysetCursor:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    If sort/order are given the cursor must have been issued for the same ordering.
+    Raises ValueError if the cursor is malformed or does not match.
+    """
+    decoded = _decode_cursor(cursor)
+    if sort is not None and decoded.sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{decoded.sort}', not '{sort}'")
+    if order is not None and decoded.order != order:
+        raise ValueError(f"Cursor was issued for order '{decoded.order}', not '{order}'")
+    return decoded
+
+
+def _decode_cursor(cursor: str) -> KeysetCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = payload.get("d", CURSOR_NEXT)
+        if direction not in (CURSOR_NEXT, CURSOR_PREV):
+            raise ValueError(f"Unknown cursor direction: {direction}")
+        return KeysetCursor(
+            sort=payload["s"],
+            order=payload["o"],
+            value=_deserialize_value(payload["s"], payload["v"]),
+            id=str(payload["id"]),
+            direction=direction,
+        )
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, KeyError, TypeError, InvalidOperation) as e:
+        raise ValueError(f"Malformed cursor: {e}") from e
+
+
+def fetch_keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    sort: str,
+    order: str,
+    per_page: int,
+    cursor: Optional[KeysetCursor] = None,
+    offset: int = 0,
+) -> KeysetPage:
+    """
+    Fetch one page ordered by (sort_column, id_column).
+
+    With a cursor the page starts right after (or, for "prev" cursors, right before)
+    the boundary row, so the database seeks on the index instead of skipping rows.
+    Without a cursor the classic offset is applied. Either way the returned page carries
+    cursors that continue the listing in keyset mode.
+    """
+    descending = order == "desc"
+    backwards = cursor is not None and cursor.direction == CURSOR_PREV
+    # Walking backwards is a forward scan with the ordering flipped
+    scan_descending = descending != backwards
+
+    if cursor is not None:
+        if scan_descending:
+            query = query.filter(
+                or_(
+                    sort_column < cursor.value,
+                    and_(sort_column == cursor.value, id_column < cursor.id)
+                )
+            )
+        else:
+            query = query.filter(
+                or_(
+                    sort_column > cursor.value,
+                    and_(sort_column == cursor.value, id_column > cursor.id)
+                )
+            )
+
+    direction_fn = desc if scan_descending else asc
+    query = query.order_by(direction_fn(sort_column), direction_fn(id_column))
+
+    if cursor is None and offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row to find out whether there is anything beyond this page
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if backwards:
+        rows.reverse()
+
+    page = KeysetPage(items=rows)
+    if not rows:
+        return page
+
+    first, last = rows[0], rows[-1]
+
+    if backwards:
+        has_next = True
+        has_prev = has_more
+    else:
+        has_next = has_more
+        has_prev = cursor is not None or offset > 0
+
+    if has_next:
+        page.next_cursor = encode_cursor(sort, order, getattr(last, sort), last.id, CURSOR_NEXT)
+    if has_prev:
+        page.prev_cursor = encode_cursor(sort, order, getattr(first, sort), first.id, CURSOR_PREV)
+
+    return page
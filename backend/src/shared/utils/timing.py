@@ -0,0 +1,45 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+class Timings:
+    """
+    Named durations collected while handling a request, safe to record from worker threads.
+
+    A name recorded several times (e.g. one per concurrent call) is reported
+    with its longest duration and the number of calls.
+    """
+
+    def __init__(self) -> None:
+        self._durations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, milliseconds: float) -> None:
+        with self._lock:
+            self._durations.setdefault(name, []).append(milliseconds)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def summary(self) -> Dict[str, float]:
+        """Longest duration per name, in milliseconds"""
+        with self._lock:
+            return {name: round(max(durations), 1) for name, durations in self._durations.items()}
+
+    def server_timing(self) -> str:
+        """The durations as a Server-Timing header value"""
+        with self._lock:
+            metrics = []
+            for name, durations in self._durations.items():
+                metric = f"{name};dur={max(durations):.1f}"
+                if len(durations) > 1:
+                    metric += f';desc="{len(durations)} calls"'
+                metrics.append(metric)
+        return ", ".join(metrics)
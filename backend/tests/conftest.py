@@ -1,9 +1,22 @@
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.infrastructure.database import Base
 from src.shared.models.user import User
+from src.shared.models.product import Product, ProductImage
+from src.shared.models.order import Order, OrderItem, CartItem
+from src.shared.models.payments import Customer
+from src.shared.models.storage import StoredObject
+from src.shared.models.auth import RevokedToken
 from src.shared.schemas.user import UserCreate, UserLogin, UserRoleEnum
 from src.domains.auth.service import AuthService
+from src.infrastructure import cache as cache_module
+from src.infrastructure.cache import MemoryCache, TieredCache
+from src.infrastructure import ratelimit as ratelimit_module
+from src.infrastructure.ratelimit import MemoryRateLimitBackend, RateLimiter
 
 # Mock the bcrypt context to prevent initialization issues during testing
 @pytest.fixture(autouse=True)
@@ -11,13 +24,31 @@ def mock_bcrypt_context():
     """Mock bcrypt context to prevent initialization issues."""
     # Only mock the context initialization, not the actual methods
     # This prevents the 72-byte password error during bcrypt setup
-    with patch('src.shared.models.user.pwd_context.hash') as mock_hash, \
-         patch('src.shared.models.user.pwd_context.verify') as mock_verify:
+    with patch('src.domains.auth.service.get_password_hash') as mock_hash, \
+         patch('src.domains.auth.service.verify_password') as mock_verify:
         mock_hash.return_value = "$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj"
         mock_verify.return_value = True
         yield mock_hash, mock_verify
 
 
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    """Fresh cache per test, with an in-memory fake standing in for the shared tier."""
+    shared = MemoryCache()
+    cache = TieredCache(local=MemoryCache(max_entries=100), shared=shared, local_ttl_seconds=5)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    monkeypatch.setattr(cache_module, "_shared", shared)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter(monkeypatch):
+    """Fresh rate limit budgets per test."""
+    limiter = RateLimiter(MemoryRateLimitBackend())
+    monkeypatch.setattr(ratelimit_module, "_limiter", limiter)
+    return limiter
+
+
 @pytest.fixture
 def mock_session():
     """Mock database session."""
@@ -31,6 +62,27 @@ def mock_session():
     return session
 
 
+@pytest.fixture
+def sqlite_engine():
+    """In-memory SQLite engine with all tables created."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(sqlite_engine):
+    """Real database session backed by in-memory SQLite."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)()
+    yield session
+    session.close()
+
+
 @pytest.fixture
 def mock_user():
     """Mock User instance."""
@@ -0,0 +1,86 @@
+import pytest
+import pytest_asyncio
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.buyers.service import AsyncBuyerService
+from src.domains.products.service import AsyncProductService
+from src.domains.suppliers.service import AsyncSupplierService
+from src.infrastructure.database import Base
+from src.infrastructure.database.async_session import get_async_database_url
+from src.shared.models.order import CartItem, Order, OrderItem, OrderStatus
+from src.shared.models.product import Product, ProductImage
+from src.shared.models.user import User
+from src.shared.schemas.order import CartItemCreate, OrderResponse
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    """SQLite file seeded through a sync engine, shared with the async engine under test."""
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    buyer = User(email="buyer@example.com", username="buyer", hashed_password="x", role="buyer")
+    seller = User(email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    supplier = User(email="supplier@example.com", username="supplier", hashed_password="x", role="supplier")
+    session.add_all([buyer, seller, supplier])
+    session.flush()
+
+    product = Product(id="gem", seller_id=seller.id, name="Gem", price=Decimal(10), description="Shiny")
+    session.add(product)
+    session.add(ProductImage(product_id="gem", image_url="https://example.com/gem.jpg"))
+    order = Order(user_id=buyer.id, status=OrderStatus.CONFIRMED.value, total_amount=Decimal(20))
+    session.add(order)
+    session.flush()
+    session.add(OrderItem(order_id=order.id, product_id="gem", quantity=2, price_at_time=Decimal(10)))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return path
+
+
+@pytest_asyncio.fixture
+async def async_session(database_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestAsyncDatabaseUrl:
+    @pytest.mark.parametrize("url, expected", [
+        ("mysql+pymysql://user:secret@db:3306/shop", "mysql+aiomysql://user:secret@db:3306/shop"),
+        ("sqlite:///./shop.db", "sqlite+aiosqlite:///./shop.db"),
+    ])
+    def test_swaps_driver(self, url, expected):
+        assert get_async_database_url(url) == expected
+
+
+class TestAsyncServices:
+    @pytest.mark.asyncio
+    async def test_catalog_listing(self, async_session):
+        result = await AsyncProductService(async_session).query_products(elements=10)
+        assert [p.id for p in result.products] == ["gem"]
+        assert result.products[0].images[0].image_url == "https://example.com/gem.jpg"
+
+    @pytest.mark.asyncio
+    async def test_cart_round_trip(self, async_session):
+        service = AsyncBuyerService(async_session)
+        await service.add_to_cart(1, CartItemCreate(product_id="gem", quantity=3))
+
+        cart = await service.get_cart(1)
+
+        assert len(cart) == 1
+        assert cart[0].quantity == 3
+        assert cart[0].product.name == "Gem"
+
+    @pytest.mark.asyncio
+    async def test_orders_are_serialized_inside_the_session(self, async_session):
+        orders = await AsyncSupplierService(async_session).get_all_orders(3)
+        assert len(orders) == 1
+        assert isinstance(orders[0], OrderResponse)
+        assert orders[0].items[0].product.name == "Gem"
@@ -0,0 +1,108 @@
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from src.domains.auth.service import AuthService
+from src.domains.sellers.service import SellerService
+from src.domains.suppliers.service import SupplierService
+from src.shared.models.auth import RevokedToken
+from src.shared.models.user import User
+from src.shared.schemas.user import AuthContext, UserLogin
+
+
+@pytest.fixture
+def users(db_session):
+    db_session.add_all([
+        User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"),
+        User(id=2, email="buyer@example.com", username="buyer", hashed_password="x", role="buyer"),
+    ])
+    db_session.commit()
+    return db_session
+
+
+@pytest.fixture
+def statements(users):
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    engine = users.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def _login(session, username):
+    return AuthService(session).login_user(UserLogin(username=username, password="secret")).access_token
+
+
+class TestAuthContext:
+    def test_claims_resolve_without_querying_once_cached(self, users, statements):
+        service = AuthService(users)
+        token = _login(users, "seller")
+
+        context = service.get_auth_context(token)
+        assert (context.id, context.username, context.role, context.is_active) == (1, "seller", "seller", True)
+        assert context.jti
+
+        statements.clear()
+        assert service.get_auth_context(token) == context
+        assert statements == []
+
+    def test_revoked_token_is_rejected(self, users):
+        service = AuthService(users)
+        token = _login(users, "seller")
+        other_token = _login(users, "seller")
+
+        service.revoke_token(service.get_auth_context(token))
+        assert service.get_auth_context(token) is None
+        assert service.get_auth_context(other_token) is not None
+
+    def test_deactivation_applies_once_committed(self, users):
+        service = AuthService(users)
+        token = _login(users, "seller")
+        assert service.get_auth_context(token).is_active
+
+        users.get(User, 1).is_active = False
+        assert service.get_auth_context(token).is_active
+        users.commit()
+        assert not service.get_auth_context(token).is_active
+
+    def test_revocation_reaches_workers_that_did_not_see_it(self, users, cache):
+        token = _login(users, "seller")
+        AuthService(users).revoke_token(AuthService(users).get_auth_context(token))
+
+        # Another worker: nothing cached, and no Redis to share the verdict
+        cache.local.clear()
+        cache.shared.clear()
+        assert AuthService(users).get_auth_context(token) is None
+        assert users.query(RevokedToken).count() == 1
+
+    def test_tokens_without_uid_fall_back_to_username(self, users):
+        service = AuthService(users)
+        token = service._create_access_token({"sub": "buyer"}, timedelta(minutes=5))
+        context = service.get_auth_context(token)
+        assert (context.id, context.role) == (2, "buyer")
+
+    def test_invalid_token(self, users):
+        assert AuthService(users).get_auth_context("not-a-token") is None
+
+
+class TestRoleChecksUsePrincipal:
+    def test_seller_listing_skips_user_lookup(self, users, statements):
+        principal = AuthContext(id=1, username="seller", role="seller", is_active=True)
+        SellerService(users, principal=principal).get_seller_products(1)
+        assert not any("FROM users" in statement for statement in statements)
+
+    def test_wrong_role_is_rejected_without_query(self, users, statements):
+        principal = AuthContext(id=2, username="buyer", role="buyer", is_active=True)
+        with pytest.raises(HTTPException) as exc_info:
+            SupplierService(users, principal=principal).get_all_orders(2)
+        assert exc_info.value.status_code == 403
+        assert statements == []
+
+    def test_without_principal_the_user_is_loaded(self, users, statements):
+        SellerService(users).get_seller_products(1)
+        assert any("FROM users" in statement for statement in statements)
@@ -0,0 +1,123 @@
+import io
+import boto3
+from boto3.s3.transfer import TransferConfig
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.domains.uploads.router import router as uploads_router
+from src.infrastructure import bucket as bucket_module
+from src.infrastructure.bucket import R2BucketManager, build_r2_client, get_bucket_manager
+from src.infrastructure.database import get_db
+from src.shared.config.cfg import settings
+from src.shared.dependencies.auth import get_current_user
+from src.shared.dependencies.services import get_bucket_manager_service
+from src.shared.schemas.user import AuthContext
+
+moto = pytest.importorskip("moto")
+
+BUCKET = "test-bucket"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """An in-process S3 stand-in holding an empty bucket."""
+    monkeypatch.setattr(settings, "R2_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(settings, "R2_ENDPOINT_URL", "")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield build_r2_client()
+
+
+@pytest.fixture
+def manager(s3):
+    return R2BucketManager(client=s3)
+
+
+class TestSharedClient:
+    def test_one_manager_per_process(self, s3, monkeypatch):
+        monkeypatch.setattr(bucket_module, "_bucket_manager", None)
+        assert get_bucket_manager() is get_bucket_manager()
+
+    def test_client_is_tuned_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "R2_MAX_POOL_CONNECTIONS", 7)
+        config = build_r2_client().meta.config
+        assert config.max_pool_connections == 7
+        assert config.retries == {"total_max_attempts": settings.R2_MAX_ATTEMPTS, "mode": "standard"}
+        assert config.tcp_keepalive
+
+    @pytest.mark.asyncio
+    async def test_put_get_delete(self, manager):
+        key = await manager.put("products/images", io.BytesIO(PNG), content_type="image/png", file_type="image/png")
+        assert key.startswith("products/images/") and key.endswith(".png")
+        assert manager.get(key) == PNG
+        manager.delete([key])
+        assert manager.get(key) is None
+
+
+async def _chunks(data, size=1024 * 1024, fail_after=None):
+    for offset in range(0, len(data), size):
+        if fail_after is not None and offset >= fail_after:
+            raise RuntimeError("client went away")
+        yield data[offset:offset + size]
+
+
+class TestStreamingPut:
+    # S3 wants every part but the last to be at least 5MB
+    PART = 5 * 1024 * 1024
+
+    @pytest.fixture
+    def multipart_manager(self, s3):
+        return R2BucketManager(client=s3, transfer_config=TransferConfig(multipart_chunksize=self.PART))
+
+    @pytest.mark.asyncio
+    async def test_small_file_is_a_single_put(self, multipart_manager, s3):
+        key, size = await multipart_manager.put_stream("images", _chunks(PNG, size=16), "image/png", "image/png")
+        assert (size, multipart_manager.get(key)) == (len(PNG), PNG)
+        assert s3.head_object(Bucket=BUCKET, Key=key)["ContentType"] == "image/png"
+
+    @pytest.mark.asyncio
+    async def test_large_file_goes_up_in_parts(self, multipart_manager, s3):
+        data = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+        key, size = await multipart_manager.put_stream("images", _chunks(data), "image/png", "image/png")
+        assert size == len(data)
+        assert multipart_manager.get(key) == data
+        assert s3.head_object(Bucket=BUCKET, Key=key)["ETag"].endswith('-3"')
+
+    @pytest.mark.asyncio
+    async def test_failing_source_aborts_the_upload(self, multipart_manager, s3):
+        data = b"\x00" * (11 * 1024 * 1024)
+        with pytest.raises(RuntimeError):
+            await multipart_manager.put_stream("images", _chunks(data, fail_after=6 * 1024 * 1024))
+        assert "Uploads" not in s3.list_multipart_uploads(Bucket=BUCKET)
+        assert "Contents" not in s3.list_objects_v2(Bucket=BUCKET)
+
+
+def test_upload_endpoint_uses_injected_manager(s3, manager):
+    app = FastAPI()
+    app.include_router(uploads_router)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: AuthContext(id=1, username="seller", role="seller", is_active=True)
+    app.dependency_overrides[get_bucket_manager_service] = lambda: manager
+
+    with TestClient(app) as client:
+        response = client.post("/uploads/image", files={"file": ("gem.png", PNG, "image/png")})
+
+    assert response.status_code == 200
+    assert manager.get(response.json()["file_key"]) == PNG
+
+
+def test_upload_endpoint_rejects_oversized_stream(s3, manager, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_IMAGE_BYTES", len(PNG) - 1)
+    app = FastAPI()
+    app.include_router(uploads_router)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: AuthContext(id=1, username="seller", role="seller", is_active=True)
+    app.dependency_overrides[get_bucket_manager_service] = lambda: manager
+
+    with TestClient(app) as client:
+        response = client.post("/uploads/image", files={"file": ("gem.png", PNG, "image/png")})
+
+    assert response.status_code == 413
+    assert "Contents" not in manager._client.list_objects_v2(Bucket=BUCKET)
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import boto3
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.bucket import R2BucketManager, build_r2_client
+from src.infrastructure.bucket.gc import BucketGarbageCollector, image_stem, url_file_key
+from src.shared.config.cfg import settings
+from src.shared.models.product import Product, ProductImage
+from src.shared.models.storage import StoredObject
+from src.shared.models.user import User
+
+moto = pytest.importorskip("moto")
+
+BUCKET = "test-bucket"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "R2_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(settings, "R2_ENDPOINT_URL", "")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield R2BucketManager(client=build_r2_client())
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    return sessionmaker(bind=sqlite_engine)
+
+
+@pytest.fixture
+def bucket(manager, session_factory):
+    """A referenced image with a variant, an orphan with a variant, and an image outside the prefix."""
+    for key in [
+        "products/images/kept.png", "products/images/kept/card.webp",
+        "products/images/orphan.png", "products/images/orphan/card.webp",
+        "avatars/someone.png",
+    ]:
+        manager._client.put_object(Bucket=BUCKET, Key=key, Body=b"x" * 10)
+
+    with session_factory() as session:
+        session.add(User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"))
+        session.add(Product(id="gem-1", seller_id=1, name="Gem", price=Decimal("10.00"), description="gem"))
+        session.add(ProductImage(product_id="gem-1", image_url=manager.get_public_url("products/images/kept.png")))
+        session.commit()
+    return manager
+
+
+def _keys(manager):
+    return sorted(obj["Key"] for obj in manager.list_objects(""))
+
+
+def test_image_stem():
+    assert image_stem("products/images/abc.png") == "products/images/abc"
+    assert image_stem("products/images/abc/thumbnail.avif") == "products/images/abc"
+
+
+def test_url_file_key():
+    assert url_file_key("https://s.example.com/products/images/a.png?v=2", "s.example.com") == "products/images/a.png"
+    assert url_file_key("https://s.example.com/products/images/a.png", "https://s.example.com/") == "products/images/a.png"
+    assert url_file_key("https://old.example.com/products/images/a.png", "s.example.com") is None
+
+
+class TestBucketGarbageCollector:
+    def test_orphans_and_their_variants_are_deleted(self, bucket, session_factory):
+        long_ago = datetime(2020, 1, 1)
+        with session_factory() as session:
+            session.add(StoredObject(key="products/images/orphan.png", refcount=0, last_uploaded_at=long_ago, created_at=long_ago))
+            session.commit()
+
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=0).run()
+
+        assert _keys(bucket) == ["avatars/someone.png", "products/images/kept.png", "products/images/kept/card.webp"]
+        assert (report.listed, report.referenced, report.orphaned, report.deleted) == (4, 2, 2, 2)
+        assert report.orphaned_bytes == 20
+        assert report.metrics()["deleted_per_second"] > 0
+        with session_factory() as session:
+            assert session.get(StoredObject, "products/images/orphan.png") is None
+
+    def test_dry_run_only_reports(self, bucket, session_factory):
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=0).run(dry_run=True)
+
+        assert report.sample == ["products/images/orphan.png", "products/images/orphan/card.webp"]
+        assert report.deleted == 0
+        assert "would delete 2 orphans" in report.summary()
+        assert len(_keys(bucket)) == 5
+
+    def test_recent_objects_are_kept(self, bucket, session_factory):
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=3600).run()
+        assert (report.recent, report.deleted) == (4, 0)
+
+    def test_recently_reuploaded_content_is_kept(self, bucket, session_factory, monkeypatch):
+        # A deduplicated upload leaves the old object, and its LastModified, in place
+        listing = bucket.list_objects
+        monkeypatch.setattr(bucket, "list_objects", lambda prefix: (
+            {**obj, "LastModified": obj["LastModified"] - timedelta(days=1)} for obj in listing(prefix)
+        ))
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with session_factory() as session:
+            session.add(StoredObject(key="products/images/orphan.png", refcount=0, last_uploaded_at=now, created_at=now))
+            session.commit()
+
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=3600).run()
+        assert (report.recent, report.orphaned) == (2, 0)
+        assert "products/images/orphan/card.webp" in _keys(bucket)
+
+    def test_deletes_in_batches(self, manager, session_factory, monkeypatch):
+        monkeypatch.setattr("src.infrastructure.bucket.gc.DELETE_BATCH_SIZE", 2)
+        for i in range(5):
+            manager._client.put_object(Bucket=BUCKET, Key=f"products/images/{i}.png", Body=b"x")
+        batches = []
+        delete = manager.delete
+        monkeypatch.setattr(manager, "delete", lambda keys: batches.append(len(keys)) or delete(keys))
+
+        report = BucketGarbageCollector(session_factory, manager, grace_seconds=0, max_orphan_fraction=1).run()
+        assert batches == [2, 2, 1]
+        assert report.deleted == 5
+        assert _keys(manager) == []
+
+    def test_unresolved_image_urls_abort(self, bucket, session_factory):
+        with session_factory() as session:
+            session.add(ProductImage(product_id="gem-1", image_url="https://old.example.com/products/images/orphan.png"))
+            session.commit()
+
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=0).run()
+        assert report.unresolved == ["https://old.example.com/products/images/orphan.png"]
+        assert report.aborted and report.deleted == 0
+        assert len(_keys(bucket)) == 5
+
+    def test_query_strings_still_reference(self, bucket, session_factory):
+        with session_factory() as session:
+            session.add(ProductImage(product_id="gem-1", image_url=bucket.get_public_url("products/images/orphan.png") + "?v=2"))
+            session.commit()
+
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=0).run()
+        assert (report.referenced, report.orphaned, report.aborted) == (4, 0, None)
+
+    def test_too_many_orphans_abort(self, bucket, session_factory):
+        report = BucketGarbageCollector(session_factory, bucket, grace_seconds=0, max_orphan_fraction=0.25).run()
+        assert "2 of 4 objects look orphaned" in report.aborted
+        assert len(_keys(bucket)) == 5
+
+    def test_content_reused_after_references_are_read_is_kept(self, bucket, session_factory, monkeypatch):
+        long_ago = datetime(2020, 1, 1)
+        with session_factory() as session:
+            session.add(StoredObject(key="products/images/orphan.png", refcount=0, last_uploaded_at=long_ago, created_at=long_ago))
+            session.commit()
+
+        collector = BucketGarbageCollector(session_factory, bucket, grace_seconds=3600)
+        monkeypatch.setattr(bucket, "list_objects", lambda prefix, listing=bucket.list_objects: (
+            {**obj, "LastModified": obj["LastModified"] - timedelta(days=1)} for obj in listing(prefix)
+        ))
+        load_references = collector._load_references
+
+        def reupload_after_loading(*args):
+            references = load_references(*args)
+            # A deduplicated upload of the same bytes lands between the two reads
+            with session_factory() as session:
+                session.get(StoredObject, "products/images/orphan.png").last_uploaded_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                session.commit()
+            return references
+
+        monkeypatch.setattr(collector, "_load_references", reupload_after_loading)
+        report = collector.run()
+        assert (report.orphaned, report.reused, report.deleted) == (2, 2, 0)
+        assert "products/images/orphan.png" in _keys(bucket)
@@ -0,0 +1,123 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.buyers.service import BuyerService
+from src.infrastructure.database import Base
+from src.shared.models.order import CartItem
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.schemas.order import CartBatchRequest, CartItemCreate
+from tests.test_query_counts import count_queries
+
+
+def _seed(session):
+    session.add_all([
+        User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"),
+        User(id=2, email="buyer@example.com", username="buyer", hashed_password="x", role="buyer"),
+        Product(id="gem", seller_id=1, name="Gem", price=Decimal(10), description="x"),
+    ])
+    session.commit()
+
+
+class TestAddToCart:
+    @pytest.fixture
+    def session(self, db_session):
+        _seed(db_session)
+        return db_session
+
+    def test_adds_then_increments(self, session):
+        service = BuyerService(session)
+        first = service.add_to_cart(2, CartItemCreate(product_id="gem", quantity=2))
+        second = service.add_to_cart(2, CartItemCreate(product_id="gem", quantity=3))
+
+        assert first.id == second.id
+        assert second.quantity == 5
+        assert session.query(CartItem).count() == 1
+
+    def test_unknown_product(self, session):
+        with pytest.raises(HTTPException) as exc_info:
+            BuyerService(session).add_to_cart(2, CartItemCreate(product_id="missing", quantity=1))
+        assert exc_info.value.status_code == 404
+        assert session.query(CartItem).count() == 0
+
+
+def test_concurrent_adds_are_not_lost(tmp_path):
+    # A file database so every thread gets its own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'cart.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        _seed(session)
+
+    def add(_):
+        with factory() as session:
+            BuyerService(session).add_to_cart(2, CartItemCreate(product_id="gem", quantity=1))
+
+    adds = 40
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(add, range(adds)))
+
+    with factory() as session:
+        assert [item.quantity for item in session.query(CartItem).all()] == [adds]
+    engine.dispose()
+
+
+class TestCartBatch:
+    @pytest.fixture
+    def session(self, db_session):
+        _seed(db_session)
+        db_session.add_all([
+            Product(id="ore", seller_id=1, name="Ore", price=Decimal(5), description="x", stock_quantity=3),
+            Product(id="opal", seller_id=1, name="Opal", price=Decimal(5), description="x", stock_quantity=10),
+        ])
+        db_session.get(Product, "gem").stock_quantity = 10
+        db_session.commit()
+        return db_session
+
+    @staticmethod
+    def _cart(session):
+        return {item.product_id: item.quantity for item in session.query(CartItem).all()}
+
+    def test_applies_operations_in_order(self, session):
+        service = BuyerService(session)
+        service.add_to_cart(2, CartItemCreate(product_id="gem", quantity=2))
+        service.add_to_cart(2, CartItemCreate(product_id="ore", quantity=1))
+
+        result = service.apply_cart_batch(2, CartBatchRequest(operations=[
+            {"op": "add", "product_id": "gem", "quantity": 3},
+            {"op": "remove", "product_id": "ore"},
+            {"op": "add", "product_id": "opal", "quantity": 1},
+            {"op": "set", "product_id": "opal", "quantity": 4},
+            {"op": "add", "product_id": "opal", "quantity": 1},
+        ]))
+
+        assert {item.product_id: item.quantity for item in result} == {"gem": 5, "opal": 5}
+        assert self._cart(session) == {"gem": 5, "opal": 5}
+
+    def test_validates_in_one_query(self, session):
+        operations = [{"op": "set", "product_id": product_id, "quantity": 1} for product_id in ("gem", "ore", "opal")]
+        with count_queries(session) as statements:
+            BuyerService(session).apply_cart_batch(2, CartBatchRequest(operations=operations))
+        # Validation, one upsert for all rows and reading the cart back
+        assert len(statements) == 3
+
+    @pytest.mark.parametrize("operations, status_code", [
+        ([{"op": "add", "product_id": "missing", "quantity": 1}], 404),
+        ([{"op": "add", "product_id": "ore", "quantity": 4}], 400),
+    ])
+    def test_rejects_whole_batch(self, session, operations, status_code):
+        operations = [{"op": "set", "product_id": "gem", "quantity": 1}] + operations
+        with pytest.raises(HTTPException) as exc_info:
+            BuyerService(session).apply_cart_batch(2, CartBatchRequest(operations=operations))
+        assert exc_info.value.status_code == status_code
+        assert self._cart(session) == {}
+
+    def test_quantity_required_except_for_remove(self):
+        with pytest.raises(ValidationError):
+            CartBatchRequest(operations=[{"op": "set", "product_id": "gem"}])
+        CartBatchRequest(operations=[{"op": "remove", "product_id": "gem"}])
@@ -0,0 +1,152 @@
+import threading
+import time
+import pytest
+from decimal import Decimal
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.domains.buyers.router import router as buyers_router
+from src.domains.buyers.service import BuyerService
+from src.infrastructure import payments as payments_module
+from src.infrastructure.database import get_db
+from src.infrastructure.payments import get_dodo_payments
+from src.shared.dependencies.auth import get_current_user
+from src.shared.dependencies.services import get_dodo_payments_service
+from src.shared.config.cfg import settings
+from src.shared.models.order import CartItem
+from src.shared.models.payments import Customer
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.schemas.order import CheckoutRequest
+from src.shared.schemas.user import AuthContext
+from src.shared.utils.timing import Timings
+
+DELAY = 0.1
+
+
+class FakeDodo:
+    """Stands in for the DodoPayments client: slow calls that record what was open while they ran."""
+
+    def __init__(self, session, fail_for=()):
+        self.session = session
+        self.fail_for = set(fail_for)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.in_transaction = []
+        self.checkout_items = None
+        self._lock = threading.Lock()
+
+    def _call(self, key, result):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.in_transaction.append(self.session.in_transaction())
+        time.sleep(DELAY)
+        with self._lock:
+            self.in_flight -= 1
+        if key in self.fail_for:
+            raise ConnectionError(key)
+        return result
+
+    def sync_product_with_dodo(self, product):
+        return self._call(product.id, f"dodo-{product.id}")
+
+    def create_customer(self, email, name, user_id):
+        return self._call("customer", SimpleNamespace(customer_id="cus-1"))
+
+    def create_checkout_session(self, cart_items, existing_customer_id, **kwargs):
+        self.checkout_items = sorted((item["dodo_product_id"], item["quantity"]) for item in cart_items)
+        return self._call("session", SimpleNamespace(checkout_url="https://pay/1"))
+
+
+@pytest.fixture
+def cart(db_session):
+    db_session.add_all([
+        User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"),
+        User(id=2, email="buyer@example.com", username="buyer", hashed_password="x", role="buyer"),
+    ])
+    for i in range(4):
+        db_session.add(Product(id=f"gem-{i}", seller_id=1, name=f"Gem {i}", price=Decimal(10), description="x"))
+        db_session.add(CartItem(user_id=2, product_id=f"gem-{i}", quantity=i + 1))
+    db_session.commit()
+    return db_session
+
+
+def _checkout(session, dodo, timings=None):
+    return BuyerService(session, dodo_payments=dodo).checkout(2, CheckoutRequest(), timings=timings)
+
+
+class TestCheckout:
+    def test_provider_calls_run_concurrently_outside_transactions(self, cart, monkeypatch):
+        monkeypatch.setattr(settings, "DODO_PAYMENTS_MAX_CONCURRENCY", 3)
+        dodo = FakeDodo(cart)
+        timings = Timings()
+
+        start = time.perf_counter()
+        response = _checkout(cart, dodo, timings)
+        elapsed = time.perf_counter() - start
+
+        assert response.total_amount == 100.0
+        assert dodo.max_in_flight == 3
+        assert not any(dodo.in_transaction)
+        # Five preparatory calls three at a time, then the session: three rounds instead of six
+        assert elapsed < 5 * DELAY
+        assert dodo.checkout_items == [(f"dodo-gem-{i}", i + 1) for i in range(4)]
+
+        assert {p.id: p.dodo_product_id for p in cart.query(Product)} == {f"gem-{i}": f"dodo-gem-{i}" for i in range(4)}
+        assert cart.query(Customer).one().customer_id == "cus-1"
+        assert set(timings.summary()) == {
+            "db_read", "dodo_prepare", "dodo_sync_product", "dodo_create_customer", "db_write", "dodo_checkout_session"
+        }
+        assert 'dodo_sync_product;dur=' in timings.server_timing()
+        assert 'desc="4 calls"' in timings.server_timing()
+
+    def test_synced_products_and_customer_are_reused(self, cart):
+        _checkout(cart, FakeDodo(cart))
+        dodo = FakeDodo(cart)
+        _checkout(cart, dodo)
+        assert dodo.max_in_flight == 1  # only the checkout session itself
+
+    def test_failed_call_keeps_successful_syncs(self, cart):
+        with pytest.raises(HTTPException) as exc_info:
+            _checkout(cart, FakeDodo(cart, fail_for={"gem-2"}))
+        assert exc_info.value.status_code == 502
+
+        synced = {p.id for p in cart.query(Product) if p.dodo_product_id}
+        assert synced == {"gem-0", "gem-1", "gem-3"}
+
+
+class TestDodoClient:
+    @pytest.fixture(autouse=True)
+    def fresh_client(self, monkeypatch):
+        monkeypatch.setattr(payments_module, "_dodo_payments", None)
+
+    def test_one_configured_client_per_process(self, monkeypatch):
+        monkeypatch.setattr(settings, "DODO_PAYMENTS_MAX_RETRIES", 5)
+        service = get_dodo_payments()
+        assert get_dodo_payments() is service
+        assert service.client.max_retries == 5
+        assert service.client.timeout.connect == settings.DODO_PAYMENTS_CONNECT_TIMEOUT_SECONDS
+
+    def test_reads_do_not_create_a_client(self, cart):
+        BuyerService(cart).get_cart(2)
+        assert payments_module._dodo_payments is None
+
+    def test_checkout_endpoint_uses_injected_service(self, cart):
+        dodo = FakeDodo(cart)
+        app = FastAPI()
+        app.include_router(buyers_router)
+        app.dependency_overrides[get_db] = lambda: cart
+        app.dependency_overrides[get_current_user] = lambda: AuthContext(
+            id=2, username="buyer", role="buyer", is_active=True
+        )
+        app.dependency_overrides[get_dodo_payments_service] = lambda: dodo
+
+        with TestClient(app) as client:
+            response = client.post("/buyers/checkout", json={})
+
+        assert response.status_code == 200
+        assert response.json()["payment_url"] == "https://pay/1"
+        assert "dodo_checkout_session;dur=" in response.headers["Server-Timing"]
+        assert payments_module._dodo_payments is None
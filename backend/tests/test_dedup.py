@@ -0,0 +1,187 @@
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import boto3
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from src.domains.sellers.service import SellerService
+from src.domains.uploads import references
+from src.domains.uploads.router import router as uploads_router
+from src.domains.uploads.service import UploadService
+from src.infrastructure.bucket import R2BucketManager, build_r2_client
+from src.infrastructure.database import get_db
+from src.shared.config.cfg import settings
+from src.shared.dependencies.auth import get_current_user
+from src.shared.dependencies.services import get_bucket_manager_service
+from src.shared.models.storage import StoredObject
+from src.shared.models.user import User
+from src.shared.schemas.product import ProductCreate, ProductImageCreate
+from src.shared.schemas.user import AuthContext
+
+moto = pytest.importorskip("moto")
+
+BUCKET = "test-bucket"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 64
+
+
+def _image(content=PNG):
+    return UploadFile(io.BytesIO(content), filename="gem.png", headers=Headers({"content-type": "image/png"}))
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "R2_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(settings, "R2_ENDPOINT_URL", "")
+    monkeypatch.setattr(settings, "UPLOAD_CONTENT_ADDRESSED", True)
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        manager = R2BucketManager(client=build_r2_client())
+        monkeypatch.setattr(references, "get_bucket_manager", lambda: manager)
+        yield manager
+
+
+@pytest.fixture
+def seller(db_session):
+    db_session.add(User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"))
+    db_session.commit()
+    return SellerService(db_session)
+
+
+def _puts(manager):
+    calls = []
+    manager._client.meta.events.register("before-call.s3.PutObject", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def _age(db_session, key, seconds):
+    stored = db_session.get(StoredObject, key)
+    stored.last_uploaded_at -= timedelta(seconds=seconds)
+    db_session.commit()
+
+
+def _create_product(seller, url):
+    product = ProductCreate(name="Gem", price=Decimal("10.00"), description="gem", images=[ProductImageCreate(image_url=url)])
+    return seller.create_product(1, product)
+
+
+class TestContentAddressedUploads:
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_object(self, manager, db_session):
+        service = UploadService(manager, db_session)
+        puts = _puts(manager)
+
+        first = await service.upload_image(_image(), "products/images")
+        second = await service.upload_image(_image(), "products/images")
+
+        assert first["file_key"] == second["file_key"]
+        assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+        assert second["size"] == len(PNG)
+        assert len(puts) == 1
+        assert db_session.get(StoredObject, first["file_key"]).refcount == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_object_has_no_checksum(self, manager):
+        assert await manager.get_checksum("products/images/nope.png") is None
+
+    @pytest.mark.asyncio
+    async def test_random_keys_when_disabled(self, manager, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_CONTENT_ADDRESSED", False)
+        service = UploadService(manager, db_session)
+        first = await service.upload_image(_image(), "images")
+        second = await service.upload_image(_image(), "images")
+        assert first["file_key"] != second["file_key"]
+        assert db_session.query(StoredObject).count() == 0
+
+
+class TestReferenceCounting:
+    @pytest.mark.asyncio
+    async def test_object_outlives_all_but_the_last_product(self, manager, db_session, seller):
+        uploaded = await UploadService(manager, db_session).upload_image(_image(), "products/images")
+        key = uploaded["file_key"]
+        first = _create_product(seller, uploaded["url"])
+        second = _create_product(seller, uploaded["url"])
+        assert db_session.get(StoredObject, key).refcount == 2
+        _age(db_session, key, settings.UPLOAD_ORPHAN_GRACE_SECONDS + 1)
+
+        seller.delete_product(1, first.id)
+        assert manager.get(key) == PNG
+
+        seller.delete_product(1, second.id)
+        assert manager.get(key) is None
+        assert db_session.get(StoredObject, key) is None
+
+    @pytest.mark.asyncio
+    async def test_recent_upload_is_kept_for_grace_period(self, manager, db_session, seller):
+        uploaded = await UploadService(manager, db_session).upload_image(_image(), "products/images")
+        seller.delete_product(1, _create_product(seller, uploaded["url"]).id)
+
+        assert manager.get(uploaded["file_key"]) == PNG
+        assert db_session.get(StoredObject, uploaded["file_key"]).refcount == 0
+
+    @pytest.mark.asyncio
+    async def test_reuse_restarts_grace_period_before_the_existence_check(self, manager, db_session, monkeypatch):
+        service = UploadService(manager, db_session)
+        key = (await service.upload_image(_image(), "products/images"))["file_key"]
+        _age(db_session, key, settings.UPLOAD_ORPHAN_GRACE_SECONDS + 1)
+
+        get_checksum = manager.get_checksum
+
+        async def delete_meanwhile(file_key):
+            # Another request deletes the image between the existence check and the response
+            checksum = await get_checksum(file_key)
+            assert await UploadService(manager, db_session).delete_image(file_key) is False
+            return checksum
+
+        monkeypatch.setattr(manager, "get_checksum", delete_meanwhile)
+        reused = await service.upload_image(_image(), "products/images")
+        assert reused["deduplicated"]
+        assert manager.get(key) == PNG
+
+    def test_upload_between_check_and_delete_keeps_the_row(self, db_session, monkeypatch):
+        long_ago = datetime(2020, 1, 1)
+        db_session.add(StoredObject(key="products/images/a.png", refcount=0, last_uploaded_at=long_ago, created_at=long_ago))
+        db_session.commit()
+
+        scalars = db_session.scalars
+
+        def check_then_reupload(statement):
+            candidates = list(scalars(statement))
+            monkeypatch.setattr(db_session, "scalars", scalars)
+            # What a concurrent upload's record_uploads does right after the check
+            references.track_uploads(db_session, ["products/images/a.png"])
+            return candidates
+
+        monkeypatch.setattr(db_session, "scalars", check_then_reupload)
+        assert references.forget_unused(db_session, ["products/images/a.png"]) == []
+        assert db_session.get(StoredObject, "products/images/a.png") is not None
+
+    @pytest.mark.asyncio
+    async def test_delete_image_refuses_referenced_objects(self, manager, db_session, seller):
+        service = UploadService(manager, db_session)
+        uploaded = await service.upload_image(_image(), "products/images")
+        _create_product(seller, uploaded["url"])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.delete_image(uploaded["file_key"])
+        assert exc_info.value.status_code == 409
+        assert manager.get(uploaded["file_key"]) == PNG
+
+    def test_delete_endpoint(self, manager, db_session):
+        app = FastAPI()
+        app.include_router(uploads_router)
+        app.dependency_overrides[get_db] = lambda: db_session
+        app.dependency_overrides[get_current_user] = lambda: AuthContext(id=1, username="seller", role="seller", is_active=True)
+        app.dependency_overrides[get_bucket_manager_service] = lambda: manager
+
+        with TestClient(app) as client:
+            key = client.post("/uploads/image", files={"file": ("gem.png", PNG, "image/png")}).json()["file_key"]
+            assert client.delete(f"/uploads/image/{key}").json()["deleted"] is False
+
+            _age(db_session, key, settings.UPLOAD_ORPHAN_GRACE_SECONDS + 1)
+            assert client.delete(f"/uploads/image/{key}").json()["deleted"] is True
+
+        assert manager.get(key) is None
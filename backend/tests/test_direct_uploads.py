@@ -0,0 +1,175 @@
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.auth.service import AuthService
+from src.domains.products.service import ProductService
+from src.domains.sellers.router import router as sellers_router
+from src.domains.uploads.router import router as uploads_router
+from src.domains.uploads.service import sign_upload_grant
+from src.infrastructure.bucket import R2BucketManager, build_r2_client
+from src.infrastructure.database import Base, get_async_db
+from src.shared.config.cfg import settings
+from src.shared.dependencies.auth import get_current_user
+from src.shared.dependencies.services import get_bucket_manager_service
+from src.shared.models.product import Product
+from src.shared.models.storage import StoredObject
+from src.shared.models.user import User
+from src.shared.schemas.user import AuthContext
+
+moto = pytest.importorskip("moto")
+
+BUCKET = "test-bucket"
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 200
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "R2_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(settings, "R2_ENDPOINT_URL", "")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield R2BucketManager(client=build_r2_client())
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return tmp_path / "uploads.db"
+
+
+@pytest.fixture
+def db_session(database_path):
+    """File-backed so the async session the routes use sees the same data"""
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(manager, db_session, database_path):
+    db_session.add(User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"))
+    db_session.add(Product(id="gem-1", seller_id=1, name="Gem", price=Decimal("10.00"), description="gem"))
+    db_session.commit()
+
+    app = FastAPI()
+    app.include_router(uploads_router)
+    app.include_router(sellers_router)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_user] = lambda: AuthContext(id=1, username="seller", role="seller", is_active=True)
+    app.dependency_overrides[get_bucket_manager_service] = lambda: manager
+    with TestClient(app) as client:
+        yield client
+
+
+def _upload(manager, key, body, content_type="image/jpeg"):
+    """What the client does with the grant, straight against the bucket"""
+    manager._client.put_object(Bucket=BUCKET, Key=key, Body=body, ContentType=content_type)
+
+
+class TestGrants:
+    def test_put_grant_signs_type_and_size(self, client):
+        response = client.post("/uploads/image/grant", json={"content_type": "image/jpeg", "size": len(JPEG)})
+        assert response.status_code == 200
+        grant = response.json()
+
+        assert grant["method"] == "PUT"
+        assert grant["file_key"].startswith("products/images/") and grant["file_key"].endswith(".jpg")
+        assert grant["headers"] == {"Content-Type": "image/jpeg", "Content-Length": str(len(JPEG))}
+        query = parse_qs(urlparse(grant["url"]).query)
+        assert {"content-type", "content-length"} <= set(query["X-Amz-SignedHeaders"][0].split(";"))
+
+    def test_post_grant_bounds_size(self, client):
+        grant = client.post(
+            "/uploads/image/grant", json={"content_type": "image/png", "size": 10, "method": "POST"}
+        ).json()
+        assert grant["fields"]["key"] == grant["file_key"]
+        assert grant["fields"]["Content-Type"] == "image/png"
+        assert "policy" in grant["fields"]
+
+    @pytest.mark.parametrize("body, status", [
+        ({"content_type": "image/svg+xml", "size": 10}, 400),
+        ({"content_type": "image/png", "size": 6 * 1024 * 1024}, 413),
+        ({"content_type": "image/png", "size": 0}, 422),
+    ])
+    def test_invalid_grants(self, client, body, status):
+        assert client.post("/uploads/image/grant", json=body).status_code == status
+
+    def test_sellers_only(self, client):
+        client.app.dependency_overrides[get_current_user] = lambda: AuthContext(
+            id=2, username="buyer", role="buyer", is_active=True
+        )
+        assert client.post("/uploads/image/grant", json={"content_type": "image/png", "size": 10}).status_code == 403
+
+
+def _attach(client, key, token=None, product_id="gem-1"):
+    token = token if token is not None else sign_upload_grant(key, 1)
+    return client.post(f"/sellers/products/{product_id}/images", json={"file_key": key, "upload_token": token})
+
+
+class TestAttach:
+    def test_verified_upload_is_attached(self, client, manager, db_session):
+        grant = client.post("/uploads/image/grant", json={"content_type": "image/jpeg", "size": len(JPEG)}).json()
+        key = grant["file_key"]
+        _upload(manager, key, JPEG)
+        version = ProductService(db_session).get_listing_version()
+
+        response = _attach(client, key, grant["upload_token"])
+        assert response.status_code == 200
+        assert response.json()["image_url"] == manager.get_public_url(key)
+        assert db_session.get(StoredObject, key).refcount == 1
+        # Listings and the product's own validators both change
+        assert ProductService(db_session).get_listing_version() != version
+
+        # A grant attaches its upload once
+        assert _attach(client, key, grant["upload_token"]).status_code == 409
+
+    @pytest.mark.parametrize("key, body, status", [
+        ("products/images/missing.jpg", None, 404),
+        ("products/images/page.jpg", b"<html>not an image</html>", 400),
+        ("avatars/face.jpg", JPEG, 400),
+        ("products/images/abc/card.webp", JPEG, 400),
+    ])
+    def test_unverified_uploads_are_refused(self, client, manager, key, body, status):
+        if body is not None:
+            _upload(manager, key, body)
+        assert _attach(client, key).status_code == status
+
+    def test_grant_is_required(self, client, manager):
+        _upload(manager, "products/images/a.jpg", JPEG)
+        assert _attach(client, "products/images/a.jpg", token="not-a-grant").status_code == 403
+        # Issued to another user, or for another key
+        assert _attach(client, "products/images/a.jpg", sign_upload_grant("products/images/a.jpg", 2)).status_code == 403
+        assert _attach(client, "products/images/a.jpg", sign_upload_grant("products/images/b.jpg", 1)).status_code == 403
+
+    def test_grant_is_no_access_token(self):
+        assert AuthService(None)._verify_token(sign_upload_grant("products/images/a.jpg", 1)) is None
+
+    def test_oversized_upload_is_refused(self, client, manager, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_MAX_IMAGE_BYTES", 100)
+        _upload(manager, "products/images/big.jpg", JPEG)
+        assert _attach(client, "products/images/big.jpg").status_code == 413
+
+    def test_only_own_products(self, client, manager, db_session):
+        db_session.add(User(id=2, email="other@example.com", username="other", hashed_password="x", role="seller"))
+        db_session.add(Product(id="gem-2", seller_id=2, name="Gem", price=Decimal("10.00"), description="gem"))
+        db_session.commit()
+        _upload(manager, "products/images/a.jpg", JPEG)
+
+        assert _attach(client, "products/images/a.jpg", product_id="gem-2").status_code == 404
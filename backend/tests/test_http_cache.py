@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.products.router import router as products_router
+from src.domains.products.service import ProductService
+from src.infrastructure.database import Base, get_async_db
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.utils.http_cache import etag_matches, format_http_date, make_etag
+
+
+class TestValidators:
+    def test_etag_matching_uses_weak_comparison(self):
+        etag = make_etag("a", 1)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+
+    def test_naive_datetimes_are_formatted_as_utc(self):
+        assert format_http_date(datetime(2024, 1, 2, 3, 4, 5)) == "Tue, 02 Jan 2024 03:04:05 GMT"
+        assert format_http_date(datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)) == "Tue, 02 Jan 2024 03:04:05 GMT"
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = tmp_path / "catalog.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"))
+    session.add(Product(id="ruby", seller_id=1, name="Ruby", price=Decimal(50), description="Red gem"))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def client(database_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(products_router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+
+
+def _add_product(database_path, product_id):
+    engine = create_engine(f"sqlite:///{database_path}")
+    session = sessionmaker(bind=engine)()
+    # Later than the seeded product even within the same second
+    updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+    session.add(Product(id=product_id, seller_id=1, name=product_id, price=Decimal(10), description="x", updated_at=updated_at))
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+class TestConditionalRequests:
+    def test_product_detail_revalidates(self, client):
+        response = client.get("/products/ruby")
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].startswith("public")
+        assert "Last-Modified" in response.headers
+
+        etag = response.headers["ETag"]
+        not_modified = client.get("/products/ruby", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["ETag"] == etag
+
+        since = client.get("/products/ruby", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+        assert since.status_code == 304
+
+    def test_listing_etag_changes_with_catalog_and_filters(self, client, database_path):
+        response = client.get("/products/")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith("W/")
+
+        assert client.get("/products/", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/products/?price_min=20", headers={"If-None-Match": etag}).status_code == 200
+
+        _add_product(database_path, "opal")
+        changed = client.get("/products/", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert len(changed.json()["products"]) == 2
+
+    def test_listing_etag_changes_when_a_product_is_deleted(self, client, database_path, monkeypatch):
+        _add_product(database_path, "opal")
+        etag = client.get("/products/").headers["ETag"]
+
+        engine = create_engine(f"sqlite:///{database_path}")
+        session = sessionmaker(bind=engine)()
+        monkeypatch.setattr("src.domains.products.service.get_search_backend", lambda session: Mock())
+        ProductService(session).delete_product("ruby", 1)
+        session.close()
+        engine.dispose()
+
+        changed = client.get("/products/", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert [product["id"] for product in changed.json()["products"]] == ["opal"]
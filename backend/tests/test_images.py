@@ -0,0 +1,152 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from src.domains.uploads.service import UploadService
+from src.infrastructure.images import ImageProcessor, render_variants
+from src.infrastructure.images.processor import available_formats
+from src.shared.config.cfg import settings
+from src.shared.exceptions import ImageProcessingError
+from src.shared.schemas.product import ProductImageResponse
+from src.shared.utils.bucket import variant_key
+
+MAX_PIXELS = 40_000_000
+
+
+def _encode(size=(2000, 1000), fmt="JPEG", mode="RGB", color="red", **params):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def _exif(orientation=None):
+    exif = Image.Exif()
+    exif[0x010F] = "GemCam"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    return exif
+
+
+class FakeProcessor:
+    """Renders in-process so service tests don't pay for a pool."""
+
+    async def render(self, data):
+        try:
+            return render_variants(data, MAX_PIXELS)
+        except OSError as e:
+            raise ImageProcessingError(str(e))
+
+
+class RecordingBucket:
+    def __init__(self):
+        self.objects = {}
+
+    async def get_checksum(self, key):
+        return "etag" if key in self.objects else None
+
+    async def put_stream(self, path, chunks, content_type=None, file_type=None, key=None):
+        body = b"".join([chunk async for chunk in chunks])
+        key = key or f"{path}/original.{file_type.split('/')[-1]}"
+        self.objects[key] = body
+        return key, len(body)
+
+    async def put_variants(self, file_key, renditions):
+        urls = {}
+        for name, encoded in renditions.items():
+            for fmt, body in encoded.items():
+                self.objects[variant_key(file_key, name, fmt)] = body
+                urls.setdefault(name, {})[fmt] = f"https://cdn/{variant_key(file_key, name, fmt)}"
+        return urls
+
+    def delete(self, keys):
+        for key in keys:
+            self.objects.pop(key, None)
+
+    def get_public_url(self, key):
+        return f"https://cdn/{key}"
+
+
+class TestRenderVariants:
+    def test_sizes_and_formats(self):
+        renditions = render_variants(_encode(), MAX_PIXELS)
+
+        assert set(renditions) == {"thumbnail", "card", "full"}
+        assert set(renditions["card"]) == set(available_formats()) and "webp" in renditions["card"]
+        sizes = {name: Image.open(io.BytesIO(encoded["webp"])).size for name, encoded in renditions.items()}
+        assert sizes == {"full": (1600, 800), "card": (600, 300), "thumbnail": (200, 100)}
+
+    def test_small_images_are_not_upscaled(self):
+        renditions = render_variants(_encode(size=(150, 100), fmt="PNG"), MAX_PIXELS)
+        assert Image.open(io.BytesIO(renditions["full"]["webp"])).size == (150, 100)
+
+    def test_metadata_is_stripped_after_applying_orientation(self):
+        # Orientation 6: stored landscape, displayed rotated 90 degrees
+        data = _encode(size=(400, 200), exif=_exif(orientation=6))
+        variant = Image.open(io.BytesIO(render_variants(data, MAX_PIXELS)["full"]["webp"]))
+
+        assert variant.size == (200, 400)
+        assert not variant.getexif()
+        assert "icc_profile" not in variant.info and "xmp" not in variant.info
+
+    def test_transparency_is_kept(self):
+        renditions = render_variants(_encode(size=(50, 50), fmt="PNG", mode="RGBA", color=(255, 0, 0, 128)), MAX_PIXELS)
+        assert Image.open(io.BytesIO(renditions["thumbnail"]["webp"])).mode == "RGBA"
+
+    def test_oversized_images_are_refused(self):
+        with pytest.raises(Image.DecompressionBombError):
+            render_variants(_encode(size=(200, 200)), max_pixels=1000)
+
+
+@pytest.mark.asyncio
+async def test_processor_renders_in_another_process():
+    processor = ImageProcessor(workers=1, max_pixels=MAX_PIXELS)
+    try:
+        renditions = await processor.render(_encode(size=(300, 300)))
+        assert Image.open(io.BytesIO(renditions["thumbnail"]["webp"])).size == (200, 200)
+
+        with pytest.raises(ImageProcessingError):
+            await processor.render(b"\x89PNG\r\n\x1a\n not really")
+    finally:
+        processor.shutdown()
+
+
+class TestUploadVariants:
+    @pytest.fixture
+    def bucket(self):
+        return RecordingBucket()
+
+    @pytest.fixture
+    def service(self, bucket, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_CONTENT_ADDRESSED", False)
+        return UploadService(bucket, image_processor=FakeProcessor())
+
+    def _file(self, content, content_type="image/jpeg"):
+        return UploadFile(io.BytesIO(content), filename="gem", headers=Headers({"content-type": content_type}))
+
+    @pytest.mark.asyncio
+    async def test_variants_are_stored_and_returned(self, service, bucket):
+        result = await service.upload_image(self._file(_encode()), "products/images", variants=True)
+
+        card = result["variants"]["card"]["webp"]
+        assert card == "https://cdn/products/images/original/card.webp"
+        assert bucket.objects[card.removeprefix("https://cdn/")]
+
+        response = ProductImageResponse(id="1", product_id="p", image_url=result["url"], variants=result["variants"])
+        assert response.model_dump()["variants"]["thumbnail"]["webp"].endswith("thumbnail.webp")
+
+    @pytest.mark.asyncio
+    async def test_svg_is_stored_without_variants(self, service, bucket):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+        result = await service.upload_image(self._file(svg, "image/svg+xml"), "images", variants=True)
+        assert result["variants"] is None
+        assert list(bucket.objects) == ["images/original.svg+xml"]
+
+    @pytest.mark.asyncio
+    async def test_undecodable_image_is_removed(self, service, bucket):
+        with pytest.raises(HTTPException) as exc_info:
+            await service.upload_image(self._file(b"\xff\xd8\xff broken"), "images", variants=True)
+        assert exc_info.value.status_code == 400
+        assert bucket.objects == {}
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine, inspect
+
+from src.infrastructure.database.connection import run_migrations
+
+
+class TestMigrations:
+    def test_upgrade_head_builds_schema_and_indexes(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+        run_migrations(bind=engine)
+
+        inspector = inspect(engine)
+        assert {"users", "products", "product_images", "cart_items", "orders", "order_items", "customers"} <= set(
+            inspector.get_table_names()
+        )
+        product_indexes = {index["name"] for index in inspector.get_indexes("products")}
+        assert {"ix_products_seller_id_created_at", "ix_products_price_id"} <= product_indexes
+        order_indexes = {index["name"] for index in inspector.get_indexes("orders")}
+        assert {"ix_orders_user_id_created_at", "ix_orders_status_created_at"} <= order_indexes
+        engine.dispose()
+
+    def test_legacy_schema_is_stamped_then_upgraded(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        run_migrations(revision="0001", bind=engine)
+        with engine.begin() as connection:
+            # Simulate a database built by create_all before migrations existed
+            connection.exec_driver_sql("DROP TABLE alembic_version")
+
+        run_migrations(bind=engine)
+
+        with engine.connect() as connection:
+            version = connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+        assert version is not None and version != "0001"
+        engine.dispose()
+
+    def test_duplicate_cart_items_are_merged(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'cart.db'}")
+        run_migrations(revision="0002", bind=engine)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO cart_items (id, user_id, product_id, quantity, created_at) VALUES "
+                "('a', 1, 'gem', 2, '2024-01-01'), ('b', 1, 'gem', 3, '2024-01-02'), ('c', 1, 'ore', 1, '2024-01-01')"
+            )
+
+        run_migrations(bind=engine)
+
+        with engine.connect() as connection:
+            rows = connection.exec_driver_sql("SELECT id, quantity FROM cart_items ORDER BY id").all()
+        assert [tuple(row) for row in rows] == [("a", 5), ("c", 1)]
+        cart_indexes = {index["name"]: index["unique"] for index in inspect(engine).get_indexes("cart_items")}
+        assert cart_indexes["uq_cart_items_user_id_product_id"]
+        engine.dispose()
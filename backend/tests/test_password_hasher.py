@@ -0,0 +1,77 @@
+import threading
+import pytest
+from fastapi import HTTPException
+
+from src.domains.auth import service as auth_service_module
+from src.domains.auth.service import AuthService
+from src.infrastructure.passwords import PasswordHasher
+from src.shared.config.cfg import settings
+from src.shared.exceptions import PasswordHasherBusyError
+from src.shared.models.user import User, get_password_hash, password_needs_rehash, verify_password
+from src.shared.schemas.user import UserLogin
+
+
+@pytest.fixture
+def saturated_hasher():
+    """A one-slot hasher whose only slot is held until the test ends."""
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=hasher.run, args=(hold,))
+    thread.start()
+    started.wait(5)
+    yield hasher
+    release.set()
+    thread.join()
+    hasher.shutdown()
+
+
+class TestPasswordHasher:
+    def test_runs_on_pool_threads(self):
+        hasher = PasswordHasher(workers=2, max_queue=2)
+        assert hasher.run(lambda: threading.current_thread().name).startswith("password-hash")
+        assert hasher.stats()["completed"] == 1
+        hasher.shutdown()
+
+    def test_rejects_when_saturated(self, saturated_hasher):
+        with pytest.raises(PasswordHasherBusyError):
+            saturated_hasher.run(lambda: None)
+        assert saturated_hasher.stats()["rejected"] == 1
+        assert saturated_hasher.stats()["in_flight"] == 1
+
+    def test_login_answers_429_when_saturated(self, db_session, saturated_hasher, monkeypatch):
+        db_session.add(User(email="a@example.com", username="alice", hashed_password="x", role="buyer"))
+        db_session.commit()
+        monkeypatch.setattr(auth_service_module, "get_password_hasher", lambda: saturated_hasher)
+
+        with pytest.raises(HTTPException) as exc_info:
+            AuthService(db_session).login_user(UserLogin(username="alice", password="secret"))
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers == {"Retry-After": "1"}
+
+
+class TestRehash:
+    def test_needs_rehash_compares_cost(self, monkeypatch):
+        monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+        assert not password_needs_rehash(get_password_hash("secret", rounds=5))
+        assert password_needs_rehash(get_password_hash("secret", rounds=4))
+        assert not password_needs_rehash("not-a-bcrypt-hash")
+
+    def test_login_rehashes_with_new_cost(self, db_session, mock_bcrypt_context, monkeypatch):
+        mock_hash, mock_verify = mock_bcrypt_context
+        mock_hash.side_effect = get_password_hash
+        mock_verify.side_effect = verify_password
+        db_session.add(User(email="a@example.com", username="alice", role="buyer",
+                            hashed_password=get_password_hash("secret", rounds=4)))
+        db_session.commit()
+
+        monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 5)
+        AuthService(db_session).login_user(UserLogin(username="alice", password="secret"))
+
+        stored = db_session.query(User).filter(User.username == "alice").one().hashed_password
+        assert stored.startswith("$2b$05$")
+        assert verify_password("secret", stored)
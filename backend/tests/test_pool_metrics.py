@@ -0,0 +1,107 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.domains.health.router import database_pool, router as health_router
+from src.infrastructure.database import pool as pool_module
+from src.infrastructure.database.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    get_engine_options,
+    get_pool_size,
+    instrument_engine,
+)
+from src.shared.config.cfg import settings
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """File-backed SQLite engine on a single-connection instrumented pool."""
+    monkeypatch.setattr(pool_module, "_engines", {})
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_engine(engine, "test")
+    yield engine
+    engine.dispose()
+
+
+class TestPoolSizing:
+    def test_settings_are_used_without_a_connection_budget(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 0)
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 8)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 4)
+        assert get_pool_size() == (8, 4)
+
+    def test_budget_is_split_across_workers_and_engines(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 100)
+        monkeypatch.setattr(settings, "UVICORN_WORKERS", 4)
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 10)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+        # 100 connections / (4 workers * 2 engines) = 12 per engine
+        assert get_pool_size() == (10, 2)
+
+    def test_engine_options(self):
+        assert get_engine_options("mysql+pymysql://u:p@db/app")["poolclass"] is InstrumentedQueuePool
+        assert get_engine_options("mysql+aiomysql://u:p@db/app", is_async=True)["poolclass"] is InstrumentedAsyncQueuePool
+        assert "poolclass" not in get_engine_options("sqlite://")
+
+
+class TestPoolMetrics:
+    def test_checkouts_and_timeouts_are_recorded(self, engine):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            [snapshot] = database_pool()["pools"]
+            assert snapshot["checked_out"] == 1
+            assert snapshot["timeouts"] == 1
+
+        [snapshot] = database_pool()["pools"]
+        assert snapshot["name"] == "test"
+        assert snapshot["checked_out"] == 0
+        assert snapshot["connects"] == 1
+        assert snapshot["checkouts"] == snapshot["checkins"] == 1
+        assert snapshot["wait"]["count"] == 2
+        assert snapshot["wait"]["buckets"]["le_inf"] == 2
+
+    def test_invalidations_are_recorded(self, engine):
+        with engine.connect() as conn:
+            conn.invalidate()
+        assert database_pool()["pools"][0]["invalidations"] == 1
+
+    def test_metrics_survive_dispose(self, engine):
+        engine.dispose()
+        with engine.connect():
+            pass
+        assert database_pool()["pools"][0]["checkouts"] == 1
+
+
+class TestPoolEndpoint:
+    @pytest.fixture
+    def client(self, engine):
+        app = FastAPI()
+        app.include_router(health_router)
+        with TestClient(app) as client:
+            yield client
+
+    def test_disabled_without_a_token(self, client):
+        assert client.get("/health/db/pool").status_code == 404
+        assert client.get("/health/db/pool", headers={"X-Internal-Token": ""}).status_code == 404
+
+    def test_requires_the_internal_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "HEALTH_INTERNAL_TOKEN", SecretStr("s3cret"))
+        assert client.get("/health/db/pool").status_code == 404
+        assert client.get("/health/db/pool", headers={"X-Internal-Token": "wrong"}).status_code == 404
+
+        response = client.get("/health/db/pool", headers={"X-Internal-Token": "s3cret"})
+        assert response.status_code == 200
+        assert response.json()["pools"][0]["name"] == "test"
+        assert client.get("/health").status_code == 200
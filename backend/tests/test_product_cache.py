@@ -0,0 +1,89 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import text
+
+from src.domains.products.service import ProductDetail, ProductService, product_cache_key
+from src.domains.sellers.service import SellerService
+from src.infrastructure.cache import MemoryCache, TieredCache
+from src.shared.models.product import Product, ProductImage
+from src.shared.models.user import User
+from src.shared.schemas.product import ProductUpdate
+
+
+@pytest.fixture
+def product(db_session):
+    seller = User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    product = Product(id="ruby", seller_id=1, name="Ruby", price=Decimal(50), description="Red gem")
+    db_session.add_all([seller, product, ProductImage(product_id="ruby", image_url="https://img/ruby.png")])
+    db_session.commit()
+    return product
+
+
+class TestMemoryCache:
+    def test_evicts_least_recently_used(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", "1", 60)
+        cache.set("b", "2", 60)
+        cache.get("a")
+        cache.set("c", "3", 60)
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+
+    def test_entries_expire(self):
+        cache = MemoryCache()
+        cache.set("a", "1", -1)
+        assert cache.get("a") is None
+
+    def test_expired_entries_are_swept_on_write(self):
+        cache = MemoryCache(sweep_interval_seconds=0)
+        cache.set("a", "1", -1)
+        cache.set("b", "2", 60)
+        assert len(cache) == 1
+
+
+class TestTieredCache:
+    def test_shared_hit_backfills_local_tier(self):
+        local, shared = MemoryCache(), MemoryCache()
+        shared.set("k", "v", 60)
+        assert TieredCache(local, shared).get("k") == "v"
+        assert local.get("k") == "v"
+
+    def test_delete_clears_both_tiers(self):
+        local, shared = MemoryCache(), MemoryCache()
+        cache = TieredCache(local, shared)
+        cache.set("k", "v", 60)
+        cache.delete("k")
+        assert local.get("k") is None and shared.get("k") is None
+
+
+class TestProductDetailCache:
+    def test_detail_is_served_from_cache(self, db_session, product, cache):
+        service = ProductService(db_session)
+        first = service.get_product_detail("ruby")
+        assert ProductDetail.load(cache.get(product_cache_key("ruby"))) == first
+
+        # A cache hit must not touch the database
+        db_session.execute(text("DELETE FROM product_images"))
+        db_session.commit()
+        second = service.get_product_detail("ruby")
+        assert second == first
+        assert service.get_product_by_id("ruby").images[0].image_url == "https://img/ruby.png"
+
+    def test_product_service_update_invalidates(self, db_session, product):
+        service = ProductService(db_session)
+        before = service.get_product_detail("ruby")
+        service.update_product("ruby", 1, ProductUpdate(name="Pigeon blood ruby"))
+        after = service.get_product_detail("ruby")
+        assert after.etag != before.etag
+        assert service.get_product_by_id("ruby").name == "Pigeon blood ruby"
+
+    def test_seller_service_update_and_delete_invalidate(self, db_session, product, cache):
+        ProductService(db_session).get_product_detail("ruby")
+        seller_service = SellerService(db_session)
+
+        seller_service.update_product(1, "ruby", ProductUpdate(price=Decimal(75)))
+        assert cache.get(product_cache_key("ruby")) is None
+        assert ProductService(db_session).get_product_by_id("ruby").price == Decimal(75)
+
+        seller_service.delete_product(1, "ruby")
+        assert cache.get(product_cache_key("ruby")) is None
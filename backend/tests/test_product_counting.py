@@ -0,0 +1,69 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import text
+
+from src.domains.products.service import ProductService
+from src.infrastructure.database.counting import count_cache
+from src.shared.models.product import Product
+from src.shared.models.user import User
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Seed a seller with a handful of products."""
+    count_cache.clear()
+    seller = User(email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    db_session.add(seller)
+    db_session.flush()
+    for i in range(7):
+        db_session.add(Product(seller_id=seller.id, name=f"Gem {i}", price=Decimal(10 + i), description=""))
+    db_session.commit()
+    yield db_session
+    count_cache.clear()
+
+
+def _add_product(session):
+    seller = session.query(User).first()
+    session.add(Product(seller_id=seller.id, name="Late gem", price=Decimal(99), description=""))
+    session.commit()
+
+
+class TestProductCounting:
+    def test_exact_count_follows_writes(self, catalog):
+        service = ProductService(catalog)
+        assert service.query_products(count="exact").total == 7
+        _add_product(catalog)
+        assert service.query_products(count="exact").total == 8
+
+    def test_cached_count_is_reused_per_filter_signature(self, catalog):
+        service = ProductService(catalog)
+        assert service.query_products(count="cached").total == 7
+        assert service.query_products(count="cached", price_min=15).total == 2
+
+        _add_product(catalog)
+
+        assert service.query_products(count="cached").total == 7
+        assert service.query_products(count="cached", price_min=15).total == 2
+        count_cache.clear()
+        assert service.query_products(count="cached").total == 8
+
+    def test_estimated_count_uses_table_statistics(self, catalog):
+        service = ProductService(catalog)
+        catalog.execute(text("ANALYZE"))
+
+        result = service.query_products(count="estimated")
+
+        assert result.total == 7
+        assert result.total_is_estimate is True
+
+    def test_estimated_count_with_filters_is_exact(self, catalog):
+        result = ProductService(catalog).query_products(count="estimated", price_max=11)
+        assert result.total == 2
+        assert result.total_is_estimate is False
+
+    def test_include_total_false_skips_counting(self, catalog):
+        result = ProductService(catalog).query_products(include_total=False, elements=3)
+        assert result.total is None
+        assert result.total_pages is None
+        assert len(result.products) == 3
+        assert result.next_cursor is not None
@@ -0,0 +1,106 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import HTTPException
+
+from src.domains.buyers.service import BuyerService
+from src.domains.products.service import ProductService
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.schemas.product import ProductQueryParams
+from src.shared.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Seed a seller with products whose sort values collide on purpose."""
+    seller = User(email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    db_session.add(seller)
+    db_session.flush()
+
+    base_time = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(23):
+        db_session.add(Product(
+            id=f"p-{i:03d}",
+            seller_id=seller.id,
+            name=f"Gem {i % 5}",
+            price=Decimal(10 + i % 4),
+            description="A shiny gem",
+            created_at=base_time + timedelta(minutes=i // 3),
+        ))
+    db_session.commit()
+    return db_session
+
+
+def _walk_forward(fetch):
+    ids, cursor = [], None
+    while True:
+        page = fetch(cursor)
+        ids.extend(product.id for product in page.products)
+        if not page.next_cursor:
+            return ids, page
+        cursor = page.next_cursor
+
+
+class TestCursorCodec:
+    def test_round_trip(self):
+        cursor = encode_cursor("price", "asc", Decimal("12.50"), "p-001")
+        decoded = decode_cursor(cursor, sort="price", order="asc")
+        assert decoded.value == Decimal("12.50")
+        assert decoded.id == "p-001"
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_rejects_mismatched_sort(self):
+        cursor = encode_cursor("price", "asc", Decimal("12.50"), "p-001")
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, sort="name", order="asc")
+
+
+class TestKeysetPagination:
+    @pytest.mark.parametrize("sort", ["name", "price", "created_at"])
+    @pytest.mark.parametrize("order", ["asc", "desc"])
+    def test_cursor_walk_matches_offset_walk(self, catalog, sort, order):
+        service = BuyerService.__new__(BuyerService)
+        service.session = catalog
+
+        def fetch_cursor(cursor):
+            return service.get_products(ProductQueryParams(per_page=4, sort=sort, order=order, cursor=cursor))
+
+        cursor_ids, _ = _walk_forward(fetch_cursor)
+
+        offset_ids = []
+        for page in range(1, 7):
+            result = service.get_products(ProductQueryParams(page=page, per_page=4, sort=sort, order=order))
+            offset_ids.extend(product.id for product in result.products)
+
+        assert len(cursor_ids) == 23
+        assert len(set(cursor_ids)) == 23
+        assert cursor_ids == offset_ids
+
+    @pytest.mark.parametrize("sort", ["name", "price", "created_at"])
+    @pytest.mark.parametrize("order", ["asc", "desc"])
+    def test_prev_cursor_returns_previous_page(self, catalog, sort, order):
+        service = ProductService(catalog)
+        first = service.query_products(elements=5, sort=sort, order=order)
+        second = service.query_products(elements=5, sort=sort, order=order, cursor=first.next_cursor)
+        back = service.query_products(elements=5, sort=sort, order=order, cursor=second.prev_cursor)
+
+        assert first.prev_cursor is None
+        assert [p.id for p in back.products] == [p.id for p in first.products]
+        assert back.prev_cursor is None
+
+    def test_invalid_cursor_is_rejected(self, catalog):
+        service = ProductService(catalog)
+        with pytest.raises(HTTPException) as exc_info:
+            service.query_products(cursor="garbage")
+        assert exc_info.value.status_code == 400
+
+    def test_cursor_for_other_sort_is_rejected(self, catalog):
+        service = ProductService(catalog)
+        first = service.query_products(elements=5, sort="price", order="asc")
+        with pytest.raises(HTTPException) as exc_info:
+            service.query_products(elements=5, sort="name", order="asc", cursor=first.next_cursor)
+        assert exc_info.value.status_code == 400
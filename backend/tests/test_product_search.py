@@ -0,0 +1,74 @@
+import pytest
+from decimal import Decimal
+from fastapi import HTTPException
+
+from src.domains.products.service import ProductService
+from src.infrastructure.search import InMemorySearchBackend, get_search_backend
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.schemas.product import ProductCreate, ProductUpdate
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Seed a seller with products that match 'ruby' to different degrees."""
+    seller = User(email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    db_session.add(seller)
+    db_session.flush()
+    db_session.add_all([
+        Product(id="ruby-ring", seller_id=seller.id, name="Ruby ring", price=Decimal(50),
+                description="A ring with a ruby, ruby red"),
+        Product(id="ruby-mention", seller_id=seller.id, name="Silver necklace", price=Decimal(40),
+                description="Pairs well with a ruby ring"),
+        Product(id="sapphire", seller_id=seller.id, name="Sapphire", price=Decimal(70),
+                description="Deep blue stone"),
+    ])
+    db_session.commit()
+    return db_session
+
+
+class TestInMemorySearchBackend:
+    def test_backend_is_selected_per_engine(self, catalog):
+        backend = get_search_backend(catalog)
+        assert isinstance(backend, InMemorySearchBackend)
+        assert get_search_backend(catalog) is backend
+
+    def test_scores_favour_name_matches(self, catalog):
+        scores = get_search_backend(catalog).search(catalog, "ruby")
+        assert set(scores) == {"ruby-ring", "ruby-mention"}
+        assert scores["ruby-ring"] > scores["ruby-mention"]
+
+    def test_search_is_case_insensitive_and_token_based(self, catalog):
+        scores = get_search_backend(catalog).search(catalog, "BLUE stone")
+        assert set(scores) == {"sapphire"}
+
+
+class TestProductSearch:
+    def test_search_filters_results(self, catalog):
+        result = ProductService(catalog).query_products(search="sapphire")
+        assert [p.id for p in result.products] == ["sapphire"]
+        assert result.total == 1
+
+    def test_relevance_sort_ranks_best_match_first(self, catalog):
+        result = ProductService(catalog).query_products(search="ruby", sort="relevance")
+        assert [p.id for p in result.products] == ["ruby-ring", "ruby-mention"]
+
+    def test_relevance_sort_rejects_cursor(self, catalog):
+        with pytest.raises(HTTPException) as exc_info:
+            ProductService(catalog).query_products(search="ruby", sort="relevance", cursor="abc")
+        assert exc_info.value.status_code == 400
+
+    def test_index_follows_product_writes(self, catalog):
+        service = ProductService(catalog)
+        assert service.query_products(search="emerald").total == 0
+
+        seller = catalog.query(User).first()
+        created = service.create_product(seller.id, ProductCreate(name="Emerald", price=Decimal(90), description="Green gem"))
+        assert [p.id for p in service.query_products(search="emerald").products] == [created.id]
+
+        service.update_product(created.id, seller.id, ProductUpdate(name="Opal"))
+        assert service.query_products(search="emerald").total == 0
+        assert service.query_products(search="opal").total == 1
+
+        service.delete_product(created.id, seller.id)
+        assert service.query_products(search="opal").total == 0
@@ -0,0 +1,125 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.sellers.service import SellerService
+from src.infrastructure.database import Base
+from src.infrastructure.payments import product_sync
+from src.infrastructure.payments.product_sync import ProductSyncWorker, retry_delay
+from src.shared.config.cfg import settings
+from src.shared.models.payments import ProductSyncTask
+from src.shared.models.product import Product
+from src.shared.models.user import User
+from src.shared.schemas.product import ProductCreate, ProductUpdate
+from src.shared.schemas.user import AuthContext
+
+
+class FakeDodo:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.failures = 0
+
+    def sync_product_with_dodo(self, product):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider down")
+        self.created.append(product.name)
+        return f"dodo-{len(self.created)}"
+
+    def update_product_in_dodo(self, dodo_product_id, name, price, description=""):
+        self.updated.append((dodo_product_id, name, price))
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller"))
+        session.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def dodo():
+    return FakeDodo()
+
+
+@pytest.fixture
+def worker(factory, dodo):
+    return ProductSyncWorker(factory, dodo_payments=dodo)
+
+
+def _seller(session):
+    return SellerService(session, principal=AuthContext(id=1, username="seller", role="seller", is_active=True))
+
+
+def _create(factory, name="Ruby"):
+    with factory() as session:
+        data = ProductCreate(name=name, price=Decimal(10), description="gem", stock_quantity=1)
+        return _seller(session).create_product(1, data).id
+
+
+def _pending(factory):
+    with factory() as session:
+        return session.query(ProductSyncTask).all()
+
+
+class TestProductSync:
+    def test_create_enqueues_instead_of_calling_provider(self, factory, dodo, worker):
+        product_id = _create(factory)
+        assert dodo.created == []
+        assert [task.product_id for task in _pending(factory)] == [product_id]
+
+        assert worker.run_once() == 1
+        assert dodo.created == ["Ruby"]
+        assert _pending(factory) == []
+        with factory() as session:
+            assert session.get(Product, product_id).dodo_product_id == "dodo-1"
+
+    def test_updates_are_pushed_and_coalesced(self, factory, dodo, worker):
+        product_id = _create(factory)
+        worker.run_once()
+
+        with factory() as session:
+            _seller(session).update_product(1, product_id, ProductUpdate(name="Red Ruby"))
+            _seller(session).update_product(1, product_id, ProductUpdate(price=Decimal(12)))
+            _seller(session).update_product(1, product_id, ProductUpdate(stock_quantity=5))
+        assert len(_pending(factory)) == 2
+
+        assert worker.run_once() == 1
+        assert dodo.updated == [("dodo-1", "Red Ruby", Decimal(12))]
+        assert _pending(factory) == []
+
+    def test_failures_back_off(self, factory, dodo, worker, monkeypatch):
+        monkeypatch.setattr(product_sync.random, "uniform", lambda low, high: high)
+        _create(factory)
+        dodo.failures = 1
+
+        assert worker.run_once() == 1
+        task, = _pending(factory)
+        assert (task.attempts, task.last_error, task.claimed_by) == (1, "provider down", None)
+        assert task.next_attempt_at - task.created_at >= timedelta(seconds=settings.PRODUCT_SYNC_RETRY_BASE_SECONDS)
+        # Not due yet
+        assert worker.run_once() == 0
+
+        monkeypatch.setattr(product_sync, "_utcnow", lambda: task.next_attempt_at + timedelta(seconds=1))
+        assert worker.run_once() == 1
+        assert dodo.created == ["Ruby"]
+
+    def test_claimed_rows_are_skipped_by_other_workers(self, factory, dodo, worker):
+        _create(factory)
+        assert worker._claim()
+        assert ProductSyncWorker(factory, dodo_payments=dodo).run_once() == 0
+
+    def test_retry_delay_is_capped(self, monkeypatch):
+        monkeypatch.setattr(product_sync.random, "uniform", lambda low, high: high)
+        assert retry_delay(1) == settings.PRODUCT_SYNC_RETRY_BASE_SECONDS
+        assert retry_delay(2) == settings.PRODUCT_SYNC_RETRY_BASE_SECONDS * 2
+        assert retry_delay(50) == settings.PRODUCT_SYNC_RETRY_MAX_SECONDS
@@ -0,0 +1,89 @@
+import pytest
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+
+from src.domains.buyers.service import BuyerService
+from src.domains.products.service import ProductService
+from src.domains.sellers.service import SellerService
+from src.domains.suppliers.service import SupplierService
+from src.shared.models.order import Order, OrderItem, OrderStatus
+from src.shared.models.product import Product, ProductImage
+from src.shared.models.user import User
+from src.shared.schemas.order import OrderResponse
+from src.shared.schemas.product import ProductQueryParams
+
+PRODUCTS = 12
+
+
+@pytest.fixture
+def catalog(db_session):
+    """A seller with PRODUCTS products of two images each, and a buyer with one order per product."""
+    seller = User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    buyer = User(id=2, email="buyer@example.com", username="buyer", hashed_password="x", role="buyer")
+    supplier = User(id=3, email="supplier@example.com", username="supplier", hashed_password="x", role="supplier")
+    db_session.add_all([seller, buyer, supplier])
+    for i in range(PRODUCTS):
+        product_id = f"gem-{i:02d}"
+        db_session.add(Product(id=product_id, seller_id=1, name=f"Gem {i}", price=Decimal(10 + i), description="gem"))
+        db_session.add_all([
+            ProductImage(product_id=product_id, image_url=f"https://img/{product_id}-{n}.png") for n in range(2)
+        ])
+        order = Order(id=f"order-{i:02d}", user_id=2, status=OrderStatus.CONFIRMED.value, total_amount=Decimal(10))
+        db_session.add(order)
+        db_session.add(OrderItem(order_id=order.id, product_id=product_id, quantity=1, price_at_time=Decimal(10)))
+    db_session.commit()
+    return db_session
+
+
+@contextmanager
+def count_queries(session):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _orders(result):
+    # Order listings hand ORM objects to the response model, so serialize them here
+    return TypeAdapter(List[OrderResponse]).validate_python(result, from_attributes=True)
+
+
+LISTINGS = {
+    "query_products": lambda s, n: ProductService(s).query_products(elements=n),
+    "query_products_search": lambda s, n: ProductService(s).query_products(elements=n, search="gem", sort="relevance"),
+    "get_products_by_seller": lambda s, n: ProductService(s).get_products_by_seller(1, per_page=n),
+    "buyer_get_products": lambda s, n: BuyerService(s).get_products(ProductQueryParams(per_page=n)),
+    "get_seller_products": lambda s, n: SellerService(s).get_seller_products(1, per_page=n),
+    "buyer_get_orders": lambda s, n: _orders(BuyerService(s).get_orders(2)[:n]),
+    "get_seller_orders": lambda s, n: _orders(SellerService(s).get_seller_orders(1, per_page=n)),
+    "get_orders_for_approval": lambda s, n: _orders(SupplierService(s).get_orders_for_approval(3, per_page=n)),
+    "get_all_orders": lambda s, n: _orders(SupplierService(s).get_all_orders(3, per_page=n)),
+}
+
+
+@pytest.mark.parametrize("listing", LISTINGS.values(), ids=LISTINGS.keys())
+def test_query_count_does_not_grow_with_page_size(catalog, listing):
+    # Warm up lazily built state such as the in-memory search index
+    listing(catalog, 1)
+    catalog.expire_all()
+
+    counts = []
+    for page_size in (2, PRODUCTS):
+        with count_queries(catalog) as statements:
+            result = listing(catalog, page_size)
+        catalog.expire_all()
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], f"{counts[0]} queries for 2 rows but {counts[1]} for {PRODUCTS}"
+    assert result
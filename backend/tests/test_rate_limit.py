@@ -0,0 +1,149 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.domains.auth.router import router as auth_router
+from src.infrastructure.database import get_db
+from src.infrastructure.ratelimit import MemoryRateLimitBackend, RateLimiter, RateLimitRule, TOKEN_BUCKET
+from src.shared.config.cfg import settings
+from src.shared.models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def backend(clock):
+    return MemoryRateLimitBackend(clock=clock)
+
+
+class TestTokenBucket:
+    def test_allows_burst_then_refills(self, backend, clock):
+        assert all(backend.token_bucket("k", 3, 1.0).allowed for _ in range(3))
+        rejected = backend.token_bucket("k", 3, 1.0)
+        assert not rejected.allowed
+        assert rejected.retry_after == pytest.approx(1.0)
+
+        clock.now += 1
+        assert backend.token_bucket("k", 3, 1.0).allowed
+        assert not backend.token_bucket("k", 3, 1.0).allowed
+
+    def test_keys_are_independent(self, backend):
+        assert backend.token_bucket("a", 1, 1.0).allowed
+        assert backend.token_bucket("b", 1, 1.0).allowed
+        assert not backend.token_bucket("a", 1, 1.0).allowed
+
+
+class TestSlidingWindow:
+    def test_limits_hits_per_window(self, backend, clock):
+        assert all(backend.sliding_window("k", 2, 60).allowed for _ in range(2))
+        rejected = backend.sliding_window("k", 2, 60)
+        assert not rejected.allowed
+        assert 0 < rejected.retry_after <= 60
+
+    def test_previous_window_slides_out(self, backend, clock):
+        clock.now = 6000.0
+        assert all(backend.sliding_window("k", 2, 60).allowed for _ in range(2))
+
+        # Halfway into the next window half of the previous hits still count
+        clock.now += 90
+        assert backend.sliding_window("k", 2, 60).allowed
+        assert not backend.sliding_window("k", 2, 60).allowed
+
+        clock.now += 60
+        assert backend.sliding_window("k", 2, 60).allowed
+
+    def test_idle_keys_are_pruned(self, clock):
+        backend = MemoryRateLimitBackend(max_keys=2, clock=clock)
+        backend.sliding_window("a", 1, 10)
+        backend.sliding_window("b", 1, 10)
+        clock.now += 100
+        backend.sliding_window("c", 1, 10)
+        assert set(backend._state) == {"c"}
+
+
+class TestRateLimiter:
+    def test_stops_at_first_exceeded_rule(self, backend):
+        limiter = RateLimiter(backend)
+        narrow = RateLimitRule("narrow", 1, 60)
+        broad = RateLimitRule("broad", 5, 60, algorithm=TOKEN_BUCKET)
+
+        assert limiter.check([(narrow, "x"), (broad, "all")]).allowed
+        assert not limiter.check([(narrow, "x"), (broad, "all")]).allowed
+        # The rejected request did not use up the broad budget
+        assert [limiter.check([(broad, "all")]).allowed for _ in range(5)] == [True] * 4 + [False]
+
+    def test_backend_failure_allows_request(self):
+        class Broken(MemoryRateLimitBackend):
+            def sliding_window(self, key, limit, window_seconds):
+                raise ConnectionError("down")
+
+        assert RateLimiter(Broken()).check([(RateLimitRule("r", 1, 60), "x")]).allowed
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    with TestClient(app) as client:
+        yield client
+
+
+def _login(client, username, ip="10.0.0.1"):
+    return client.post(
+        "/auth/login",
+        json={"username": username, "password": "wrong"},
+        headers={"X-Forwarded-For": ip}
+    )
+
+
+class TestAuthEndpoints:
+    @pytest.fixture(autouse=True)
+    def budgets(self, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", True)
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_IP", 3)
+        monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_PER_USERNAME", 2)
+
+    def test_username_budget_rejects_before_hashing(self, client, db_session, mock_bcrypt_context):
+        _, mock_verify = mock_bcrypt_context
+        mock_verify.return_value = False
+        db_session.add(User(email="a@example.com", username="alice", hashed_password="x", role="buyer"))
+        db_session.commit()
+
+        assert [_login(client, "alice", ip=f"10.0.0.{i}").status_code for i in range(2)] == [401, 401]
+        rejected = _login(client, "Alice", ip="10.0.0.9")
+        assert rejected.status_code == 429
+        assert int(rejected.headers["Retry-After"]) >= 1
+        assert mock_verify.call_count == 2
+
+    def test_ip_budget_spans_usernames(self, client):
+        assert [_login(client, f"user{i}").status_code for i in range(4)] == [401, 401, 401, 429]
+        assert _login(client, "user9", ip="10.0.0.2").status_code == 401
+
+    def test_global_budget(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_GLOBAL_BURST", 2)
+        monkeypatch.setattr(settings, "AUTH_RATE_LIMIT_GLOBAL_PER_SECOND", 1)
+        statuses = [_login(client, f"user{i}", ip=f"10.0.1.{i}").status_code for i in range(3)]
+        assert statuses == [401, 401, 429]
+
+    def test_register_budget(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "REGISTER_RATE_LIMIT_PER_IP", 1)
+        payload = {"email": "a@example.com", "username": "alice", "password": "secret123", "role": "buyer"}
+        assert client.post("/auth/register", json=payload).status_code == 201
+        payload.update(email="b@example.com", username="bob")
+        assert client.post("/auth/register", json=payload).status_code == 429
+
+    def test_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        assert all(_login(client, "alice").status_code == 401 for _ in range(5))
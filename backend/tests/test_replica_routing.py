@@ -0,0 +1,108 @@
+import pytest
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.domains.products.service import ProductService
+from src.infrastructure.database import Base
+from src.infrastructure.database import routing
+from src.infrastructure.database.routing import ReplicaSet, RoutingSession, WriteTracker
+from src.shared.config.cfg import settings
+from src.shared.models.product import Product
+from src.shared.models.user import User
+
+
+def _seed(engine, product_id):
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    seller = User(id=1, email="seller@example.com", username="seller", hashed_password="x", role="seller")
+    session.add_all([seller, Product(id=product_id, seller_id=1, name=product_id, price=Decimal(10), description="x")])
+    session.commit()
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def tracker(monkeypatch):
+    tracker = WriteTracker()
+    monkeypatch.setattr(routing, "write_tracker", tracker)
+    return tracker
+
+
+@pytest.fixture
+def engines(tmp_path):
+    """Primary and replica databases holding different products, so reads show where they ran."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    _seed(primary, "on-primary")
+    _seed(replica, "on-replica")
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+@pytest.fixture
+def make_session(engines):
+    primary, replica = engines
+    factory = sessionmaker(class_=RoutingSession, bind=primary, replicas=ReplicaSet([replica]))
+    sessions = []
+
+    def make(**info):
+        session = factory(info=info)
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+
+
+def _catalog_ids(session):
+    return [p.id for p in ProductService(session).query_products().products]
+
+
+def _add_product(session, product_id):
+    session.add(Product(id=product_id, seller_id=1, name=product_id, price=Decimal(10), description="x"))
+    session.commit()
+
+
+class TestRouting:
+    def test_read_only_methods_use_the_replica(self, make_session):
+        assert _catalog_ids(make_session()) == ["on-replica"]
+
+    def test_other_queries_use_the_primary(self, make_session):
+        assert [p.id for p in make_session().query(Product).all()] == ["on-primary"]
+
+    def test_session_stays_on_primary_after_writing(self, make_session):
+        session = make_session()
+        _add_product(session, "new")
+        assert sorted(_catalog_ids(session)) == ["new", "on-primary"]
+
+    def test_writer_sticks_to_primary_until_window_expires(self, make_session, monkeypatch):
+        _add_product(make_session(sticky_key="user:1"), "new")
+
+        assert "new" in _catalog_ids(make_session(sticky_key="user:1"))
+        assert _catalog_ids(make_session(sticky_key="user:2")) == ["on-replica"]
+
+        monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 0)
+        _add_product(make_session(sticky_key="user:1"), "newer")
+        assert _catalog_ids(make_session(sticky_key="user:1")) == ["on-replica"]
+
+    def test_product_cache_is_filled_from_the_primary(self, make_session):
+        # The replica's copy may predate the invalidation that emptied the cache
+        service = ProductService(make_session())
+        with pytest.raises(HTTPException):
+            service.get_product_detail("on-replica")
+        assert service.get_product_by_id("on-primary").id == "on-primary"
+
+
+class TestFailover:
+    def test_failed_replica_falls_back_to_primary(self, engines, tmp_path):
+        primary, _ = engines
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        replicas = ReplicaSet([broken])
+        session = sessionmaker(class_=RoutingSession, bind=primary, replicas=replicas)()
+
+        assert _catalog_ids(session) == ["on-primary"]
+        assert replicas.choose() is None
+        session.close()
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import threading
+import time
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+
+from src.domains.uploads.service import UploadService
+from src.infrastructure.bucket import R2BucketManager
+from src.shared.config.cfg import settings
+from src.shared.exceptions import FileUploadError
+
+DELAY = 0.05
+
+
+def _image(name, content_type="image/png", content=b"\x89PNG\r\n\x1a\n"):
+    return UploadFile(io.BytesIO(content), filename=name, headers=Headers({"content-type": content_type}))
+
+
+class SlowClient:
+    """boto3 stand-in whose uploads block like a network call would."""
+
+    def __init__(self):
+        self.threads = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.threads.add(threading.current_thread().name)
+        time.sleep(DELAY)
+        with self._lock:
+            self.in_flight -= 1
+        if "broken" in Key:
+            raise ConnectionError("reset")
+
+
+@pytest.fixture
+def client():
+    return SlowClient()
+
+
+@pytest.fixture
+def service(client):
+    return UploadService(R2BucketManager(client=client))
+
+
+class TestUploads:
+    @pytest.mark.asyncio
+    async def test_put_does_not_block_the_event_loop(self, service, client):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(DELAY / 10)
+
+        task = asyncio.create_task(ticker())
+        await service.upload_image(_image("a.png"), "images")
+        task.cancel()
+
+        assert threading.main_thread().name not in client.threads
+        assert ticks >= 3
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_bounded(self, service, client, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_MAX_PARALLEL", 3)
+        start = time.perf_counter()
+        results = await service.upload_images([_image(f"{i}.png") for i in range(6)], "images")
+
+        assert [result["filename"] for result in results] == [f"{i}.png" for i in range(6)]
+        assert all(result["success"] for result in results)
+        assert client.max_in_flight == 3
+        assert time.perf_counter() - start < 6 * DELAY
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_per_file(self, service):
+        results = await service.upload_images(
+            [_image("ok.png"), _image("doc.pdf", content_type="application/pdf"), _image("ok2.png")], "broken"
+        )
+        assert [result["success"] for result in results] == [False, False, False]
+        assert "Error uploading file to R2" in results[0]["error"]
+        assert "Invalid file type" in results[1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_all_or_nothing_cleans_up(self, service, client, monkeypatch):
+        deleted = []
+        monkeypatch.setattr(service.bucket_manager, "delete", deleted.extend, raising=False)
+        files = [_image("a.png"), _image("b.png", content=b"not an image"), _image("c.png")]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.upload_all_images(files, "products/images")
+        assert exc_info.value.status_code == 400
+        assert len([key for key in deleted if key.endswith(".png")]) == 2
+
+
+class TestStreamingValidation:
+    @pytest.mark.asyncio
+    async def test_type_comes_from_content(self, service):
+        result = await service.upload_image(_image("a.jpg", content_type="image/jpeg"), "images")
+        assert result["content_type"] == "image/png"
+        assert result["file_key"].endswith(".png")
+
+    @pytest.mark.asyncio
+    async def test_disguised_file_is_rejected(self, service):
+        with pytest.raises(HTTPException) as exc_info:
+            await service.upload_image(_image("a.png", content=b"<html>"), "images")
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_cap_is_enforced_on_bytes_read(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_MAX_IMAGE_BYTES", 100)
+        file = _image("big.png", content=b"\x89PNG\r\n\x1a\n" + b"\x00" * 200)
+        file.size = None  # nothing to trust up front
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.upload_image(file, "images")
+        assert exc_info.value.status_code == 413